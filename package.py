@@ -165,7 +165,7 @@ def _configure() -> None:
     config_module.DatabaseConfig.IMAGES_DIR = meta_root / "images"
     config_module.DatabaseConfig.SQLITE_DB_PATH = config_module.DatabaseConfig.SQLITE_DIR / "documents.db"
     config_module.DatabaseConfig.VECTOR_INDEX_PATH = config_module.DatabaseConfig.VECTOR_DIR / "vector_index.faiss"
-    config_module.DatabaseConfig.VECTOR_METADATA_PATH = config_module.DatabaseConfig.VECTOR_DIR / "vector_metadata.json"
+    config_module.DatabaseConfig.VECTOR_METADATA_PATH = config_module.DatabaseConfig.VECTOR_DIR / "vector_metadata.jsonl"
     config_module.DatabaseConfig.IMAGE_VECTOR_INDEX_PATH = config_module.DatabaseConfig.VECTOR_DIR / "image_vector_index.faiss"
     config_module.DatabaseConfig.IMAGE_VECTOR_METADATA_PATH = config_module.DatabaseConfig.VECTOR_DIR / "image_vector_metadata.json"
     config_module.DatabaseConfig.ensure_directories()
@@ -201,8 +201,14 @@ def create_spec_file(runtime_hook: Path) -> Path:
     packages_literal = ", ".join(f"'{pkg}'" for pkg in PYINSTALLER_PACKAGE_TARGETS)
     hiddenimports_literal = "\n    ".join([
         "'uvicorn.logging',",
+        "'uvicorn.loops',",
+        "'uvicorn.loops.auto',",
+        "'uvicorn.loops.asyncio',",
+        "'uvicorn.loops.uvloop',",
         "'uvicorn.protocols.http',",
         "'uvicorn.protocols.http.auto',",
+        "'uvicorn.protocols.http.h11_impl',",
+        "'uvicorn.protocols.http.httptools_impl',",
         "'uvicorn.protocols.websockets',",
         "'uvicorn.protocols.websockets.auto',",
         "'uvicorn.lifespan',",
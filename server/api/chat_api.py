@@ -15,6 +15,7 @@ from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
 import numpy as np
 import faiss
@@ -30,7 +31,12 @@ from service.clip_embedding_service import (
 )
 from service.embedding_service import EmbeddingService
 from service.faiss_service import FaissManager
-from service.llm_client import LLMClientError, SiliconFlowClient
+from service.llm_client import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    LLMClientError,
+    SiliconFlowClient,
+)
 from service.vision_model_service import VisionAttachment, get_vision_handler
 from service.reranker_service import RerankerService
 from service.sqlite_service import SQLiteManager
@@ -41,6 +47,7 @@ from service.async_summary_service import (
     init_async_summary_service, 
     get_async_summary_service
 )
+from service.openai_client_cache import OpenAIClientCache
 from service.memory_service import (
     MemoryService,
     MemoryRuntimeOptions,
@@ -370,6 +377,41 @@ class ChatResponse(BaseModel):
 
 OLLAMA_REQUEST_TIMEOUT = 60
 
+# Ollama 与 OpenAI 兼容 provider 的连接在进程内复用，避免每次调用重新握手 TCP/TLS
+_ollama_session = requests.Session()
+_ollama_adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+_ollama_session.mount("https://", _ollama_adapter)
+_ollama_session.mount("http://", _ollama_adapter)
+
+OPENAI_CLIENT_CACHE_SIZE = 32
+
+
+def _close_openai_client(client: OpenAI) -> None:
+    try:
+        client.close()
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+# 同步 OpenAI 客户端按 (base_url, API Key 摘要) 做 LRU 缓存，淘汰时关闭其连接池
+_openai_clients: OpenAIClientCache[OpenAI] = OpenAIClientCache(
+    lambda base_url, api_key: OpenAI(api_key=api_key, base_url=base_url),
+    maxsize=OPENAI_CLIENT_CACHE_SIZE,
+    on_evict=_close_openai_client,
+)
+
+
+def _get_openai_client(base_url: str, api_key: str) -> OpenAI:
+    """按 base_url 与 API Key 摘要复用同步 OpenAI 客户端及其连接池"""
+    return _openai_clients.get(base_url, api_key)
+
+
+def close_chat_clients() -> None:
+    """关闭缓存的 OpenAI 客户端与 Ollama 会话，在应用关闭时调用"""
+    for client in _openai_clients.drain():
+        _close_openai_client(client)
+    _ollama_session.close()
+
 
 def _convert_image_attachments(
     attachments: Optional[List[ImageAttachment]],
@@ -537,7 +579,7 @@ def _prepare_selected_files(
     if not selections:
         return sanitized, [], []
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     data_root = DatabaseConfig.DATABASE_DIR.resolve()
 
     raw_entries: List[Dict[str, Any]] = []
@@ -1081,7 +1123,7 @@ def _call_ollama_chat_completion(
     }
 
     try:
-        response = requests.post(
+        response = _ollama_session.post(
             url,
             json=request_payload,
             headers=headers,
@@ -1132,7 +1174,7 @@ def _stream_ollama_chat(
     }
 
     try:
-        response = requests.post(
+        response = _ollama_session.post(
             url,
             json=stream_payload,
             headers=headers,
@@ -1200,7 +1242,7 @@ def _call_modelscope_chat_completion(
 ) -> Dict[str, Any]:
     kwargs, _ = _prepare_modelscope_request(payload)
     kwargs["stream"] = False
-    client = OpenAI(api_key=api_key, base_url=MODELSCOPE_BASE_URL)
+    client = _get_openai_client(MODELSCOPE_BASE_URL, api_key)
     try:
         response = client.chat.completions.create(**kwargs)
     except Exception as exc:  # pylint: disable=broad-except
@@ -1237,7 +1279,7 @@ def _stream_modelscope_chat(
 ) -> Generator[Dict[str, Any], None, None]:
     kwargs, stream_flag = _prepare_modelscope_request(payload)
     kwargs["stream"] = stream_flag or True
-    client = OpenAI(api_key=api_key, base_url=MODELSCOPE_BASE_URL)
+    client = _get_openai_client(MODELSCOPE_BASE_URL, api_key)
     in_thinking = False
     try:
         stream = client.chat.completions.create(**kwargs)
@@ -1309,7 +1351,7 @@ def _call_dashscope_chat_completion(
 ) -> Dict[str, Any]:
     kwargs, _ = _prepare_dashscope_request(payload)
     kwargs["stream"] = False
-    client = OpenAI(api_key=api_key, base_url=DASHSCOPE_BASE_URL)
+    client = _get_openai_client(DASHSCOPE_BASE_URL, api_key)
     try:
         response = client.chat.completions.create(**kwargs)
     except Exception as exc:  # pylint: disable=broad-except
@@ -1344,7 +1386,7 @@ def _stream_dashscope_chat(
 ) -> Generator[Dict[str, Any], None, None]:
     kwargs, stream_flag = _prepare_dashscope_request(payload)
     kwargs["stream"] = stream_flag or True
-    client = OpenAI(api_key=api_key, base_url=DASHSCOPE_BASE_URL)
+    client = _get_openai_client(DASHSCOPE_BASE_URL, api_key)
     in_thinking = False
     try:
         stream = client.chat.completions.create(**kwargs)
@@ -1566,17 +1608,16 @@ def _retrieve_chunks_from_document_summaries(
     if not summary_vectors:
         return None
 
+    # 索引中的向量在写入时已归一化，余弦相似度即一次矩阵-向量乘
     summary_matrix = np.vstack(summary_vectors)
-    try:
-        faiss.normalize_L2(summary_matrix)
-    except Exception:  # pragma: no cover - defensive
-        pass
-
     scores = summary_matrix @ query_vec
     if scores.size == 0:
         return None
 
-    ranked_idx = np.argsort(scores)[::-1][:SUMMARY_SEARCH_CANDIDATE_LIMIT]
+    # 只对前 SUMMARY_SEARCH_CANDIDATE_LIMIT 个候选做部分选择后排序，避免全量排序
+    limit = min(SUMMARY_SEARCH_CANDIDATE_LIMIT, scores.size)
+    ranked_idx = np.argpartition(-scores, limit - 1)[:limit]
+    ranked_idx = ranked_idx[np.argsort(-scores[ranked_idx], kind="stable")]
     if ranked_idx.size == 0:
         return None
 
@@ -2161,12 +2202,12 @@ def _retrieve_chunks(question: str, top_k: int) -> List[RetrievedChunk]:
     clip_service = _ensure_clip_service()
     if clip_service is not None:
         try:
-            query_clip_vectors = clip_service.encode_texts([question])
+            query_clip_vectors = clip_service.encode_texts_np([question])
         except Exception as exc:  # pragma: no cover - optional path
             logger.debug("Failed to encode query with CLIP: %s", exc)
-            query_clip_vectors = []
-        if query_clip_vectors:
-            query_clip_vec = np.array(query_clip_vectors[0], dtype=np.float32)
+            query_clip_vectors = None
+        if query_clip_vectors is not None and len(query_clip_vectors):
+            query_clip_vec = query_clip_vectors[0]
             clip_payload: List[Tuple[int, str]] = []
             for idx, candidate in enumerate(candidates[:CLIP_CANDIDATE_LIMIT]):
                 content = candidate.get("content") or ""
@@ -2177,14 +2218,14 @@ def _retrieve_chunks(question: str, top_k: int) -> List[RetrievedChunk]:
             if clip_payload:
                 try:
                     clip_texts = [text for _, text in clip_payload]
-                    clip_vectors = clip_service.encode_texts(clip_texts)
+                    clip_vectors = clip_service.encode_texts_np(clip_texts)
                 except Exception as exc:  # pragma: no cover - optional path
                     logger.debug(
                         "Failed to encode candidate passages with CLIP: %s", exc
                     )
-                    clip_vectors = []
-                if clip_vectors:
-                    doc_matrix = np.array(clip_vectors, dtype=np.float32)
+                    clip_vectors = None
+                if clip_vectors is not None and len(clip_vectors):
+                    doc_matrix = clip_vectors
                     if doc_matrix.ndim == 1:
                         doc_matrix = doc_matrix.reshape(1, -1)
                     if (
@@ -1,33 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Any, Optional
+from api.dependencies import get_sqlite
 from service.sqlite_service import SQLiteManager
-import sqlite3
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/database", tags=["database"])
 
-# 全局SQLite管理器实例
-sqlite_manager = None
-
-def init_database_api(sqlite_mgr: SQLiteManager):
-    """初始化数据库API，传入SQLite管理器实例"""
-    global sqlite_manager
-    sqlite_manager = sqlite_mgr
-
 @router.get("/test-connection")
-async def test_database_connection():
+async def test_database_connection(sqlite_manager: SQLiteManager = Depends(get_sqlite)):
     """测试数据库连接"""
     try:
-        if sqlite_manager is None:
-            raise HTTPException(status_code=500, detail="数据库管理器未初始化")
-        
         # 尝试连接数据库并执行简单查询
-        with sqlite3.connect(sqlite_manager.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            result = cursor.fetchone()
+        await sqlite_manager.read(lambda conn: conn.execute("SELECT 1").fetchone())
             
         return {
             "status": "success",
@@ -39,16 +25,15 @@ async def test_database_connection():
         raise HTTPException(status_code=500, detail=f"数据库连接失败: {str(e)}")
 
 @router.get("/tables")
-async def get_all_tables():
+async def get_all_tables(sqlite_manager: SQLiteManager = Depends(get_sqlite)):
     """获取所有表名"""
     try:
-        if sqlite_manager is None:
-            raise HTTPException(status_code=500, detail="数据库管理器未初始化")
-        
-        with sqlite3.connect(sqlite_manager.db_path) as conn:
+        def fetch_tables(conn):
             cursor = conn.cursor()
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-            tables = [row[0] for row in cursor.fetchall()]
+            return [row[0] for row in cursor.fetchall()]
+            
+        tables = await sqlite_manager.read(fetch_tables)
             
         return {
             "status": "success",
@@ -59,14 +44,15 @@ async def get_all_tables():
         raise HTTPException(status_code=500, detail=f"获取表列表失败: {str(e)}")
 
 @router.get("/table/{table_name}")
-async def get_table_data(table_name: str, limit: int = 100):
+async def get_table_data(
+    table_name: str,
+    limit: int = 100,
+    sqlite_manager: SQLiteManager = Depends(get_sqlite),
+):
     """获取指定表的数据"""
     try:
-        if sqlite_manager is None:
-            raise HTTPException(status_code=500, detail="数据库管理器未初始化")
-        
         # 验证表名是否存在（防止SQL注入）
-        with sqlite3.connect(sqlite_manager.db_path) as conn:
+        def fetch_table(conn):
             cursor = conn.cursor()
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
             if not cursor.fetchone():
@@ -84,6 +70,9 @@ async def get_table_data(table_name: str, limit: int = 100):
             # 获取总行数
             cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
             total_count = cursor.fetchone()[0]
+            return columns, rows, total_count
+            
+        columns, rows, total_count = await sqlite_manager.read(fetch_table)
             
         # 将数据转换为字典格式
         data = []
@@ -113,12 +102,14 @@ async def get_table_data(table_name: str, limit: int = 100):
 
 
 @router.get("/image-vectors")
-async def get_image_vectors(limit: int = 100, offset: int = 0, search: Optional[str] = None):
+async def get_image_vectors(
+    limit: int = 100,
+    offset: int = 0,
+    search: Optional[str] = None,
+    sqlite_manager: SQLiteManager = Depends(get_sqlite),
+):
     """分页获取图片向量存储信息"""
     try:
-        if sqlite_manager is None:
-            raise HTTPException(status_code=500, detail="数据库管理器未初始化")
-
         result = sqlite_manager.get_image_vector_records(limit=limit, offset=offset, search=search)
         return {
             "status": "success",
@@ -0,0 +1,12 @@
+from fastapi import HTTPException, Request
+
+from service.sqlite_service import SQLiteManager
+
+
+# 依赖函数定义为 async，FastAPI 直接在事件循环内调用，不会为每个请求派发到线程池
+async def get_sqlite(request: Request) -> SQLiteManager:
+    """读取 lifespan 挂在 app.state 上的数据库管理器，尚未初始化时返回 500"""
+    sqlite_manager = getattr(request.app.state, "sqlite", None)
+    if sqlite_manager is None:
+        raise HTTPException(status_code=500, detail="数据库管理器未初始化")
+    return sqlite_manager
@@ -13,6 +13,7 @@ import tempfile
 from typing import Dict, Any
 from urllib.parse import unquote
 import requests
+import numpy as np
 from PIL import Image
 import pypandoc
 from docx import Document
@@ -178,6 +179,11 @@ _pdf_parse_lock = threading.Lock()
 
 CHINA_TZ = timezone(timedelta(hours=8))
 
+# 计算文件哈希时每次读取的字节数
+FILE_HASH_BUFFER_SIZE = 1024 * 1024
+# 文档入库时每批编码的文本块数，每批完成后推送一次进度
+EMBEDDING_BATCH_SIZE = 32
+
 
 def _normalize_timestamp(value: Optional[Any]) -> Tuple[Optional[str], Optional[str]]:
     """将时间值标准化为可读字符串和 ISO8601 表示。"""
@@ -442,33 +448,6 @@ async def generate_document_summary_if_enabled(
 
 
 
-def _schedule_status_broadcast(payload: Dict[str, Any], keep_latest: bool = True) -> None:
-    """Safely broadcast status payloads from sync contexts without blocking."""
-    async def _send() -> None:
-        try:
-            await status_broadcaster.broadcast(payload, keep_latest=keep_latest)
-        except Exception:
-            logger.debug("广播状态信息失败", exc_info=True)
-
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
-
-    if loop and loop.is_running():
-        loop.create_task(_send())
-        return
-
-    try:
-        asyncio.run(_send())
-    except RuntimeError:
-        new_loop = asyncio.new_event_loop()
-        try:
-            new_loop.run_until_complete(_send())
-        finally:
-            new_loop.close()
-
-
 def _broadcast_pdf_task_state(task_id: str) -> None:
     with _pdf_parse_lock:
         task = _pdf_parse_tasks.get(task_id)
@@ -482,7 +461,8 @@ def _broadcast_pdf_task_state(task_id: str) -> None:
         "task_id": task_id,
         **snapshot,
     }
-    _schedule_status_broadcast(payload, keep_latest=False)
+    # 解析进度更新频繁，按任务合并后再广播
+    status_broadcaster.queue(f"pdf_parse:{task_id}", payload)
 
 
 async def _broadcast_document_progress(
@@ -550,25 +530,36 @@ def read_text_file_with_fallback(file_path: pathlib.Path) -> str:
         return f.read()
 
 
+# Markdown 转纯文本的替换规则，模块加载时编译一次；按顺序依次应用，顺序即语义
+_MARKDOWN_PLAIN_TEXT_RULES = tuple(
+    (re.compile(pattern, flags), replacement)
+    for pattern, replacement, flags in (
+        (r'^---[\s\S]*?---\s*', '', re.MULTILINE),  # front matter
+        (r'```[\s\S]*?```', '\n', 0),
+        (r'`([^`]+)`', r'\1', 0),
+        (r'!\[([^\]]*)\]\([^\)]+\)', r'\1', 0),
+        (r'\[([^\]]+)\]\([^\)]+\)', r'\1', 0),
+        (r'^#{1,6}\s*', '', re.MULTILINE),
+        (r'>\s?', '', 0),
+        (r'\*\*([^*]+)\*\*', r'\1', 0),
+        (r'__([^_]+)__', r'\1', 0),
+        (r'\*([^*]+)\*', r'\1', 0),
+        (r'_([^_]+)_', r'\1', 0),
+        (r'~~([^~]+)~~', r'\1', 0),
+        (r'(?m)^\s*[-*+]\s+', '', 0),
+        (r'(?m)^\s*\d+\.\s+', '', 0),
+        (r'\s+\n', '\n', 0),
+    )
+)
+_MULTIPLE_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
 def markdown_to_plain_text(markdown_text: str) -> str:
     text = markdown_text
-    text = re.sub(r'^---[\s\S]*?---\s*', '', text, flags=re.MULTILINE)  # front matter
-    text = re.sub(r'```[\s\S]*?```', '\n', text)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', r'\1', text)
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'>\s?', '', text)
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'\*([^*]+)\*', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    text = re.sub(r'~~([^~]+)~~', r'\1', text)
-    text = re.sub(r'(?m)^\s*[-*+]\s+', '', text)
-    text = re.sub(r'(?m)^\s*\d+\.\s+', '', text)
-    text = re.sub(r'\s+\n', '\n', text)
+    for pattern, replacement in _MARKDOWN_PLAIN_TEXT_RULES:
+        text = pattern.sub(replacement, text)
     text = text.replace('\r\n', '\n').replace('\r', '\n')
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _MULTIPLE_BLANK_LINES_RE.sub('\n\n', text)
     return text.strip()
 
 
@@ -875,7 +866,7 @@ def build_pdf_markdown_output_path(pdf_path: pathlib.Path) -> pathlib.Path:
 
 
 def _run_pdf_parse_task(task_id: str, pdf_path: pathlib.Path) -> None:
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     try:
         relative_pdf_path = str(pdf_path.resolve().relative_to(project_root))
     except ValueError:
@@ -1048,7 +1039,7 @@ def store_document_images(document_id: int, file_path: pathlib.Path, images: Lis
         logger.error("加载CLIP模型失败: %s", exc)
         raise HTTPException(status_code=500, detail=f"加载图片嵌入模型失败: {exc}") from exc
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     images_root = DatabaseConfig.IMAGES_DIR
 
     # 创建唯一的图片存储文件夹
@@ -1073,11 +1064,12 @@ def store_document_images(document_id: int, file_path: pathlib.Path, images: Lis
     relative_folder = str(dest_folder.relative_to(project_root))
 
     stored_records: List[Dict[str, Any]] = []
-    vectors: List[List[float]] = []
+    vectors: List[Any] = []
     faiss_metadata: List[Dict[str, Any]] = []
     cleanup_dirs: Set[pathlib.Path] = set()
 
     try:
+        copied_images: List[Tuple[int, Dict[str, Any], str, pathlib.Path]] = []
         for index, info in enumerate(images):
             temp_dir = info.get('temp_dir')
             if temp_dir:
@@ -1099,10 +1091,18 @@ def store_document_images(document_id: int, file_path: pathlib.Path, images: Lis
                 logger.warning("复制图片失败 %s -> %s: %s", source_path_path, dest_path, exc)
                 continue
 
-            try:
-                vector = clip_service.encode_image_path(dest_path)
-            except Exception as exc:  # pylint: disable=broad-except
-                logger.error("向量化图片失败 %s: %s", dest_path, exc)
+            copied_images.append((index, info, dest_name, dest_path))
+
+        # 同一文档的图片一次性批量送入 CLIP，避免逐张 batch_size=1 前向
+        try:
+            encoded_vectors = clip_service.encode_image_paths([item[3] for item in copied_images])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("批量向量化图片失败: %s", exc)
+            encoded_vectors = [None] * len(copied_images)
+
+        for (index, info, dest_name, dest_path), vector in zip(copied_images, encoded_vectors):
+            if vector is None:
+                logger.error("向量化图片失败 %s", dest_path)
                 try:
                     dest_path.unlink()
                 except OSError:
@@ -1290,7 +1290,7 @@ def normalize_project_relative_path(path_value: str) -> str:
     if not trimmed:
         raise HTTPException(status_code=400, detail="文件路径不能为空")
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     candidate_path = pathlib.Path(trimmed)
 
     if candidate_path.is_absolute():
@@ -1313,7 +1313,7 @@ async def run_folder_tasks(
     on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
 ) -> List[Dict[str, Any]]:
     semaphore = asyncio.Semaphore(max(1, min(max_concurrency, len(files))))
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     results: List[Dict[str, Any]] = []
 
     def to_relative(path: pathlib.Path) -> Optional[str]:
@@ -1483,7 +1483,7 @@ async def get_folder_upload_status(request: FolderUploadStatusRequest):
         else:
             normalized_path = f"data/{trimmed.rstrip('/')}"
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     data_root = DatabaseConfig.DATABASE_DIR.resolve()
 
     folder_relative = pathlib.Path(normalized_path)
@@ -1554,7 +1554,7 @@ async def upload_document(request: FileUploadRequest):
             raise HTTPException(status_code=400, detail=f"路径不是文件: {request.file_path}")
         
         # 2. 获取项目根目录并标准化路径
-        project_root = ServerConfig.PROJECT_ROOT.resolve()
+        project_root = ServerConfig.PROJECT_ROOT
         file_path = file_path.resolve()
         
         # 验证文件是否在项目根目录内
@@ -1833,7 +1833,7 @@ async def upload_document(request: FileUploadRequest):
                 if embedding_svc is None:
                     raise HTTPException(status_code=500, detail="嵌入服务未初始化")
 
-                embeddings = []
+                embeddings_array: Optional[np.ndarray] = None
                 total_chunks = len(chunks)
                 await _broadcast_document_progress(
                     relative_file_path,
@@ -1843,27 +1843,31 @@ async def upload_document(request: FileUploadRequest):
                     document_id=document_id,
                     total_chunks=total_chunks
                 )
-                update_interval = max(1, total_chunks // 5) if total_chunks else 1
-                for index, chunk in enumerate(chunks, start=1):
-                    try:
-                        embedding = embedding_svc.encode_text(chunk)
-                        embeddings.append(embedding)
-                        logger.debug(f"已生成第 {index} 个文本块的嵌入向量")
-                        if total_chunks:
-                            if index == total_chunks or index % update_interval == 0:
-                                ratio = index / total_chunks
-                                await _broadcast_document_progress(
-                                    relative_file_path,
-                                    stage="生成嵌入",
-                                    message=f"已生成 {index}/{total_chunks} 个文本向量",
-                                    progress=0.62 + 0.2 * ratio,
-                                    document_id=document_id,
-                                    processed_chunks=index,
-                                    total_chunks=total_chunks
-                                )
-                    except Exception as e:
-                        logger.error(f"生成嵌入向量失败: {str(e)}")
-                        raise HTTPException(status_code=500, detail=f"生成嵌入向量失败: {str(e)}")
+                # 按批编码并写入预分配的结果矩阵，不再逐块编码后整体复制；编码放到线程中执行，不阻塞事件循环
+                try:
+                    for start in range(0, total_chunks, EMBEDDING_BATCH_SIZE):
+                        batch = chunks[start:start + EMBEDDING_BATCH_SIZE]
+                        batch_vectors = await asyncio.to_thread(embedding_svc.encode_texts_np, batch)
+                        if embeddings_array is None:
+                            embeddings_array = np.empty((total_chunks, batch_vectors.shape[1]), dtype=np.float32)
+                        embeddings_array[start:start + len(batch)] = batch_vectors
+                        index = start + len(batch)
+                        logger.debug(f"已生成前 {index} 个文本块的嵌入向量")
+                        ratio = index / total_chunks
+                        await _broadcast_document_progress(
+                            relative_file_path,
+                            stage="生成嵌入",
+                            message=f"已生成 {index}/{total_chunks} 个文本向量",
+                            progress=0.62 + 0.2 * ratio,
+                            document_id=document_id,
+                            processed_chunks=index,
+                            total_chunks=total_chunks
+                        )
+                except Exception as e:
+                    logger.error(f"生成嵌入向量失败: {str(e)}")
+                    raise HTTPException(status_code=500, detail=f"生成嵌入向量失败: {str(e)}")
+                assert embeddings_array is not None
+                embeddings = embeddings_array
 
                 logger.info(f"嵌入向量生成完成，共 {len(embeddings)} 个向量")
                 await _broadcast_document_progress(
@@ -1891,9 +1895,9 @@ async def upload_document(request: FileUploadRequest):
                     }
                     vector_metadata.append(metadata)
 
-                import numpy as np
-                embeddings_array = np.array(embeddings, dtype=np.float32)
                 vector_ids = faiss_manager.add_vectors(embeddings_array, vector_metadata)
+                # 文本块记录引用向量ID，写入数据库前先让索引落盘，避免崩溃后引用不存在的向量
+                await asyncio.to_thread(faiss_manager.flush)
                 logger.info(f"向量已存储到Faiss索引，向量ID列表: {vector_ids}")
                 await _broadcast_document_progress(
                     relative_file_path,
@@ -1990,6 +1994,7 @@ async def upload_document(request: FileUploadRequest):
                             })
                             try:
                                 summary_vector_id = faiss_manager.add_vector(summary_embedding, summary_metadata)
+                                await asyncio.to_thread(faiss_manager.flush)
                             except Exception as exc:  # pylint: disable=broad-except
                                 summary_vector_id = None
                                 logger.warning("写入文档主题向量失败: %s", exc)
@@ -2114,7 +2119,7 @@ async def parse_pdf_to_markdown(
         else:
             pdf_path = pdf_path.resolve()
 
-        project_root = ServerConfig.PROJECT_ROOT.resolve()
+        project_root = ServerConfig.PROJECT_ROOT
         try:
             relative_pdf_path = str(pdf_path.relative_to(project_root))
         except ValueError as exc:
@@ -2180,7 +2185,7 @@ async def mount_folder(request: FolderOperationRequest) -> Dict[str, Any]:
 
     logger.info("开始批量挂载文件夹: %s, 文件数量: %d", folder_path, len(files))
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     folder_relative = str(folder_path.resolve().relative_to(project_root))
     total_files = len(files)
     await _broadcast_folder_progress(
@@ -2258,7 +2263,7 @@ async def remount_folder(request: FolderRemountRequest) -> Dict[str, Any]:
     logger.info("开始批量重新挂载文件夹: %s, 文件数量: %d", folder_path, len(files))
 
     force = request.force_reupload
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     folder_relative = str(folder_path.resolve().relative_to(project_root))
     total_files = len(files)
     await _broadcast_folder_progress(
@@ -2369,7 +2374,7 @@ async def unmount_folder(request: FolderOperationRequest) -> Dict[str, Any]:
 
     logger.info("开始批量取消挂载文件夹: %s, 文件数量: %d", folder_path, len(files))
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     folder_relative = str(folder_path.resolve().relative_to(project_root))
     total_files = len(files)
     await _broadcast_folder_progress(
@@ -2759,7 +2764,7 @@ async def reupload_document(request: ReuploadDocumentRequest):
             raise HTTPException(status_code=400, detail=f"路径不是文件: {request.file_path}")
         
         # 2. 获取项目根目录并标准化路径
-        project_root = ServerConfig.PROJECT_ROOT.resolve()
+        project_root = ServerConfig.PROJECT_ROOT
         file_path = file_path.resolve()
         
         # 验证文件是否在项目根目录内
@@ -2871,9 +2876,15 @@ async def reupload_document(request: ReuploadDocumentRequest):
         raise HTTPException(status_code=500, detail=f"文档重新上传失败: {str(e)}")
 
 def calculate_file_hash(file_path: pathlib.Path) -> str:
-    """计算文件哈希值"""
+    """计算文件哈希值（SHA-256，与已入库的 file_hash 保持一致）"""
     hash_sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_sha256.update(chunk)
+    # 复用同一块 1 MiB 缓冲区 readinto，减少系统调用次数与每块的 bytes 分配
+    buffer = bytearray(FILE_HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hash_sha256.update(view[:size])
     return hash_sha256.hexdigest()
@@ -1,19 +1,24 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List, Optional, Set, Tuple
+import asyncio
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 import numpy as np
 import statistics
 import re
-from service.faiss_service import FaissManager
-from service.image_faiss_service import ImageFaissManager
-from service.embedding_service import EmbeddingService
 from service.clip_embedding_service import get_clip_embedding_service
 from model.faiss_request_model import SearchRequest
 import logging
-from service.reranker_service import RerankerService
-from service.bm25s_service import BM25SService
 from config.config import ServerConfig
-from service.sqlite_service import SQLiteManager
+from api.responses import NumpyORJSONResponse
+
+if TYPE_CHECKING:
+    # 服务实例由 init_faiss_api 注入，这些类型只用于注解，避免导入时加载模型依赖
+    from service.bm25s_service import BM25SService
+    from service.embedding_service import EmbeddingService
+    from service.faiss_service import FaissManager
+    from service.image_faiss_service import ImageFaissManager
+    from service.reranker_service import RerankerService
+    from service.sqlite_service import SQLiteManager
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/faiss", tags=["faiss"])
@@ -140,6 +145,71 @@ def compute_final_confidence(result: Dict[str, Any]) -> float:
     return 0.0
 
 
+def _score_column(entries: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """抽取单个分数字段为 float 数组，缺失或无法解析的值记为 NaN。"""
+
+    def _as_float(value: Any) -> float:
+        if value is None:
+            return np.nan
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    return np.fromiter(
+        (_as_float(entry.get(field)) for entry in entries),
+        dtype=np.float64,
+        count=len(entries),
+    )
+
+
+def compute_final_confidence_batch(entries: List[Dict[str, Any]]) -> np.ndarray:
+    """批量计算最终置信度，逐项结果与 compute_final_confidence 保持一致。"""
+    count = len(entries)
+    if not count:
+        return np.zeros(0, dtype=np.float64)
+
+    exact = np.fromiter(
+        (
+            'exact' in (entry.get('sources') or []) or entry.get('source') == 'exact'
+            for entry in entries
+        ),
+        dtype=bool,
+        count=count,
+    )
+    # quality/mixed 只要字段存在就会被采用，无法解析的值按 0 处理
+    quality_present = np.fromiter(
+        (entry.get('quality_score') is not None for entry in entries), dtype=bool, count=count
+    )
+    mixed_present = np.fromiter(
+        (entry.get('mixed_score') is not None for entry in entries), dtype=bool, count=count
+    )
+
+    rerank = _score_column(entries, 'rerank_score')
+    quality = _score_column(entries, 'quality_score')
+    mixed = _score_column(entries, 'mixed_score')
+    embedding = _score_column(entries, 'embedding_score')
+
+    with np.errstate(invalid='ignore'):
+        return np.select(
+            [
+                exact,
+                ~np.isnan(rerank),
+                quality_present,
+                mixed_present,
+                ~np.isnan(embedding),
+            ],
+            [
+                1.0,
+                np.clip(rerank, 0.0, 1.0),
+                np.nan_to_num(np.clip(quality, 0.0, 1.0), nan=0.0),
+                np.nan_to_num(np.clip(mixed, 0.0, 1.0), nan=0.0),
+                np.clip((embedding + 1.0) / 2.0, 0.0, 1.0),
+            ],
+            default=0.0,
+        )
+
+
 def filter_semantic_candidates(
     candidates: List[Dict[str, Any]],
     bm25_weight: float,
@@ -184,6 +254,80 @@ def filter_semantic_candidates(
     return filtered
 
 
+CANDIDATE_SCORE_FIELDS = ('embedding_norm', 'bm25_norm', 'rerank_norm', 'clip_norm', 'final_score')
+
+# 阈值元组顺序: (rerank, clip, dense, lexical, final)
+TEXT_STRONG_THRESHOLDS = (
+    TEXT_STRONG_RERANK_THRESHOLD,
+    TEXT_STRONG_CLIP_THRESHOLD,
+    TEXT_STRONG_DENSE_THRESHOLD,
+    TEXT_STRONG_LEXICAL_THRESHOLD,
+    TEXT_STRONG_FINAL_THRESHOLD,
+)
+TEXT_CONFIDENT_THRESHOLDS = (
+    TEXT_STRONG_RERANK_THRESHOLD * 0.9,
+    TEXT_STRONG_CLIP_THRESHOLD * 0.9,
+    TEXT_STRONG_DENSE_THRESHOLD,
+    TEXT_STRONG_LEXICAL_THRESHOLD * 0.9,
+    TEXT_STRONG_FINAL_THRESHOLD,
+)
+
+
+def build_candidate_score_columns(candidates: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """将候选分数整理为列式数组，缺失值记为 NaN。"""
+    count = len(candidates)
+    columns: Dict[str, np.ndarray] = {}
+    for field in CANDIDATE_SCORE_FIELDS:
+        values = (candidate.get(field) for candidate in candidates)
+        columns[field] = np.fromiter(
+            (np.nan if value is None else value for value in values),
+            dtype=np.float64,
+            count=count,
+        )
+    # final_score 缺失时按 0 处理，与逐条判断时的 `or 0.0` 保持一致
+    columns['final_score'] = np.nan_to_num(columns['final_score'], nan=0.0)
+    return columns
+
+
+def compute_text_candidate_masks(
+    columns: Dict[str, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """基于列式分数一次性计算候选的通过、强信号与置信掩码。
+
+    NaN 与任意阈值比较均为 False，因此缺失分量天然不会满足条件。
+    """
+    emb_norm = columns['embedding_norm']
+    bm_norm = columns['bm25_norm']
+    rerank_norm = columns['rerank_norm']
+    clip_norm = columns['clip_norm']
+    final_score = columns['final_score']
+    min_component = TEXT_MIN_COMPONENT_SCORE
+
+    def _signal_mask(thresholds: Tuple[float, float, float, float, float]) -> np.ndarray:
+        rerank_t, clip_t, dense_t, lexical_t, final_t = thresholds
+        return (
+            (rerank_norm >= rerank_t)
+            | (clip_norm >= clip_t)
+            | ((emb_norm >= dense_t) & (bm_norm >= lexical_t))
+            | (final_score >= final_t)
+        )
+
+    with np.errstate(invalid='ignore'):
+        # 先用最廉价的最终分数阈值筛掉大部分候选，只对幸存者计算分量条件；
+        # 任一分量达标即意味着最大分量达标，无需再单独计算 nanmax
+        passes = final_score >= TEXT_MIN_FINAL_SCORE
+        survivors = np.flatnonzero(passes)
+        if survivors.size:
+            passes[survivors] = (
+                (rerank_norm[survivors] >= min_component)
+                | (clip_norm[survivors] >= min_component)
+                | ((emb_norm[survivors] >= min_component) & (bm_norm[survivors] >= min_component))
+            )
+        strong = _signal_mask(TEXT_STRONG_THRESHOLDS)
+        confident = _signal_mask(TEXT_CONFIDENT_THRESHOLDS)
+    return passes, strong, confident
+
+
 def get_candidate_content(meta: Dict[str, Any]) -> str:
     content = meta.get('chunk_text') or meta.get('text') or meta.get('content') or ''
     return str(content)
@@ -219,6 +363,14 @@ def deduplicate_results(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return deduped
 
 
+def _discard_future(future: asyncio.Future) -> None:
+    """放弃不再等待的后台任务：未完成则取消，已完成则取走异常，避免 "exception was never retrieved" 告警"""
+    if not future.done():
+        future.cancel()
+    elif not future.cancelled():
+        future.exception()
+
+
 def search_image_vectors(
     query_text: str,
     top_k: int,
@@ -347,16 +499,14 @@ def search_image_vectors(
         seen_prompts.add(normalized)
 
     try:
-        query_embeddings = clip_service.encode_texts(unique_prompts)
+        query_embeddings_np = clip_service.encode_texts_np(unique_prompts)
     except Exception as exc:  # pylint: disable=broad-except
         logger.error("生成CLIP文本向量失败: %s", exc)
         return []
 
-    if not query_embeddings:
+    if not len(query_embeddings_np):
         return []
 
-    query_embeddings_np = [np.asarray(vec, dtype=np.float32) for vec in query_embeddings]
-
     aggregate_vector = np.mean(query_embeddings_np, axis=0)
     aggregate_norm = np.linalg.norm(aggregate_vector)
     if aggregate_norm <= 0:
@@ -373,7 +523,7 @@ def search_image_vectors(
         logger.error("图片向量检索失败: %s", exc)
         return []
 
-    project_root = ServerConfig.PROJECT_ROOT.resolve()
+    project_root = ServerConfig.PROJECT_ROOT
     chunk_cache: Dict[Tuple[int, int], Optional[Dict[str, Any]]] = {}
 
     def _truncate_text(text: str, limit: int = IMAGE_CONTEXT_SNIPPET) -> str:
@@ -432,15 +582,16 @@ def search_image_vectors(
         if candidate_norm > 0:
             candidate_vector = candidate_vector / candidate_norm
 
-        cosine_scores = [float(np.dot(candidate_vector, query_vec)) for query_vec in query_embeddings_np]
-        if not cosine_scores:
+        # 与全部提示词向量的余弦相似度一次矩阵-向量乘得到
+        cosine_scores = query_embeddings_np @ candidate_vector
+        if not cosine_scores.size:
             continue
 
-        best_cosine = max(cosine_scores)
+        best_cosine = float(cosine_scores.max())
         if best_cosine < threshold:
             continue
 
-        average_cosine = sum(cosine_scores) / len(cosine_scores)
+        average_cosine = float(cosine_scores.mean())
         combined_cosine = 0.65 * best_cosine + 0.35 * average_cosine
         normalized_confidence = clamp_unit((combined_cosine + 1.0) / 2.0)
 
@@ -793,12 +944,12 @@ def search_image_vectors(
     return matches
 
 def init_faiss_api(
-    faiss_mgr: FaissManager,
-    embedding_svc: EmbeddingService,
-    image_faiss_mgr: ImageFaissManager,
-    bm25s_svc: Optional[BM25SService] = None,
-    reranker_svc: Optional[RerankerService] = None,
-    sqlite_svc: Optional[SQLiteManager] = None,
+    faiss_mgr: "FaissManager",
+    embedding_svc: "EmbeddingService",
+    image_faiss_mgr: "ImageFaissManager",
+    bm25s_svc: Optional["BM25SService"] = None,
+    reranker_svc: Optional["RerankerService"] = None,
+    sqlite_svc: Optional["SQLiteManager"] = None,
 ) -> None:
     """初始化Faiss API"""
 
@@ -885,9 +1036,10 @@ async def get_faiss_statistics() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"获取统计信息失败: {str(e)}")
 
 
-@router.post("/search")
-async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
+@router.post("/search", response_class=NumpyORJSONResponse)
+async def search_vectors_post(request: SearchRequest) -> NumpyORJSONResponse:
     """综合字符匹配与语义检索的搜索接口，融合稀疏、稠密与重排序信号。"""
+    image_future: Optional[asyncio.Future] = None
     try:
         if faiss_manager is None:
             raise HTTPException(status_code=500, detail="Faiss manager not initialized")
@@ -900,6 +1052,17 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
         if not query_text:
             raise HTTPException(status_code=400, detail="查询内容不能为空")
 
+        # 图片检索与文本检索互不依赖，提前提交到线程池与下方文本流程并行执行
+        image_threshold = 0.3
+        loop = asyncio.get_running_loop()
+        image_future = loop.run_in_executor(
+            None,
+            search_image_vectors,
+            query_text,
+            top_k,
+            image_threshold,
+        )
+
         bm25_weight_input = (
             request.bm25s_weight if request.bm25s_weight is not None else ServerConfig.BM25S_WEIGHT
         )
@@ -1170,7 +1333,6 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
         for idx, exact_entry in enumerate(exact_results, start=1):
             exact_entry['rank'] = idx
 
-        semantic_results: List[Dict[str, Any]] = []
         text_candidates: List[Dict[str, Any]] = []
         bm25_used = False
         rerank_used = False
@@ -1317,13 +1479,13 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
 
             if clip_service is not None and candidates:
                 try:
-                    query_clip_vectors = clip_service.encode_texts([query_text[:CLIP_TEXT_TRUNCATE]])
+                    query_clip_vectors = clip_service.encode_texts_np([query_text[:CLIP_TEXT_TRUNCATE]])
                 except Exception as exc:  # pylint: disable=broad-except
                     logger.debug("CLIP查询向量生成失败: %s", exc)
-                    query_clip_vectors = []
+                    query_clip_vectors = None
 
-                if query_clip_vectors:
-                    query_clip_vec = np.asarray(query_clip_vectors[0], dtype=np.float32)
+                if query_clip_vectors is not None and len(query_clip_vectors):
+                    query_clip_vec = query_clip_vectors[0]
                     clip_payload: List[Tuple[int, str]] = []
                     for idx, candidate in enumerate(candidates[:CLIP_CANDIDATE_LIMIT]):
                         content = candidate.get('content') or ''
@@ -1335,13 +1497,13 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
                     if clip_payload:
                         try:
                             clip_texts = [text for _, text in clip_payload]
-                            clip_vectors = clip_service.encode_texts(clip_texts)
+                            clip_vectors = clip_service.encode_texts_np(clip_texts)
                         except Exception as exc:  # pylint: disable=broad-except
                             logger.debug("CLIP候选向量生成失败: %s", exc)
-                            clip_vectors = []
+                            clip_vectors = None
 
-                        if clip_vectors:
-                            doc_matrix = np.asarray(clip_vectors, dtype=np.float32)
+                        if clip_vectors is not None and len(clip_vectors):
+                            doc_matrix = clip_vectors
                             if doc_matrix.ndim == 1:
                                 doc_matrix = doc_matrix.reshape(1, -1)
                             if doc_matrix.size and doc_matrix.shape[1] == query_clip_vec.shape[0]:
@@ -1476,38 +1638,15 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
             sources = sorted(candidate.get('sources') or [])
             breakdown = candidate.get('score_breakdown') or {}
             weights = candidate.get('score_weights') or {}
-            result = build_result(
-                candidate.get('meta', {}),
-                'semantic',
-                {
-                    'rank': rank,
-                    'embedding_score': candidate.get('embedding_score'),
-                    'embedding_score_normalized': candidate.get('embedding_norm'),
-                    'bm25s_raw_score': candidate.get('bm25_raw'),
-                    'bm25s_score': candidate.get('bm25_norm'),
-                    'rerank_score': candidate.get('rerank_raw'),
-                    'rerank_score_normalized': candidate.get('rerank_norm'),
-                    'clip_score': candidate.get('clip_score'),
-                    'clip_score_normalized': candidate.get('clip_norm'),
-                    'clip_rank': candidate.get('clip_rank'),
-                    'mixed_score': candidate.get('final_score'),
-                    'quality_score': candidate.get('final_score'),
-                    'final_score': candidate.get('final_score'),
-                    'dense_rank': candidate.get('dense_rank'),
-                    'lexical_rank': candidate.get('lexical_rank'),
-                    'rerank_rank': candidate.get('rerank_rank'),
-                    'score_breakdown': breakdown or None,
-                    'score_weights': weights or None,
-                    'sources': sources,
-                },
-            )
+            final_score = candidate.get('final_score')
+            # 指标字段与结果顶层字段同源，只读取一次候选分数
             metrics = {
                 'rank': rank,
                 'embedding_score': candidate.get('embedding_score'),
                 'embedding_score_normalized': candidate.get('embedding_norm'),
                 'bm25s_score': candidate.get('bm25_norm'),
                 'bm25s_raw_score': candidate.get('bm25_raw'),
-                'mixed_score': candidate.get('final_score'),
+                'mixed_score': final_score,
                 'rerank_score': candidate.get('rerank_raw'),
                 'rerank_score_normalized': candidate.get('rerank_norm'),
                 'dense_rank': candidate.get('dense_rank'),
@@ -1517,141 +1656,126 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
                 'clip_score_normalized': candidate.get('clip_norm'),
                 'clip_rank': candidate.get('clip_rank'),
             }
+            overrides = dict(metrics)
+            overrides.update(
+                {
+                    'quality_score': final_score,
+                    'final_score': final_score,
+                    'score_breakdown': breakdown or None,
+                    'score_weights': weights or None,
+                    'sources': sources,
+                }
+            )
+            result = build_result(candidate.get('meta', {}), 'semantic', overrides)
             result.setdefault('metrics', {})
             result['metrics']['semantic'] = metrics
             return result
 
-        def _candidate_passes(candidate: Dict[str, Any]) -> bool:
-            emb_norm = candidate.get('embedding_norm')
-            bm_norm = candidate.get('bm25_norm')
-            rerank_norm = candidate.get('rerank_norm')
-            clip_norm = candidate.get('clip_norm')
-
-            components = [comp for comp in (emb_norm, bm_norm, rerank_norm, clip_norm) if comp is not None]
-            if not components:
-                return False
-
-            if max(components) < TEXT_MIN_COMPONENT_SCORE:
-                return False
-
-            final_score = candidate.get('final_score') or 0.0
-            if final_score < TEXT_MIN_FINAL_SCORE:
-                return False
-
-            rerank_ok = rerank_norm is not None and rerank_norm >= TEXT_MIN_COMPONENT_SCORE
-            clip_ok = clip_norm is not None and clip_norm >= TEXT_MIN_COMPONENT_SCORE
-            dense_ok = emb_norm is not None and emb_norm >= TEXT_MIN_COMPONENT_SCORE
-            lexical_ok = bm_norm is not None and bm_norm >= TEXT_MIN_COMPONENT_SCORE
-
-            if rerank_ok or clip_ok:
-                return True
-            if dense_ok and lexical_ok:
-                return True
-            return False
-
-        def _is_strong_candidate(candidate: Dict[str, Any]) -> bool:
-            rerank_norm = candidate.get('rerank_norm') or 0.0
-            clip_norm = candidate.get('clip_norm') or 0.0
-            emb_norm = candidate.get('embedding_norm') or 0.0
-            bm_norm = candidate.get('bm25_norm') or 0.0
-            final_score = candidate.get('final_score') or 0.0
-            return (
-                rerank_norm >= TEXT_STRONG_RERANK_THRESHOLD
-                or clip_norm >= TEXT_STRONG_CLIP_THRESHOLD
-                or (emb_norm >= TEXT_STRONG_DENSE_THRESHOLD and bm_norm >= TEXT_STRONG_LEXICAL_THRESHOLD)
-                or final_score >= TEXT_STRONG_FINAL_THRESHOLD
-            )
-
-        def _is_confident_candidate(candidate: Dict[str, Any]) -> bool:
-            rerank_norm = candidate.get('rerank_norm') or 0.0
-            clip_norm = candidate.get('clip_norm') or 0.0
-            emb_norm = candidate.get('embedding_norm') or 0.0
-            bm_norm = candidate.get('bm25_norm') or 0.0
-            final_score = candidate.get('final_score') or 0.0
-
-            rerank_confident = rerank_norm >= (TEXT_STRONG_RERANK_THRESHOLD * 0.9)
-            clip_confident = clip_norm >= (TEXT_STRONG_CLIP_THRESHOLD * 0.9)
-            dense_confident = emb_norm >= TEXT_STRONG_DENSE_THRESHOLD
-            lexical_confident = bm_norm >= (TEXT_STRONG_LEXICAL_THRESHOLD * 0.9)
-            final_confident = final_score >= TEXT_STRONG_FINAL_THRESHOLD
-
-            return (
-                rerank_confident
-                or clip_confident
-                or (dense_confident and lexical_confident)
-                or final_confident
-            )
-
-        filtered_candidates = [candidate for candidate in text_candidates if _candidate_passes(candidate)]
+        score_columns = build_candidate_score_columns(text_candidates)
+        passes_mask, strong_mask, confident_mask = compute_text_candidate_masks(score_columns)
+        passing_indices = np.flatnonzero(passes_mask)
+        filtered_candidates = [text_candidates[idx] for idx in passing_indices]
 
         desired_limit = max(top_k, 6)
         selected_candidates: List[Dict[str, Any]] = []
 
         if filtered_candidates:
+            top_index = passing_indices[0]
             top_candidate = filtered_candidates[0]
-            if _is_strong_candidate(top_candidate):
+            if strong_mask[top_index]:
                 relative_cutoff = max(
                     TEXT_MIN_FINAL_SCORE,
                     (top_candidate.get('final_score') or 0.0) * TEXT_RELATIVE_KEEP_FACTOR,
                 )
-                confident_candidates = [
-                    candidate for candidate in filtered_candidates
-                    if (candidate.get('final_score') or 0.0) >= relative_cutoff and _is_confident_candidate(candidate)
-                ]
+                keep_mask = (
+                    passes_mask
+                    & confident_mask
+                    & (score_columns['final_score'] >= relative_cutoff)
+                )
+                confident_candidates = [text_candidates[idx] for idx in np.flatnonzero(keep_mask)]
                 if not confident_candidates:
                     confident_candidates = [top_candidate]
-                selected_candidates = confident_candidates
+                selected_candidates = confident_candidates[:desired_limit]
             else:
                 selected_candidates = filtered_candidates[:desired_limit]
 
+        min_final_score = TEXT_MIN_FINAL_SCORE
         if len(selected_candidates) < desired_limit:
+            # 候选字典在本次请求内身份稳定，按 id() 判重避免线性扫描
+            selected_ids = {id(candidate) for candidate in selected_candidates}
             for candidate in text_candidates:
-                if candidate in selected_candidates:
+                if id(candidate) in selected_ids:
                     continue
                 final_score = candidate.get('final_score') or 0.0
-                if final_score >= TEXT_MIN_FINAL_SCORE:
+                if final_score >= min_final_score:
                     selected_candidates.append(candidate)
+                    selected_ids.add(id(candidate))
                 if len(selected_candidates) >= desired_limit:
                     break
 
-        selected_candidates = [
-            candidate
-            for candidate in selected_candidates[:desired_limit]
-            if (candidate.get('final_score') or 0.0) >= TEXT_MIN_FINAL_SCORE
-        ]
-        seen_semantic_keys: Set[Tuple] = set()
+        # 候选在收集阶段已记录 chunk key，这里直接复用并按 key 去重
+        unique_candidates: Dict[Tuple, Dict[str, Any]] = {}
         for candidate in selected_candidates:
-            key = build_chunk_key(candidate.get('meta', {}))
-            if key in seen_semantic_keys:
+            if (candidate.get('final_score') or 0.0) < min_final_score:
                 continue
-            rank = len(semantic_results) + 1
-            semantic_results.append(serialize_candidate(candidate, rank))
-            seen_semantic_keys.add(key)
+            key = candidate.get('key') or build_chunk_key(candidate.get('meta', {}))
+            unique_candidates.setdefault(key, candidate)
+        semantic_results: List[Dict[str, Any]] = [
+            serialize_candidate(candidate, rank)
+            for rank, candidate in enumerate(unique_candidates.values(), start=1)
+        ]
 
-        combined_results: List[Dict[str, Any]] = []
-        for item in exact_results:
-            entry = dict(item)
+        # 同一文本块可能同时命中字符匹配与语义检索，按块合并来源并保留最高分
+        merged_results: Dict[Tuple, Dict[str, Any]] = {}
+
+        def merge_combined_entry(entry: Dict[str, Any]) -> None:
+            # 图片向量与文本向量的 vector_id 各自编号，需区分类型避免误合并
+            key = (entry.get('result_type') == 'image', build_chunk_key(entry))
+            existing = merged_results.get(key)
+            if existing is None:
+                merged_results[key] = entry
+                return
+            sources = sorted(set(existing.get('sources') or []) | set(entry.get('sources') or []))
+            if (entry.get('final_score') or 0.0) > (existing.get('final_score') or 0.0):
+                merged_results[key] = entry
+                existing = entry
+            existing['sources'] = sources
+
+        exact_entries = [dict(item) for item in exact_results]
+        for entry in exact_entries:
             entry.setdefault('sources', ['exact'])
-            entry['final_score'] = compute_final_confidence(entry)
-            combined_results.append(entry)
+        exact_scores = compute_final_confidence_batch(exact_entries)
+        for entry, score in zip(exact_entries, exact_scores.tolist()):
+            entry['final_score'] = score
+            merge_combined_entry(entry)
         for item in semantic_results:
-            combined_entry = dict(item)
-            combined_results.append(combined_entry)
+            merge_combined_entry(dict(item))
 
-        image_threshold = 0.3
-        image_results = search_image_vectors(query_text, top_k, threshold=image_threshold)
+        image_results = await image_future
         image_results = deduplicate_results(image_results)
         for image_entry in image_results:
-            combined_results.append(image_entry)
+            merge_combined_entry(image_entry)
+
+        combined_results = list(merged_results.values())
 
-        combined_results.sort(
-            key=lambda entry: entry.get('final_score', 0.0),
-            reverse=True,
+        # 缺少最终分数的条目批量补算，避免排序后逐条重复计算
+        unscored = [entry for entry in combined_results if entry.get('final_score') is None]
+        if unscored:
+            for entry, score in zip(unscored, compute_final_confidence_batch(unscored).tolist()):
+                entry['final_score'] = score
+
+        # 一次性抽取分数列后用稳定的 argsort 排序，避免排序过程中反复取字典键
+        combined_scores = np.fromiter(
+            (entry.get('final_score') or 0.0 for entry in combined_results),
+            dtype=np.float64,
+            count=len(combined_results),
         )
+        combined_results = [
+            combined_results[idx] for idx in np.argsort(-combined_scores, kind='stable')
+        ]
 
         for idx, entry in enumerate(combined_results, start=1):
             entry['combined_rank'] = idx
-            entry.setdefault('final_score', compute_final_confidence(entry))
 
         response = {
             'status': 'success',
@@ -1676,13 +1800,18 @@ async def search_vectors_post(request: SearchRequest) -> Dict[str, Any]:
                 'results': image_results,
             },
         }
-        return response
+        # 结果体较大，直接返回 orjson 响应以跳过 jsonable_encoder 的逐字段转换
+        return NumpyORJSONResponse(response)
 
     except HTTPException:
         raise
     except Exception as exc:  # pylint: disable=broad-except
         logger.error(f"Failed to search vectors with reranker: {str(exc)}")
         raise HTTPException(status_code=500, detail=f"搜索失败: {str(exc)}")
+    finally:
+        # 文本流程提前出错时图片检索结果不再需要，取消或取走其异常
+        if image_future is not None:
+            _discard_future(image_future)
 
 
 @router.post("/search-images")
@@ -1721,24 +1850,9 @@ async def get_vectors_by_type(doc_type: str, limit: int = 100, offset: int = 0)
         if faiss_manager is None:
             raise HTTPException(status_code=500, detail="Faiss manager not initialized")
         
-        # 筛选指定类型的向量 - 优先使用file_type字段
-        filtered_vectors = []
-        for meta in faiss_manager.metadata:
-            # 优先使用file_type字段，如果没有则使用unknown
-            if 'file_type' in meta:
-                meta_type = meta['file_type']
-            else:
-                meta_type = 'unknown'
-            
-            if meta_type == doc_type:
-                filtered_vectors.append(meta)
-        
-        total_count = len(filtered_vectors)
-        
-        # 分页
-        start_idx = offset
+        # 按类型索引直接分页，避免每次线性扫描全部元数据
+        page_vectors, total_count = faiss_manager.get_metadata_by_type(doc_type, offset, limit)
         end_idx = min(offset + limit, total_count)
-        page_vectors = filtered_vectors[start_idx:end_idx]
         
         return {
             "vectors": page_vectors,
@@ -0,0 +1,41 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# 超过该耗时(秒)的 HTTP 请求记录为慢请求
+SLOW_REQUEST_THRESHOLD = 1.0
+
+
+class RequestTimingMiddleware:
+    """纯 ASGI 请求计时中间件，在响应头写入 X-Process-Time 并记录慢请求。
+
+    不继承 BaseHTTPMiddleware，避免每个请求额外构造 Request/Response 与 anyio 任务组。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{elapsed:.4f}".encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= SLOW_REQUEST_THRESHOLD:
+                logger.info("慢请求 %s %s 耗时 %.3fs", scope.get("method"), scope.get("path"), elapsed)
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional
-
+import asyncio
+import hashlib
+import io
+import threading
+import time
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+
+import httpx
+import orjson
 import requests
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from openai import OpenAI
+from openai import AsyncOpenAI
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 
+from api.responses import NumpyORJSONResponse
 from service.model_download_service import (
-    ModelDownloadService,
     ModelStatus as ServiceModelStatus,
     get_model_download_service,
 )
+from service.openai_client_cache import OpenAIClientCache
 from service.vision_model_service import get_vision_handler
 
 
@@ -20,11 +30,119 @@ MODELSCOPE_BASE_URL = "https://api-inference.modelscope.cn/v1/"
 DASHSCOPE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 KIMI_BASE_URL = "https://api.moonshot.cn/v1"
 
+OPENAI_CLIENT_CACHE_SIZE = 32
+DASHSCOPE_MODELS_CACHE_TTL = 60.0
+STREAM_TEST_MAX_CHARS = 8192
+STREAM_TEST_ANSWER_CHARS = 256
+
+# 连通性测试请求中不变的部分在模块加载时构造一次，各请求共享（SDK 不会修改这些字典）
+_TEST_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant."}
+_TEST_EXTRA_BODY = {"enable_thinking": True, "thinking_budget": 40960}
+_VISION_TEST_EXTRA_BODY = {"enable_thinking": True, "thinking_budget": 81920}
+
+
+class _BoundedTextBuffer:
+    """流式拼接文本的缓冲区，写满上限后丢弃后续内容。"""
+
+    def __init__(self, limit: int = STREAM_TEST_MAX_CHARS) -> None:
+        self._buffer = io.StringIO()
+        self._remaining = limit
+
+    @property
+    def full(self) -> bool:
+        return self._remaining <= 0
+
+    def write(self, text: Any) -> None:
+        if not text or self._remaining <= 0:
+            return
+        # SDK 增量通常已是 str，只有其他类型才需要转换
+        if not isinstance(text, str):
+            text = str(text)
+        piece = text if len(text) <= self._remaining else text[: self._remaining]
+        self._buffer.write(piece)
+        self._remaining -= len(piece)
+
+    def getvalue(self) -> str:
+        return self._buffer.getvalue()
+
+
+async def _close_stream(stream: Any) -> None:
+    close = getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def _build_http_session() -> requests.Session:
+    """模型列表查询共用的连接池会话，避免每次请求重新建立 DNS 与 TLS 连接。"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+http_session = _build_http_session()
+
+
+def _new_openai_client(base_url: str, api_key: str) -> AsyncOpenAI:
+    """每个缓存的异步客户端持有独立的长连接池，省去重复的 TLS 握手。"""
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=60.0),
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+# 被淘汰客户端的关闭任务，持有引用防止任务在完成前被回收
+_closing_openai_clients: Set[asyncio.Task] = set()
+
+
+def _schedule_client_close(client: AsyncOpenAI) -> None:
+    task = asyncio.ensure_future(_close_openai_client(client))
+    _closing_openai_clients.add(task)
+    task.add_done_callback(_closing_openai_clients.discard)
+
+
+# 只在事件循环内访问；淘汰时在后台关闭客户端的连接池
+_openai_clients: OpenAIClientCache[AsyncOpenAI] = OpenAIClientCache(
+    _new_openai_client,
+    maxsize=OPENAI_CLIENT_CACHE_SIZE,
+    on_evict=_schedule_client_close,
+)
+
+
+def _get_openai_client(base_url: str, api_key: str) -> AsyncOpenAI:
+    """按 base_url 与 API Key 摘要复用异步客户端。"""
+    return _openai_clients.get(base_url, api_key)
+
+
+async def _close_openai_client(client: AsyncOpenAI) -> None:
+    try:
+        await client.close()
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+async def close_openai_clients() -> None:
+    """关闭所有缓存的异步客户端，在应用关闭时调用。"""
+    await asyncio.gather(
+        *(_close_openai_client(client) for client in _openai_clients.drain()),
+        *tuple(_closing_openai_clients),
+    )
+
 
 router = APIRouter(prefix="/api/models", tags=["models"])
 
 
 class ModelStatusResponse(BaseModel):
+    """服务层模型状态的输出快照；数值已在 ModelStatus.to_dict 中收敛，不再声明取值约束。"""
+
     key: str
     name: str
     description: str
@@ -32,9 +150,9 @@ class ModelStatusResponse(BaseModel):
     repo_id: str
     local_path: str
     status: Literal["not_downloaded", "downloading", "downloaded", "failed"]
-    progress: float = Field(ge=0.0, le=1.0)
-    downloaded_bytes: int = Field(ge=0)
-    total_bytes: Optional[int] = Field(default=None, ge=0)
+    progress: float
+    downloaded_bytes: int
+    total_bytes: Optional[int] = None
     message: Optional[str] = None
     error: Optional[str] = None
     endpoint: Optional[str] = None
@@ -42,22 +160,20 @@ class ModelStatusResponse(BaseModel):
 
     @classmethod
     def from_service(cls, status: ServiceModelStatus) -> "ModelStatusResponse":
-        return cls(**status.to_dict())
-
+        # 服务层快照字段类型已确定，无需再逐字段校验
+        return cls.model_construct(**status.to_dict())
 
-def _get_service() -> ModelDownloadService:
-    return get_model_download_service()
 
-
-@router.get("", response_model=List[ModelStatusResponse])
-def list_models() -> List[ModelStatusResponse]:
-    service = _get_service()
-    return [ModelStatusResponse.from_service(item) for item in service.list_statuses()]
+@router.get("", response_model=List[ModelStatusResponse], response_class=NumpyORJSONResponse)
+def list_models() -> NumpyORJSONResponse:
+    # 前端高频轮询该接口；服务端状态本身可信，直接序列化以跳过逐项模型校验
+    service = get_model_download_service()
+    return NumpyORJSONResponse([item.to_dict() for item in service.list_statuses()])
 
 
 @router.get("/{key}", response_model=ModelStatusResponse)
 def get_model_status(key: str) -> ModelStatusResponse:
-    service = _get_service()
+    service = get_model_download_service()
     try:
         status = service.get_status(key)
     except KeyError as exc:
@@ -67,7 +183,7 @@ def get_model_status(key: str) -> ModelStatusResponse:
 
 @router.post("/{key}/download", response_model=ModelStatusResponse)
 def trigger_download(key: str) -> ModelStatusResponse:
-    service = _get_service()
+    service = get_model_download_service()
     try:
         status = service.start_download(key)
     except KeyError as exc:
@@ -78,7 +194,7 @@ def trigger_download(key: str) -> ModelStatusResponse:
 @router.post("/{key}/uninstall", response_model=ModelStatusResponse)
 def uninstall_model(key: str) -> ModelStatusResponse:
     """Uninstall a system model and return its updated status."""
-    service = _get_service()
+    service = get_model_download_service()
     try:
         status = service.uninstall(key)
     except KeyError as exc:
@@ -105,7 +221,7 @@ class ModelScopeTestResponse(BaseModel):
 
 
 @router.post("/test-modelscope", response_model=ModelScopeTestResponse)
-def test_modelscope_connection(
+async def test_modelscope_connection(
     payload: ModelScopeTestRequest,
 ) -> ModelScopeTestResponse:
     api_key = (payload.api_key or "").strip()
@@ -115,45 +231,50 @@ def test_modelscope_connection(
     model_id = (payload.model or "").strip() or "Qwen/Qwen3-32B"
     prompt = payload.prompt.strip() or "你好，如果你能够正常工作，请回复我“你好”。"
 
-    client = OpenAI(api_key=api_key, base_url=MODELSCOPE_BASE_URL)
+    client = _get_openai_client(MODELSCOPE_BASE_URL, api_key)
     try:
-        stream = client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model=model_id,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt},
-            ],
+            messages=[_TEST_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
             stream=True,
             max_tokens=64,
-            extra_body={
-                "enable_thinking": True,
-                "thinking_budget": 40960,
-            },
+            extra_body=_TEST_EXTRA_BODY,
         )
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    content_parts: List[str] = []
-    thinking_parts: List[str] = []
+    # 模型可能忽略 max_tokens，缓冲区写满或生成结束后立即停止读取并关闭流；
+    # 连通性测试只需一小段回答，回答缓冲区上限更小
+    content_buffer = _BoundedTextBuffer(STREAM_TEST_ANSWER_CHARS)
+    thinking_buffer = _BoundedTextBuffer()
     try:
-        for chunk in stream:
+        async for chunk in stream:
             if not chunk or not chunk.choices:
                 continue
+            # delta/content/finish_reason 是 SDK 声明的字段，直接读取；
+            # reasoning_content 是厂商扩展字段，缺失时抛 AttributeError
             choice = chunk.choices[0]
-            delta = getattr(choice, "delta", None)
+            delta = choice.delta
             if delta is None:
                 continue
-            reasoning = getattr(delta, "reasoning_content", None)
+            try:
+                reasoning = delta.reasoning_content
+            except AttributeError:
+                reasoning = None
             if reasoning:
-                thinking_parts.append(str(reasoning))
-            piece = getattr(delta, "content", None)
+                thinking_buffer.write(reasoning)
+            piece = delta.content
             if piece:
-                content_parts.append(str(piece))
+                content_buffer.write(piece)
+            if content_buffer.full or thinking_buffer.full or choice.finish_reason:
+                break
     except Exception:  # pylint: disable=broad-except
         pass
+    finally:
+        await _close_stream(stream)
 
-    content_text = "".join(content_parts).strip()
-    thinking_text = "".join(thinking_parts).strip()
+    content_text = content_buffer.getvalue().strip()
+    thinking_text = thinking_buffer.getvalue().strip()
     if thinking_text and content_text:
         combined = f"{thinking_text}\n\n=== Final Answer ===\n{content_text}"
     else:
@@ -203,7 +324,7 @@ class DashScopeTestResponse(BaseModel):
 
 
 @router.post("/test-dashscope", response_model=DashScopeTestResponse)
-def test_dashscope_connection(payload: DashScopeTestRequest) -> DashScopeTestResponse:
+async def test_dashscope_connection(payload: DashScopeTestRequest) -> DashScopeTestResponse:
     api_key = (payload.api_key or "").strip()
     if not api_key:
         raise HTTPException(status_code=400, detail="缺少 DashScope API Key")
@@ -211,69 +332,70 @@ def test_dashscope_connection(payload: DashScopeTestRequest) -> DashScopeTestRes
     model_id = (payload.model or "").strip() or "qwen3-max"
     prompt = payload.prompt.strip() or "你好，如果你能够正常工作，请回复我“你好”。"
 
-    client = OpenAI(api_key=api_key, base_url=DASHSCOPE_BASE_URL)
+    client = _get_openai_client(DASHSCOPE_BASE_URL, api_key)
     handler = get_vision_handler(model_id)
     if handler:
         messages = handler.build_test_messages(prompt)
-        thinking_budget = 81920
+        extra_body = _VISION_TEST_EXTRA_BODY
     else:
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt},
-        ]
-        thinking_budget = 40960
+        messages = [_TEST_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
+        extra_body = _TEST_EXTRA_BODY
     try:
-        stream = client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model=model_id,
             messages=messages,
             stream=True,
             max_tokens=64,
-            extra_body={
-                "enable_thinking": True,
-                "thinking_budget": thinking_budget,
-            },
+            extra_body=extra_body,
         )
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    reasoning_parts: List[str] = []
-    answer_parts: List[str] = []
+    reasoning_buffer = _BoundedTextBuffer()
+    answer_buffer = _BoundedTextBuffer(STREAM_TEST_ANSWER_CHARS)
 
     def _append_piece(piece: Any) -> None:
         if piece is None:
             return
-        reasoning_value = getattr(piece, "reasoning_content", None)
+        try:
+            reasoning_value = piece.reasoning_content
+        except AttributeError:
+            reasoning_value = None
         if reasoning_value is None:
             reasoning_value = getattr(piece, "reasoning", None)
         if reasoning_value:
             if isinstance(reasoning_value, (list, tuple)):
-                reasoning_parts.append(
-                    "".join(str(item) for item in reasoning_value if item is not None)
-                )
+                for item in reasoning_value:
+                    if item is not None:
+                        reasoning_buffer.write(item)
             else:
-                reasoning_parts.append(str(reasoning_value))
-        content_value = getattr(piece, "content", None)
+                reasoning_buffer.write(reasoning_value)
+        content_value = piece.content
         if content_value:
             text_value = _coerce_openai_content(content_value)
             if text_value:
-                answer_parts.append(text_value)
+                answer_buffer.write(text_value)
 
     try:
-        for chunk in stream:
+        async for chunk in stream:
             if not chunk or not chunk.choices:
                 continue
             choice = chunk.choices[0]
-            delta = getattr(choice, "delta", None)
-            message = getattr(choice, "message", None)
+            delta = choice.delta
             if delta is not None:
                 _append_piece(delta)
-            elif message is not None:
-                _append_piece(message)
+            else:
+                # 少数兼容实现在流式块中返回 message 而非 delta
+                _append_piece(getattr(choice, "message", None))
+            if reasoning_buffer.full or answer_buffer.full or choice.finish_reason:
+                break
     except Exception:  # pylint: disable=broad-except
         pass
+    finally:
+        await _close_stream(stream)
 
-    reasoning_text = "".join(reasoning_parts).strip()
-    content_text = "".join(answer_parts).strip()
+    reasoning_text = reasoning_buffer.getvalue().strip()
+    content_text = answer_buffer.getvalue().strip()
     if reasoning_text and content_text:
         combined = f"{reasoning_text}\n\n=== Final Answer ===\n{content_text}"
     else:
@@ -297,12 +419,52 @@ class DashScopeModelsResponse(BaseModel):
     models: List[DashScopeModelItem] = Field(default_factory=list, description="可用模型列表")
 
 
+_dashscope_models_cache: Dict[str, Tuple[float, DashScopeModelsResponse]] = {}
+_dashscope_models_cache_lock = threading.Lock()
+
+
+def _dashscope_cache_key(api_key: str) -> str:
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_cached_dashscope_models(cache_key: str) -> Optional[DashScopeModelsResponse]:
+    now = time.monotonic()
+    with _dashscope_models_cache_lock:
+        cached = _dashscope_models_cache.get(cache_key)
+        if cached is None:
+            return None
+        cached_at, response = cached
+        if now - cached_at >= DASHSCOPE_MODELS_CACHE_TTL:
+            _dashscope_models_cache.pop(cache_key, None)
+            return None
+        return response
+
+
+def _store_dashscope_models(cache_key: str, response: DashScopeModelsResponse) -> None:
+    now = time.monotonic()
+    with _dashscope_models_cache_lock:
+        expired = [
+            key
+            for key, (cached_at, _) in _dashscope_models_cache.items()
+            if now - cached_at >= DASHSCOPE_MODELS_CACHE_TTL
+        ]
+        for key in expired:
+            _dashscope_models_cache.pop(key, None)
+        _dashscope_models_cache[cache_key] = (now, response)
+
+
 @router.post("/dashscope/models", response_model=DashScopeModelsResponse)
 def list_dashscope_models(payload: DashScopeModelsRequest) -> DashScopeModelsResponse:
     api_key = (payload.api_key or "").strip()
     if not api_key:
         raise HTTPException(status_code=400, detail="缺少 DashScope API Key")
 
+    # 前端会频繁轮询模型列表，短时间内复用上一次的结果
+    cache_key = _dashscope_cache_key(api_key)
+    cached_response = _get_cached_dashscope_models(cache_key)
+    if cached_response is not None:
+        return cached_response
+
     endpoint = f"{DASHSCOPE_BASE_URL.rstrip('/')}/models"
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -310,7 +472,7 @@ def list_dashscope_models(payload: DashScopeModelsRequest) -> DashScopeModelsRes
     }
 
     try:
-        response = requests.get(endpoint, headers=headers, timeout=15)
+        response = http_session.get(endpoint, headers=headers, timeout=15)
     except RequestException as exc:  # pragma: no cover - network failure
         raise HTTPException(status_code=502, detail=f"请求 DashScope 失败: {exc}") from exc
 
@@ -325,7 +487,7 @@ def list_dashscope_models(payload: DashScopeModelsRequest) -> DashScopeModelsRes
         raise HTTPException(status_code=response.status_code, detail=detail)
 
     try:
-        data = response.json()
+        data = orjson.loads(response.content)
     except ValueError as exc:  # pragma: no cover - unexpected payload
         raise HTTPException(status_code=502, detail="DashScope 响应解析失败") from exc
 
@@ -352,7 +514,9 @@ def list_dashscope_models(payload: DashScopeModelsRequest) -> DashScopeModelsRes
                 )
             )
 
-    return DashScopeModelsResponse(models=items)
+    models_response = DashScopeModelsResponse(models=items)
+    _store_dashscope_models(cache_key, models_response)
+    return models_response
 
 
 class KimiModelsRequest(BaseModel):
@@ -383,7 +547,7 @@ def list_kimi_models(payload: KimiModelsRequest) -> KimiModelsResponse:
     }
 
     try:
-        response = requests.get(endpoint, headers=headers, timeout=15)
+        response = http_session.get(endpoint, headers=headers, timeout=15)
     except RequestException as exc:  # pragma: no cover - network failure
         raise HTTPException(status_code=502, detail=f"请求 Kimi 失败: {exc}") from exc
 
@@ -398,7 +562,7 @@ def list_kimi_models(payload: KimiModelsRequest) -> KimiModelsResponse:
         raise HTTPException(status_code=response.status_code, detail=detail)
 
     try:
-        data = response.json()
+        data = orjson.loads(response.content)
     except ValueError as exc:  # pragma: no cover - unexpected payload
         raise HTTPException(status_code=502, detail="Kimi 响应解析失败") from exc
 
@@ -0,0 +1,15 @@
+import warnings
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# 新版 FastAPI 将 ORJSONResponse 标记为弃用并在定义子类时告警；这里只需它的序列化实现，定义时屏蔽该告警
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+
+    class NumpyORJSONResponse(ORJSONResponse):
+        """在框架 ORJSONResponse 基础上打开 numpy 序列化，可直接输出 numpy 标量与数组。"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
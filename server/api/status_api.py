@@ -1,56 +1,185 @@
 import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Dict, Optional, Set
+import threading
+import time
+from typing import Any, Dict, Optional, Set
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+STATUS_COALESCE_INTERVAL = 0.1
+# 单个连接发送超时(秒)，超时视为慢客户端并移除，避免拖住广播
+STATUS_SEND_TIMEOUT = 0.25
+# 移除慢客户端时使用的关闭码(1013 Try Again Later)，客户端据此重连并收到缓存的最新状态
+STATUS_DROP_CLOSE_CODE = 1013
+# 待发送状态事件上限，满时丢弃最旧的事件
+STATUS_QUEUE_SIZE = 64
+
 
 class StatusBroadcaster:
     """Tracks active WebSocket connections and pushes backend status updates."""
 
     def __init__(self) -> None:
+        # 连接集合只在事件循环线程内修改，单步操作不会被打断，无需加锁
         self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-        self._latest_payload: Optional[Dict] = None
+        self._latest_message: Optional[Dict[str, Any]] = None
+        # 高频进度更新按 key 合并，可能来自工作线程，单独加线程锁
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, Dict] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._flush_task: Optional[asyncio.Task] = None
+        # publish() 的事件队列与后台发送任务，在事件循环内惰性创建
+        self._events: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket) -> None:
         await websocket.accept()
-        async with self._lock:
-            self._connections.add(websocket)
-        if self._latest_payload is not None:
+        self._loop = asyncio.get_running_loop()
+        self._connections.add(websocket)
+        if self._latest_message is not None:
             try:
-                await websocket.send_json(self._latest_payload)
+                # 复用广播时已序列化的帧，新连接无需重新编码
+                await websocket.send(self._latest_message)
             except Exception:
                 logger.exception("Failed to send initial status payload to websocket client")
 
     async def disconnect(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            self._connections.discard(websocket)
+        self._connections.discard(websocket)
 
     async def broadcast(self, payload: Dict, keep_latest: bool = True) -> None:
         """Send payload to all clients and optionally cache it for new connections."""
-        timestamped_payload = {
-            **payload,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        # 调用方的 payload 可能被复用，只在这里复制一次；时间戳使用 epoch 秒，省去 datetime 构造与格式化
+        timestamped_payload = dict(payload)
+        timestamped_payload["timestamp"] = time.time()
+        # 每次广播只序列化一次，并以文本帧发送以保持客户端 JSON.parse 兼容
+        frame = orjson.dumps(timestamped_payload, option=orjson.OPT_NON_STR_KEYS).decode()
+        # 所有连接共享同一条 ASGI 发送消息，服务器只读取不修改
+        message = {"type": "websocket.send", "text": frame}
         if keep_latest:
-            self._latest_payload = timestamped_payload
-
-        async with self._lock:
-            connections = list(self._connections)
-
-        for connection in connections:
+            self._latest_message = message
+
+        live_connections = []
+        for connection in tuple(self._connections):
+            # 已关闭的连接直接移除，避免发送失败时构造异常与日志
+            if (
+                connection.client_state is WebSocketState.CONNECTED
+                and connection.application_state is WebSocketState.CONNECTED
+            ):
+                live_connections.append(connection)
+            else:
+                self._connections.discard(connection)
+        if live_connections:
+            # 并发发送，慢客户端不会拖住其他连接
+            await asyncio.gather(*(self._safe_send(connection, message) for connection in live_connections))
+
+    def publish(self, payload: Dict) -> None:
+        """Enqueue a status payload without waiting for clients.
+
+        Must be called on the event loop. Payloads are broadcast in order by a
+        background worker and cached for new connections.
+        """
+        if self._events is None:
+            self._events = asyncio.Queue(maxsize=STATUS_QUEUE_SIZE)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._drain_events())
+        try:
+            self._events.put_nowait(payload)
+        except asyncio.QueueFull:
+            # 保留最新状态，丢弃最旧的事件
+            self._events.get_nowait()
+            self._events.task_done()
+            self._events.put_nowait(payload)
+
+    async def _drain_events(self) -> None:
+        events = self._events
+        assert events is not None
+        while True:
+            payload = await events.get()
+            try:
+                await self.broadcast(payload)
+            except Exception:
+                logger.debug("Failed to broadcast queued status payload", exc_info=True)
+            finally:
+                events.task_done()
+
+    async def aclose(self, timeout: float = 1.0) -> None:
+        """Flush queued payloads (bounded by timeout) and stop background tasks."""
+        worker = self._worker
+        if worker is not None and self._events is not None:
+            try:
+                await asyncio.wait_for(self._events.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.debug("Timed out flushing status payloads on shutdown")
+        # 合并进度的发送任务同样取消，避免关闭期间继续向正在断开的连接发送
+        flush_task = self._flush_task
+        self._worker = None
+        self._flush_task = None
+        for task in (worker, flush_task):
+            if task is None or task.done():
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        with self._pending_lock:
+            self._pending = {}
+            self._flush_scheduled = False
+
+    def queue(self, key: str, payload: Dict) -> None:
+        """Coalesce frequent progress updates per key and broadcast the latest one.
+
+        Safe to call from worker threads; pending payloads are flushed on the
+        event loop at most once every STATUS_COALESCE_INTERVAL seconds and are
+        not cached for new connections.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # 尚无客户端连接过，没有需要通知的对象
+            return
+        with self._pending_lock:
+            self._pending[key] = payload
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        loop.call_soon_threadsafe(self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        self._flush_task = asyncio.ensure_future(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        await asyncio.sleep(STATUS_COALESCE_INTERVAL)
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+            self._flush_scheduled = False
+        for payload in pending.values():
             try:
-                await connection.send_json(timestamped_payload)
+                await self.broadcast(payload, keep_latest=False)
             except Exception:
-                logger.debug("Dropping websocket client after broadcast failure", exc_info=True)
-                await self.disconnect(connection)
+                logger.debug("Failed to flush coalesced status payload", exc_info=True)
+
+    async def _safe_send(self, websocket: WebSocket, message: Dict[str, Any]) -> None:
+        try:
+            await asyncio.wait_for(websocket.send(message), STATUS_SEND_TIMEOUT)
+        except Exception:
+            logger.debug("Dropping websocket client after broadcast failure", exc_info=True)
+            await self._drop(websocket)
+
+    async def _drop(self, websocket: WebSocket) -> None:
+        """移除并关闭连接；仅移出集合时接收循环仍在运行，客户端收不到关闭帧也不会重连"""
+        await self.disconnect(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=STATUS_DROP_CLOSE_CODE), STATUS_SEND_TIMEOUT)
+        except Exception:
+            logger.debug("Failed to close dropped websocket client", exc_info=True)
 
 
 status_broadcaster = StatusBroadcaster()
@@ -1,8 +1,13 @@
-import json
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
+
+import orjson
+
+
+# 项目根目录只解析一次；运行时覆盖同样写入已解析的绝对路径，调用方可直接使用
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
 
 class ServerConfig:
@@ -12,7 +17,7 @@ class ServerConfig:
     PORT = 8000
     DEBUG = True
 
-    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+    PROJECT_ROOT = _PROJECT_ROOT
 
     BGE_M3_MODEL_PATH = PROJECT_ROOT / "meta" / "embedding" / "bge-m3"
     BGE_RERANKER_MODEL_PATH = PROJECT_ROOT / "meta" / "reranker" / "bge-reranker-v3-m3"
@@ -34,7 +39,7 @@ class ServerConfig:
 class DatabaseConfig:
     """数据库配置"""
 
-    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+    PROJECT_ROOT = _PROJECT_ROOT
 
     DATABASE_DIR = PROJECT_ROOT / "data"
     SQLITE_DIR = PROJECT_ROOT / "meta" / "sqlite"
@@ -43,9 +48,10 @@ class DatabaseConfig:
 
     SQLITE_DB_PATH = SQLITE_DIR / "documents.db"
     VECTOR_INDEX_PATH = VECTOR_DIR / "vector_index.faiss"
-    VECTOR_METADATA_PATH = VECTOR_DIR / "vector_metadata.json"
+    VECTOR_METADATA_PATH = VECTOR_DIR / "vector_metadata.jsonl"
     IMAGE_VECTOR_INDEX_PATH = VECTOR_DIR / "image_vector_index.faiss"
     IMAGE_VECTOR_METADATA_PATH = VECTOR_DIR / "image_vector_metadata.json"
+    BM25S_INDEX_DIR = VECTOR_DIR / "bm25s_index"
 
     @classmethod
     def ensure_directories(cls) -> None:
@@ -83,9 +89,10 @@ def _apply_runtime_path_overrides() -> None:
 
     DatabaseConfig.SQLITE_DB_PATH = DatabaseConfig.SQLITE_DIR / "documents.db"
     DatabaseConfig.VECTOR_INDEX_PATH = DatabaseConfig.VECTOR_DIR / "vector_index.faiss"
-    DatabaseConfig.VECTOR_METADATA_PATH = DatabaseConfig.VECTOR_DIR / "vector_metadata.json"
+    DatabaseConfig.VECTOR_METADATA_PATH = DatabaseConfig.VECTOR_DIR / "vector_metadata.jsonl"
     DatabaseConfig.IMAGE_VECTOR_INDEX_PATH = DatabaseConfig.VECTOR_DIR / "image_vector_index.faiss"
     DatabaseConfig.IMAGE_VECTOR_METADATA_PATH = DatabaseConfig.VECTOR_DIR / "image_vector_metadata.json"
+    DatabaseConfig.BM25S_INDEX_DIR = DatabaseConfig.VECTOR_DIR / "bm25s_index"
 
 
 _apply_runtime_path_overrides()
@@ -94,11 +101,18 @@ _apply_runtime_path_overrides()
 _LOG = logging.getLogger(__name__)
 _RUNTIME_PATH = Path(__file__).with_name('config_runtime.json')
 
-_ALLOWED_SERVER_CONFIG_KEYS = {
-    'RECURSIVE_CHUNK_SIZE': int,
-    'RECURSIVE_CHUNK_OVERLAP': int,
-    'BM25S_WEIGHT': float,
-    'EMBEDDING_WEIGHT': float,
+def _clamped(cast: Callable[[Any], Any], lower: Any, upper: Any) -> Callable[[Any], Any]:
+    def coerce(value: Any) -> Any:
+        return max(lower, min(upper, cast(value)))
+    return coerce
+
+
+# 允许运行时修改的检索配置项 -> 类型转换并限定取值范围的函数
+_ALLOWED_SERVER_CONFIG_KEYS: Dict[str, Callable[[Any], Any]] = {
+    'RECURSIVE_CHUNK_SIZE': _clamped(int, 0, 2000),
+    'RECURSIVE_CHUNK_OVERLAP': _clamped(int, 0, 500),
+    'BM25S_WEIGHT': _clamped(float, 0.0, 1.0),
+    'EMBEDDING_WEIGHT': _clamped(float, 0.0, 1.0),
 }
 
 DEFAULT_RETRIEVAL_CONFIG = {
@@ -109,27 +123,19 @@ DEFAULT_RETRIEVAL_CONFIG = {
 }
 
 _RUNTIME_OVERRIDES: Dict[str, Any] = {}
+_RUNTIME_OVERRIDES_LOADED = False
 
 
 def _coerce_config_value(key: str, value: Any) -> Any:
-    if key not in _ALLOWED_SERVER_CONFIG_KEYS:
+    coerce = _ALLOWED_SERVER_CONFIG_KEYS.get(key)
+    if coerce is None:
         raise ValueError(f"Unsupported config key: {key}")
 
-    target_type = _ALLOWED_SERVER_CONFIG_KEYS[key]
     try:
-        coerced = target_type(value)
+        return coerce(value)
     except (TypeError, ValueError) as error:
         raise ValueError(f"Invalid value for {key}: {value}") from error
 
-    if key == 'RECURSIVE_CHUNK_SIZE':
-        coerced = max(0, min(2000, int(coerced)))
-    elif key == 'RECURSIVE_CHUNK_OVERLAP':
-        coerced = max(0, min(500, int(coerced)))
-    else:
-        coerced = max(0.0, min(1.0, float(coerced)))
-
-    return coerced
-
 
 def _apply_overrides(overrides: Dict[str, Any]) -> None:
     for key, value in overrides.items():
@@ -141,8 +147,7 @@ def _load_runtime_overrides() -> None:
         return
 
     try:
-        with _RUNTIME_PATH.open('r', encoding='utf-8') as file:
-            data = json.load(file)
+        data = orjson.loads(_RUNTIME_PATH.read_bytes())
     except Exception as error:  # pylint: disable=broad-except
         _LOG.warning('Failed to read runtime config: %s', error)
         return
@@ -177,6 +182,15 @@ def _load_runtime_overrides() -> None:
     _apply_overrides(_RUNTIME_OVERRIDES)
 
 
+def ensure_runtime_overrides_loaded() -> None:
+    """首次使用检索配置时才读取运行时覆盖文件，避免导入模块时访问磁盘。"""
+    global _RUNTIME_OVERRIDES_LOADED
+    if _RUNTIME_OVERRIDES_LOADED:
+        return
+    _RUNTIME_OVERRIDES_LOADED = True
+    _load_runtime_overrides()
+
+
 def _write_runtime_overrides() -> None:
     if not _RUNTIME_OVERRIDES:
         if _RUNTIME_PATH.exists():
@@ -188,13 +202,15 @@ def _write_runtime_overrides() -> None:
 
     try:
         _RUNTIME_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with _RUNTIME_PATH.open('w', encoding='utf-8') as file:
-            json.dump(_RUNTIME_OVERRIDES, file, indent=2, ensure_ascii=False)
+        _RUNTIME_PATH.write_bytes(
+            orjson.dumps(_RUNTIME_OVERRIDES, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
     except Exception as error:  # pylint: disable=broad-except
         _LOG.warning('Failed to persist runtime config: %s', error)
 
 
 def get_retrieval_config() -> Dict[str, Any]:
+    ensure_runtime_overrides_loaded()
     return {
         'RECURSIVE_CHUNK_SIZE': ServerConfig.RECURSIVE_CHUNK_SIZE,
         'RECURSIVE_CHUNK_OVERLAP': ServerConfig.RECURSIVE_CHUNK_OVERLAP,
@@ -208,6 +224,7 @@ def get_default_retrieval_config() -> Dict[str, Any]:
 
 
 def update_server_config(updates: Dict[str, Any]) -> Dict[str, Any]:
+    ensure_runtime_overrides_loaded()
     if not updates:
         return get_retrieval_config()
 
@@ -238,10 +255,8 @@ def update_server_config(updates: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def reset_server_config() -> Dict[str, Any]:
+    ensure_runtime_overrides_loaded()
     _RUNTIME_OVERRIDES.clear()
     _apply_overrides(DEFAULT_RETRIEVAL_CONFIG)
     _write_runtime_overrides()
     return get_retrieval_config()
-
-
-_load_runtime_overrides()
@@ -1,34 +1,32 @@
+import asyncio
 import os
 import logging
 from contextlib import asynccontextmanager
 
+import orjson
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from config.config import ServerConfig, DatabaseConfig
+from starlette.routing import Route
+from config.config import ServerConfig, DatabaseConfig, ensure_runtime_overrides_loaded
 from api.document_api import router as document_router, init_document_api
-from api.chat_api import router as chat_router, init_chat_api
-from api.database_api import router as database_router, init_database_api
+from api.chat_api import router as chat_router, init_chat_api, close_chat_clients
+from api.database_api import router as database_router
 from api.faiss_api import router as faiss_router, init_faiss_api
 
-from api.model_api import router as model_router
+from api.model_api import router as model_router, close_openai_clients
 from api.config_api import router as config_router
 from api.status_api import router as status_router, status_broadcaster
 from api.memory_api import router as memory_router, init_memory_api
-from service.sqlite_service import SQLiteManager
-from service.faiss_service import FaissManager
-from service.image_faiss_service import ImageFaissManager
-from service.embedding_service import EmbeddingService
-from service.llm_client import SiliconFlowClient
-from service.reranker_service import init_reranker_service
-from service.bm25s_service import init_bm25s_service
+from api.middleware import RequestTimingMiddleware
+from api.responses import NumpyORJSONResponse
 from service.model_manager import get_model_manager
 from service.memory_service import get_memory_service, MemoryServiceError
 
-# 配置日志
+# 配置日志：时间戳直接输出记录自带的 epoch 秒，避免每条日志调用 localtime/strftime
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(created).3f - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
@@ -36,21 +34,20 @@ logger = logging.getLogger(__name__)
 app_ready = False
 init_message = "正在启动系统..."
 
+
+def _publish_state(ready: bool, message: str, status: str) -> None:
+    """推送系统状态；只入队不等待发送，慢客户端不会阻塞初始化流程"""
+    status_broadcaster.publish({"ready": ready, "message": message, "status": status})
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 启动时初始化
-    global sqlite_instance, faiss_instance, embedding_instance, app_ready, init_message
+    global app_ready, init_message
     
     logger.info("正在初始化系统...")
     app_ready = False
     init_message = "正在启动系统..."
-    await status_broadcaster.broadcast(
-        {
-            "ready": app_ready,
-            "message": init_message,
-            "status": "initializing",
-        }
-    )
+    _publish_state(app_ready, init_message, "initializing")
 
     # Ensure model directories exist even if the meta folder was removed
     model_manager = get_model_manager()
@@ -59,22 +56,70 @@ async def lifespan(app: FastAPI):
     # Ensure database-related directories exist before services start (idempotent)
     DatabaseConfig.ensure_directories()
 
-    # 初始化嵌入服务
-    embedding_instance = EmbeddingService()
-    
-    # 初始化Reranker服务
-    reranker_service_instance = init_reranker_service()
-    
-    # 初始化BM25S服务
-    bm25s_service_instance = init_bm25s_service()
-    
-    # 初始化SQLite数据库管理器
-    sqlite_instance = SQLiteManager()
-    init_database_api(sqlite_instance)
-    
-    # 初始化Faiss向量数据库管理器
-    faiss_instance = FaissManager()
-    image_faiss_instance = ImageFaissManager()
+    # 检索相关服务直接读取 ServerConfig，需在初始化前应用运行时配置覆盖
+    ensure_runtime_overrides_loaded()
+
+    # 重量级服务模块（模型、索引）只在真正启动服务时导入，仅导入应用对象时不加载
+    from service.sqlite_service import SQLiteManager
+    from service.faiss_service import FaissManager
+    from service.image_faiss_service import ImageFaissManager
+    from service.embedding_service import EmbeddingService
+    from service.llm_client import SiliconFlowClient
+    from service.reranker_service import init_reranker_service
+    from service.bm25s_service import init_bm25s_service
+    from service.async_summary_service import get_async_summary_service
+
+    # 各服务构造相互独立且主要耗时在模型与索引加载（torch/faiss 会释放 GIL），
+    # 放到线程中并发初始化，启动耗时取决于最慢的一项而非总和
+    service_factories = {
+        "embedding": EmbeddingService,
+        "reranker": init_reranker_service,
+        "bm25s": lambda: init_bm25s_service(DatabaseConfig.BM25S_INDEX_DIR),
+        "sqlite": SQLiteManager,
+        "faiss": FaissManager,
+        "image_faiss": ImageFaissManager,
+    }
+    completed_services = 0
+
+    async def _init_service(name: str, factory):
+        global init_message
+        nonlocal completed_services
+        instance = await asyncio.to_thread(factory)
+        completed_services += 1
+        logger.info("服务 %s 初始化完成 (%d/%d)", name, completed_services, len(service_factories))
+        init_message = f"正在初始化服务 ({completed_services}/{len(service_factories)})..."
+        _publish_state(False, init_message, "initializing")
+        return instance
+
+    services = dict(
+        zip(
+            service_factories,
+            await asyncio.gather(
+                *(_init_service(name, factory) for name, factory in service_factories.items())
+            ),
+        )
+    )
+    embedding_instance = services["embedding"]
+    reranker_service_instance = services["reranker"]
+    bm25s_service_instance = services["bm25s"]
+    sqlite_instance = services["sqlite"]
+    faiss_instance = services["faiss"]
+    image_faiss_instance = services["image_faiss"]
+    # database_api 通过 api.dependencies.get_sqlite 从 app.state 读取数据库管理器；
+    # 其余服务仍由各 init_*_api 注入
+    app.state.sqlite = sqlite_instance
+
+    # Faiss 的 OpenMP 线程池默认占满所有核心，与 embedding/reranker 的 torch 线程并发时会超订 CPU；
+    # 可通过 FS_FAISS_THREADS 限制
+    faiss_threads = os.environ.get("FS_FAISS_THREADS")
+    if faiss_threads:
+        import faiss
+
+        try:
+            faiss.omp_set_num_threads(max(1, int(faiss_threads)))
+        except ValueError:
+            logger.warning("FS_FAISS_THREADS 配置无效: %s", faiss_threads)
+
     init_faiss_api(
         faiss_instance,
         embedding_instance,
@@ -117,17 +162,24 @@ async def lifespan(app: FastAPI):
     except Exception as exc:  # pragma: no cover - defensive logging
         logger.warning("初始化记忆 API 失败: %s", exc)
 
-    
+    # 可选预热：在仍处于 initializing 状态时完成模型加载与首次推理，首个用户请求不再承担冷启动开销
+    if os.environ.get("FS_WARMUP") == "1":
+        init_message = "正在预热模型..."
+        _publish_state(False, init_message, "initializing")
+        warmup_results = await asyncio.gather(
+            asyncio.to_thread(embedding_instance.encode_text, "warmup"),
+            asyncio.to_thread(reranker_service_instance.rerank_results, "warmup", ["warmup"]),
+            asyncio.to_thread(bm25s_service_instance.retrieve, "warmup", 1),
+            return_exceptions=True,
+        )
+        for name, result in zip(("embedding", "reranker", "bm25s"), warmup_results):
+            if isinstance(result, Exception):
+                logger.warning("服务 %s 预热失败: %s", name, result)
+
     logger.info("系统初始化完成")
     app_ready = True
     init_message = "系统初始化完成"
-    await status_broadcaster.broadcast(
-        {
-            "ready": app_ready,
-            "message": init_message,
-            "status": "ready",
-        }
-    )
+    _publish_state(app_ready, init_message, "ready")
     
     yield
     
@@ -135,21 +187,35 @@ async def lifespan(app: FastAPI):
     logger.info("正在关闭系统...")
     app_ready = False
     shutdown_message = "系统正在关闭..."
-    await status_broadcaster.broadcast(
-        {
-            "ready": app_ready,
-            "message": shutdown_message,
-            "status": "stopping",
-        }
-    )
+    _publish_state(app_ready, shutdown_message, "stopping")
+    await status_broadcaster.aclose()
+    summary_service = get_async_summary_service()
+    if summary_service is not None:
+        await summary_service.aclose()
+    await close_openai_clients()
+    close_chat_clients()
+    llm_client_instance.close()
+    faiss_instance.close()
+    sqlite_instance.close()
+
+# FS_OPENAPI=0 时不注册 /openapi.json、/docs、/redoc；启用时 FastAPI 会在首次访问后缓存 schema
+_openapi_enabled = os.environ.get("FS_OPENAPI", "1") != "0"
 
 app = FastAPI(
     title="文档管理系统API",
     description="基于FastAPI的文档管理和向量搜索系统",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=NumpyORJSONResponse,
+    openapi_url="/openapi.json" if _openapi_enabled else None,
+    docs_url="/docs" if _openapi_enabled else None,
+    redoc_url="/redoc" if _openapi_enabled else None,
 )
 
+# 自定义中间件必须写成纯 ASGI 形式(__init__(self, app) + async __call__(self, scope, receive, send))，
+# 不要继承 BaseHTTPMiddleware；统一在 CORSMiddleware 之前注册，使 CORS 保持最外层
+app.add_middleware(RequestTimingMiddleware)
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -157,32 +223,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 预检结果固定不变，让浏览器缓存预检响应(Chromium 上限 2 小时)，减少 OPTIONS 往返
+    max_age=86400,
 )
 
 
-# 注册路由
-app.include_router(database_router)
-app.include_router(faiss_router)
-app.include_router(document_router)
-
-app.include_router(model_router)
-app.include_router(config_router)
-app.include_router(chat_router)
-app.include_router(memory_router)
-app.include_router(status_router)
+# 注册路由：(router, 是否写入 OpenAPI)；内部推送通道不进入文档，OpenAPI 仍在首次访问 /openapi.json 时才生成
+ROUTERS = (
+    (database_router, True),
+    (faiss_router, True),
+    (document_router, True),
+    (model_router, True),
+    (config_router, True),
+    (chat_router, True),
+    (memory_router, True),
+    (status_router, False),
+)
+for router, include_in_schema in ROUTERS:
+    app.include_router(router, include_in_schema=include_in_schema)
 
 @app.get("/")
 async def root():
     return {"message": "文档管理系统API", "version": "1.0.0", "status": "running"}
 
-@app.get("/api/health/ready")
-async def health_ready():
-    global app_ready, init_message
-    return {
-        "ready": app_ready,
-        "message": init_message,
-        "status": "ready" if app_ready else "initializing"
-    }
+class _HealthReadyEndpoint:
+    """就绪探针的纯 ASGI 处理器：状态不变时直接复用已序列化的响应体，跳过路由依赖解析与 JSON 编码"""
+
+    def __init__(self) -> None:
+        self._state = None
+        self._body = b""
+
+    async def __call__(self, scope, receive, send) -> None:
+        state = (app_ready, init_message)
+        if state != self._state:
+            self._body = orjson.dumps(
+                {
+                    "ready": app_ready,
+                    "message": init_message,
+                    "status": "ready" if app_ready else "initializing",
+                }
+            )
+            self._state = state
+        body = self._body
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+app.router.routes.append(
+    Route("/api/health/ready", endpoint=_HealthReadyEndpoint(), methods=["GET"], include_in_schema=False)
+)
 
 
 if __name__ == "__main__":
@@ -190,4 +288,5 @@ if __name__ == "__main__":
 
     port = int(os.environ.get("FS_APP_API_PORT", ServerConfig.PORT))
     host = os.environ.get("FS_APP_API_HOST", ServerConfig.HOST)
-    uvicorn.run(app, host=host, port=port)
+    # 安装了 uvloop/httptools 时使用其事件循环与 HTTP 解析器，否则回退到 asyncio/h11
+    uvicorn.run(app, host=host, port=port, loop="auto", http="auto")
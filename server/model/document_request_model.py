@@ -1,10 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
 
+# 未挂到任何路由的模型延迟到首次使用时再构建校验器，减少启动时的 schema 生成
 class EmbeddingRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     text: str
     
 class EmbeddingResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     text: str
     embedding: List[float]
     dimension: int
@@ -1,21 +1,64 @@
 import asyncio
+import hashlib
+import json
 import logging
+import os
+import re
+import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, Optional, List
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, List, Tuple
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
-import requests
-from requests.exceptions import RequestException, Timeout
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
 
 from service.sqlite_service import SQLiteManager
 from service.llm_client import SiliconFlowClient, LLMClientError
+from service.openai_client_cache import OpenAIClientCache
 from service.text_utils import prepare_summary_preview, strip_think_tags
 
 logger = logging.getLogger(__name__)
 
+# 解析总结响应用到的正则，模块加载时编译一次
+_JSON_BLOCK_RE = re.compile(r'\{[^{}]*"title"[^{}]*"summary"[^{}]*\}', re.DOTALL)
+_TITLE_RE = re.compile(r'"title"\s*:\s*"([^"]*)"')
+_SUMMARY_RE = re.compile(r'"summary"\s*:\s*"([^"]*)"')
+_JSON_DECODER = json.JSONDecoder()
+
+# 参与总结的对话角色
+_DIALOG_ROLES = frozenset({"user", "assistant"})
+
+
+# 相同模型与提示的总结结果缓存（条数上限与有效期秒数）
+SUMMARY_CACHE_SIZE = 512
+SUMMARY_CACHE_TTL = 3600
+# 保留的任务记录上限与已结束任务的保留时长(秒)，超出后按插入顺序淘汰
+SUMMARY_MAX_TASKS = 1024
+SUMMARY_TASK_MAX_AGE = 24 * 3600
+# 缓存的 OpenAI 兼容异步客户端数量上限
+SUMMARY_OPENAI_CLIENT_CACHE_SIZE = 32
+
+
+def _summary_llm_concurrency() -> int:
+    """同时进行的总结模型调用数，可通过环境变量 FS_SUMMARY_LLM_CONCURRENCY 覆盖"""
+    value = os.environ.get("FS_SUMMARY_LLM_CONCURRENCY")
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning(f"FS_SUMMARY_LLM_CONCURRENCY 配置无效: {value}")
+    return 4
+
+
+def _utc_isoformat(timestamp: float) -> str:
+    """将 epoch 秒格式化为不带时区后缀的 UTC ISO 字符串（与原 datetime.utcnow().isoformat() 一致）"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None).isoformat()
+
 
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -29,38 +72,87 @@ class SummaryTask:
     task_id: str
     conversation_id: int
     status: TaskStatus
-    created_at: datetime
-    updated_at: datetime
+    # created_at/updated_at 为 time.monotonic() 秒数，仅在对外返回时结合 wall_created_at 换算为时间
+    created_at: float
+    updated_at: float
+    wall_created_at: float
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     progress: int = 0  # 0-100
+    # get_task_status 的结果缓存：(status, progress, updated_at) -> 状态字典，任务状态变化前轮询直接复用
+    _status_cache: Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]] = field(
+        default=None, compare=False, repr=False
+    )
 
 
 class AsyncSummaryService:
     def __init__(self, sqlite_manager: SQLiteManager, llm_client: Optional[SiliconFlowClient] = None):
         self.sqlite_manager = sqlite_manager
         self.llm_client = llm_client
-        self.tasks: Dict[str, SummaryTask] = {}
+        # 按创建顺序保存任务；插入时经 _terminal_queue 淘汰已结束任务，查询时惰性检查过期
+        self.tasks: "OrderedDict[str, SummaryTask]" = OrderedDict()
         self._running_tasks: Dict[str, asyncio.Task] = {}
+        # 已结束任务按结束顺序排队：(过期时刻, task_id)，清理时只需从队头弹出，无需扫描全部任务
+        self._terminal_queue: "deque[Tuple[float, str]]" = deque()
         # Provider base URLs (align with chat_api)
         self.MODELSCOPE_BASE_URL = "https://api-inference.modelscope.cn/v1/"
         self.DASHSCOPE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
         self.OLLAMA_REQUEST_TIMEOUT = 60
+        # 限制并发的模型调用数，并使用独立线程池执行同步 HTTP 调用，突发任务不会占满默认线程池
+        llm_concurrency = _summary_llm_concurrency()
+        self._llm_sem = asyncio.Semaphore(llm_concurrency)
+        self._llm_executor = ThreadPoolExecutor(
+            max_workers=llm_concurrency,
+            thread_name_prefix="summary-llm",
+        )
+        # Ollama 走原生异步 HTTP，连接池在首次调用时创建并复用
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # OpenAI 兼容 provider 的异步客户端按 (base_url, API Key 摘要) 做 LRU 缓存；
+        # 各客户端共享 self._http_client 连接池，淘汰时只需丢弃引用，连接池在 aclose 中统一关闭
+        self._openai_clients: OpenAIClientCache[AsyncOpenAI] = OpenAIClientCache(
+            lambda base_url, api_key: AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=self._get_http_client()
+            ),
+            maxsize=SUMMARY_OPENAI_CLIENT_CACHE_SIZE,
+        )
+        # 按 provider、模型与请求载荷内容寻址的响应缓存：key -> (写入时间, 模型响应)
+        self._response_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.OLLAMA_REQUEST_TIMEOUT),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._http_client
+
+    def _get_openai_client(self, base_url: str, api_key: str) -> AsyncOpenAI:
+        return self._openai_clients.get(base_url, api_key)
+
+    async def aclose(self) -> None:
+        """关闭复用的 HTTP 连接池与模型调用线程池"""
+        self._openai_clients.drain()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        self._llm_executor.shutdown(wait=False)
         
     def create_summary_task(self, conversation_id: int) -> str:
         """创建一个新的总结任务并返回任务ID"""
         task_id = str(uuid.uuid4())
-        now = datetime.utcnow()
+        now = time.monotonic()
         
         task = SummaryTask(
             task_id=task_id,
             conversation_id=conversation_id,
             status=TaskStatus.PENDING,
             created_at=now,
-            updated_at=now
+            updated_at=now,
+            wall_created_at=time.time(),
         )
         
         self.tasks[task_id] = task
+        self._evict_finished_tasks()
         logger.info(f"Created summary task {task_id} for conversation {conversation_id}")
         return task_id
     
@@ -69,18 +161,52 @@ class AsyncSummaryService:
         task = self.tasks.get(task_id)
         if not task:
             return None
+        if self._is_expired(task, time.monotonic()):
+            del self.tasks[task_id]
+            return None
             
-        return {
+        # 任务的每次状态变更都会刷新 updated_at，以此作为缓存版本
+        version = (task.status, task.progress, task.updated_at)
+        cached = task._status_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        status = {
             "task_id": task.task_id,
             "conversation_id": task.conversation_id,
             "status": task.status.value,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat(),
+            "created_at": _utc_isoformat(task.wall_created_at),
+            "updated_at": _utc_isoformat(task.wall_created_at + task.updated_at - task.created_at),
             "progress": task.progress,
             "result": task.result,
             "error": task.error
         }
+        task._status_cache = (version, status)
+        return status
     
+    @staticmethod
+    def _is_expired(task: SummaryTask, now: float) -> bool:
+        return (
+            task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+            and now - task.updated_at > SUMMARY_TASK_MAX_AGE
+        )
+
+    def _evict_finished_tasks(self) -> None:
+        """清理已过期的已结束任务；仍超过上限时按结束先后淘汰，进行中的任务保留"""
+        now = time.monotonic()
+        queue = self._terminal_queue
+        while queue and (queue[0][0] <= now or len(self.tasks) > SUMMARY_MAX_TASKS):
+            _, task_id = queue.popleft()
+            task = self.tasks.get(task_id)
+            if task is not None and task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                del self.tasks[task_id]
+
+    def _finish_task(self, task: SummaryTask, status: TaskStatus) -> None:
+        """将任务标记为已结束并登记到过期队列"""
+        task.status = status
+        task.updated_at = time.monotonic()
+        self._terminal_queue.append((task.updated_at + SUMMARY_TASK_MAX_AGE, task.task_id))
+
     async def start_summary_task(
         self,
         task_id: str,
@@ -106,7 +232,7 @@ class AsyncSummaryService:
         
         # 更新任务状态
         task.status = TaskStatus.RUNNING
-        task.updated_at = datetime.utcnow()
+        task.updated_at = time.monotonic()
         task.progress = 10
         
         logger.info(f"Started summary task {task_id}")
@@ -126,7 +252,7 @@ class AsyncSummaryService:
         try:
             # 更新进度：开始处理
             task.progress = 20
-            task.updated_at = datetime.utcnow()
+            task.updated_at = time.monotonic()
             
             # 获取对话消息
             records = self.sqlite_manager.get_conversation_messages(task.conversation_id)
@@ -135,22 +261,36 @@ class AsyncSummaryService:
             
             # 更新进度：构建提示
             task.progress = 40
-            task.updated_at = datetime.utcnow()
+            task.updated_at = time.monotonic()
             
             # 构建总结提示
             summary_messages = self._build_summary_prompt(records, max_history)
             
             # 更新进度：调用模型
             task.progress = 60
-            task.updated_at = datetime.utcnow()
+            task.updated_at = time.monotonic()
             
             # 调用LLM生成总结
             payload = self._build_llm_payload(model_selection, summary_messages, extra_body)
-            result = await self._invoke_llm_async(model_selection, payload)
+            cache_key = self._response_cache_key(model_selection, payload)
+            result = self._get_cached_response(cache_key)
+            if result is None:
+                max_tokens = payload.get("max_tokens") or 1
+
+                def _on_chunk(chunks: int) -> None:
+                    # 流式分片近似按 token 计数，模型调用阶段进度在 60-79 之间推进
+                    task.progress = 60 + min(19, chunks * 20 // max_tokens)
+                    task.updated_at = time.monotonic()
+
+                async with self._llm_sem:
+                    result = await self._invoke_llm_async(model_selection, payload, _on_chunk)
+                self._store_cached_response(cache_key, result)
+            else:
+                logger.info(f"Summary task {task_id} served from response cache")
             
             # 更新进度：处理结果
             task.progress = 80
-            task.updated_at = datetime.utcnow()
+            task.updated_at = time.monotonic()
             
             # 解析结果
             content = self._extract_completion_content(result)
@@ -180,8 +320,8 @@ class AsyncSummaryService:
                 "id": task.conversation_id,
                 "title": title_text,
                 "summary": summary_text,
-                "created_time": datetime.utcnow().isoformat(),
-                "updated_time": datetime.utcnow().isoformat(),
+                "created_time": _utc_isoformat(time.time()),
+                "updated_time": _utc_isoformat(time.time()),
             }
             
             last_message = records[-1] if records else None
@@ -199,36 +339,63 @@ class AsyncSummaryService:
             }
             
             # 更新任务状态为完成
-            task.status = TaskStatus.COMPLETED
             task.progress = 100
             task.result = result_data
-            task.updated_at = datetime.utcnow()
+            self._finish_task(task, TaskStatus.COMPLETED)
             
             logger.info(f"Summary task {task_id} completed successfully")
             
         except Exception as e:
             logger.error(f"Summary task {task_id} failed: {str(e)}")
-            task.status = TaskStatus.FAILED
             task.error = str(e)
-            task.updated_at = datetime.utcnow()
+            self._finish_task(task, TaskStatus.FAILED)
         finally:
             # 清理运行中的任务
             if task_id in self._running_tasks:
                 del self._running_tasks[task_id]
     
+    @staticmethod
+    def _response_cache_key(selection: Dict[str, Any], payload: Dict[str, Any]) -> str:
+        material = json.dumps(
+            {
+                "source": selection.get("source_id"),
+                "url": selection.get("api_url"),
+                "payload": payload,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _get_cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > SUMMARY_CACHE_TTL:
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return result
+
+    def _store_cached_response(self, key: str, result: Dict[str, Any]) -> None:
+        self._response_cache[key] = (time.monotonic(), result)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > SUMMARY_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+
     def _build_summary_prompt(self, messages: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
         """构建总结提示"""
-        filtered = [msg for msg in messages if msg.get("role") in {"user", "assistant"}]
-        trimmed = filtered[-limit:] if limit and len(filtered) > limit else filtered
-        transcript_lines: List[str] = []
-        for record in trimmed:
-            content = (record.get("content") or "").strip()
-            if not content:
-                continue
-            role = record.get("role")
-            role_label = "助手" if role == "assistant" else "用户"
-            transcript_lines.append(f"{role_label}：{content}")
-        transcript = "\n".join(transcript_lines).strip() or "（暂无有效对话内容）"
+        # 从尾部反向取最近 limit 条对话消息，长历史无需构造完整的过滤列表
+        dialog = (msg for msg in reversed(messages) if msg.get("role") in _DIALOG_ROLES)
+        trimmed = list(islice(dialog, limit)) if limit else list(dialog)
+        trimmed.reverse()
+        transcript = "\n".join(
+            f"{'助手' if record['role'] == 'assistant' else '用户'}：{content}"
+            for record in trimmed
+            if (content := (record.get("content") or "").strip())
+        ) or "（暂无有效对话内容）"
         system_prompt = (
             "你是总结助手，请阅读对话并仅输出 JSON，对象格式："
             '{"title": "...", "summary": "..."}。'
@@ -271,8 +438,13 @@ class AsyncSummaryService:
 
         return payload
 
-    async def _invoke_llm_async(self, selection: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
-        """异步调用LLM，遵循用户选择的 provider"""
+    async def _invoke_llm_async(
+        self,
+        selection: Dict[str, Any],
+        payload: Dict[str, Any],
+        on_chunk: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """异步调用LLM，遵循用户选择的 provider；支持流式的 provider 每收到一个分片回调一次累计分片数"""
         source_id = (selection.get("source_id") or "").strip()
         api_key = (selection.get("api_key") or "").strip()
         loop = asyncio.get_event_loop()
@@ -282,123 +454,16 @@ class AsyncSummaryService:
             url = (selection.get("api_url") or "").strip()
             if not url:
                 raise LLMClientError("Ollama 接口 URL 未配置")
+            return await self._stream_ollama(url, payload, on_chunk)
 
-            def call_ollama() -> Dict[str, Any]:
-                req_payload = dict(payload)
-                req_payload["stream"] = False
-                headers = {
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                }
-                try:
-                    response = requests.post(
-                        url,
-                        json=req_payload,
-                        headers=headers,
-                        timeout=self.OLLAMA_REQUEST_TIMEOUT,
-                    )
-                except (Timeout, RequestException) as exc:
-                    raise LLMClientError(str(exc)) from exc
-
-                body_text = ""
-                try:
-                    body_text = response.text or ""
-                except Exception:
-                    body_text = ""
-
-                if response.status_code != 200:
-                    error_payload: Optional[Dict[str, Any]] = None
-                    try:
-                        error_payload = response.json()
-                    except ValueError:
-                        error_payload = None
-                    message = None
-                    if isinstance(error_payload, dict):
-                        message = error_payload.get("error") or error_payload.get("message")
-                    if not message:
-                        message = body_text.strip() or response.reason or "Ollama 调用失败"
-                    raise LLMClientError(message, status_code=response.status_code, payload=error_payload)
-
-                try:
-                    return response.json()
-                except ValueError as exc:
-                    raise LLMClientError("无法解析 Ollama 返回的数据") from exc
-
-            return await loop.run_in_executor(None, call_ollama)
-
-        # ModelScope 兼容模式
-        if source_id == "modelscope":
-            if not api_key:
-                raise LLMClientError("缺少模型 API Key")
-
-            def call_modelscope() -> Dict[str, Any]:
-                client = OpenAI(api_key=api_key, base_url=self.MODELSCOPE_BASE_URL)
-                try:
-                    response = client.chat.completions.create(**payload)
-                except Exception as exc:  # pylint: disable=broad-except
-                    raise LLMClientError(str(exc)) from exc
-                result = response.model_dump()
-                choices = result.get("choices") or []
-                if choices:
-                    choice = choices[0]
-                    message = choice.get("message") or {}
-                    main_text = self._coerce_openai_content(message.get("content")).strip()
-                    reasoning_raw = (
-                        message.pop("reasoning_content", None)
-                        or message.pop("reasoning", None)
-                        or ""
-                    )
-                    reasoning_text = (
-                        "".join(str(item) for item in reasoning_raw)
-                        if isinstance(reasoning_raw, list)
-                        else str(reasoning_raw or "")
-                    ).strip()
-                    if reasoning_text:
-                        message["content"] = f"<think>{reasoning_text}</think>{main_text}"
-                    else:
-                        message["content"] = main_text
-                    choice["message"] = message
-                    result["choices"] = [choice]
-                return result
-
-            return await loop.run_in_executor(None, call_modelscope)
-
-        # DashScope 兼容模式
-        if source_id == "dashscope":
+        # ModelScope / DashScope 兼容模式
+        if source_id in ("modelscope", "dashscope"):
             if not api_key:
                 raise LLMClientError("缺少模型 API Key")
 
-            def call_dashscope() -> Dict[str, Any]:
-                client = OpenAI(api_key=api_key, base_url=self.DASHSCOPE_BASE_URL)
-                try:
-                    response = client.chat.completions.create(**payload)
-                except Exception as exc:  # pylint: disable=broad-except
-                    raise LLMClientError(str(exc)) from exc
-                result = response.model_dump()
-                choices = result.get("choices") or []
-                if choices:
-                    choice = choices[0]
-                    message = choice.get("message") or {}
-                    main_text = (message.get("content") or "").strip()
-                    reasoning_raw = (
-                        message.pop("reasoning_content", None)
-                        or message.pop("reasoning", None)
-                        or ""
-                    )
-                    reasoning_text = (
-                        "".join(str(item) for item in reasoning_raw)
-                        if isinstance(reasoning_raw, list)
-                        else str(reasoning_raw or "")
-                    ).strip()
-                    if reasoning_text:
-                        message["content"] = f"<think>{reasoning_text}</think>{main_text}"
-                    else:
-                        message["content"] = main_text
-                    choice["message"] = message
-                    result["choices"] = [choice]
-                return result
-
-            return await loop.run_in_executor(None, call_dashscope)
+            base_url = self.MODELSCOPE_BASE_URL if source_id == "modelscope" else self.DASHSCOPE_BASE_URL
+            client = self._get_openai_client(base_url, api_key)
+            return await self._stream_openai_compatible(client, payload, on_chunk)
 
         # 默认走 SiliconFlow 客户端
         if not self.llm_client:
@@ -407,12 +472,112 @@ class AsyncSummaryService:
             raise LLMClientError("缺少模型 API Key")
 
         return await loop.run_in_executor(
-            None,
+            self._llm_executor,
             self.llm_client.chat_completion,
             api_key,
             payload,
         )
     
+    @staticmethod
+    def _completion_result(main_text: str, reasoning_text: str) -> Dict[str, Any]:
+        """将流式累积的正文与思考内容组装成非流式响应的结构，供缓存与解析复用"""
+        main_text = main_text.strip()
+        reasoning_text = reasoning_text.strip()
+        content = f"<think>{reasoning_text}</think>{main_text}" if reasoning_text else main_text
+        return {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+
+    async def _stream_openai_compatible(
+        self,
+        client: AsyncOpenAI,
+        payload: Dict[str, Any],
+        on_chunk: Optional[Callable[[int], None]],
+    ) -> Dict[str, Any]:
+        """以流式方式调用 OpenAI 兼容接口，边接收边累积正文与思考内容"""
+        main_parts: List[str] = []
+        reasoning_parts: List[str] = []
+        chunks = 0
+        try:
+            stream = await client.chat.completions.create(**{**payload, "stream": True})
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta is None:
+                    continue
+                reasoning = getattr(delta, "reasoning_content", None) or getattr(delta, "reasoning", None)
+                if reasoning:
+                    reasoning_parts.append(self._coerce_openai_content(reasoning))
+                if delta.content:
+                    main_parts.append(self._coerce_openai_content(delta.content))
+                chunks += 1
+                if on_chunk is not None:
+                    on_chunk(chunks)
+        except Exception as exc:  # pylint: disable=broad-except
+            raise LLMClientError(str(exc)) from exc
+        return self._completion_result("".join(main_parts), "".join(reasoning_parts))
+
+    async def _stream_ollama(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        on_chunk: Optional[Callable[[int], None]],
+    ) -> Dict[str, Any]:
+        """以流式方式调用 Ollama，逐行解析 NDJSON/SSE 分片"""
+        req_payload = dict(payload)
+        req_payload["stream"] = True
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        main_parts: List[str] = []
+        reasoning_parts: List[str] = []
+        chunks = 0
+        try:
+            async with self._get_http_client().stream("POST", url, json=req_payload, headers=headers) as response:
+                if response.status_code != 200:
+                    body_text = (await response.aread()).decode("utf-8", errors="replace")
+                    error_payload: Optional[Dict[str, Any]] = None
+                    try:
+                        error_payload = json.loads(body_text)
+                    except ValueError:
+                        error_payload = None
+                    message = None
+                    if isinstance(error_payload, dict):
+                        message = error_payload.get("error") or error_payload.get("message")
+                    if not message:
+                        message = body_text.strip() or response.reason_phrase or "Ollama 调用失败"
+                    raise LLMClientError(message, status_code=response.status_code, payload=error_payload)
+
+                async for raw_line in response.aiter_lines():
+                    line = raw_line.strip()
+                    if line.startswith("data:"):
+                        line = line[5:].strip()
+                    if not line or line == "[DONE]":
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        logger.debug(f"忽略无法解析的 Ollama 流数据: {line}")
+                        continue
+                    # OpenAI 兼容端点返回 choices[].delta，原生 /api/chat 返回 message
+                    choices = event.get("choices") or []
+                    if choices:
+                        piece = choices[0].get("delta") or choices[0].get("message") or {}
+                    else:
+                        piece = event.get("message") or {}
+                    reasoning = piece.get("reasoning_content") or piece.get("thinking")
+                    if reasoning:
+                        reasoning_parts.append(self._coerce_openai_content(reasoning))
+                    content = piece.get("content")
+                    if content:
+                        main_parts.append(self._coerce_openai_content(content))
+                    chunks += 1
+                    if on_chunk is not None:
+                        on_chunk(chunks)
+        except httpx.HTTPError as exc:
+            raise LLMClientError(str(exc)) from exc
+        return self._completion_result("".join(main_parts), "".join(reasoning_parts))
+
     def _extract_completion_content(self, result: Dict[str, Any]) -> str:
         """提取完成内容"""
         choices = result.get("choices") or []
@@ -438,9 +603,6 @@ class AsyncSummaryService:
     
     def _parse_summary_response(self, content: str) -> Dict[str, str]:
         """解析总结响应"""
-        import json
-        import re
-        
         content = content.strip()
         if not content:
             return {}
@@ -451,8 +613,18 @@ class AsyncSummaryService:
         except json.JSONDecodeError:
             pass
         
+        # 模型常在 JSON 前后附带说明文字：从第一个 '{' 起线性解析出完整对象，无需正则回溯
+        start = content.find("{")
+        if start != -1:
+            try:
+                parsed, _ = _JSON_DECODER.raw_decode(content, start)
+            except json.JSONDecodeError:
+                parsed = None
+            if isinstance(parsed, dict) and ("title" in parsed or "summary" in parsed):
+                return parsed
+        
         # 尝试提取JSON块
-        json_match = re.search(r'\{[^{}]*"title"[^{}]*"summary"[^{}]*\}', content, re.DOTALL)
+        json_match = _JSON_BLOCK_RE.search(content)
         if json_match:
             try:
                 return json.loads(json_match.group())
@@ -460,8 +632,8 @@ class AsyncSummaryService:
                 pass
         
         # 尝试提取title和summary字段
-        title_match = re.search(r'"title"\s*:\s*"([^"]*)"', content)
-        summary_match = re.search(r'"summary"\s*:\s*"([^"]*)"', content)
+        title_match = _TITLE_RE.search(content)
+        summary_match = _SUMMARY_RE.search(content)
         
         return {
             "title": title_match.group(1) if title_match else "",
@@ -476,20 +648,6 @@ class AsyncSummaryService:
         if len(normalized) > 60:
             return normalized[:57] + "..."
         return normalized
-    
-    def cleanup_completed_tasks(self, max_age_hours: int = 24) -> None:
-        """清理已完成的旧任务"""
-        cutoff_time = datetime.utcnow().timestamp() - (max_age_hours * 3600)
-        tasks_to_remove = []
-        
-        for task_id, task in self.tasks.items():
-            if (task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] and 
-                task.updated_at.timestamp() < cutoff_time):
-                tasks_to_remove.append(task_id)
-        
-        for task_id in tasks_to_remove:
-            del self.tasks[task_id]
-            logger.info(f"Cleaned up old task {task_id}")
 
 
 # 全局服务实例
@@ -1,13 +1,37 @@
 import bm25s
-import jieba
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 import json
 import numpy as np
 
+try:  # pragma: no cover - optional C-accelerated tokenizer with the same API
+    import jieba_fast as jieba
+except ImportError:  # pragma: no cover - fall back to pure-Python jieba
+    import jieba
+
 logger = logging.getLogger(__name__)
 
+# 分词结果缓存上限；重复出现的查询与检索候选无需重新分词
+TOKEN_CACHE_SIZE = 4096
+
+# 持久化索引目录中记录语料指纹的文件名
+INDEX_FINGERPRINT_FILE = "fingerprint.json"
+
+
+def _corpus_fingerprint(doc_ids: List[str], corpus: List[str]) -> str:
+    """计算语料指纹，用于判断磁盘上的索引是否与当前文档一致"""
+    digest = hashlib.blake2b(digest_size=16)
+    for doc_id, content in zip(doc_ids, corpus):
+        digest.update(str(doc_id).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(content.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
 class BM25SService:
     """
     BM25S服务类，用于文本检索和打分
@@ -25,6 +49,23 @@ class BM25SService:
         self.corpus = []  # 存储文档内容
         self.doc_ids = []  # 存储文档ID映射
         self.is_loaded = False
+        # 按内容摘要缓存查询与候选文档的分词结果（LRU），打分可能在多个工作线程中并发调用
+        self._token_cache: "OrderedDict[bytes, List[str]]" = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        
+    def _tokenize_cached(self, content: str) -> List[str]:
+        key = hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest()
+        with self._token_cache_lock:
+            tokens = self._token_cache.get(key)
+            if tokens is not None:
+                self._token_cache.move_to_end(key)
+                return tokens
+        tokens = jieba.lcut(content)
+        with self._token_cache_lock:
+            self._token_cache[key] = tokens
+            if len(self._token_cache) > TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
+        return tokens
         
     def build_index(self, documents: List[Dict[str, Any]]) -> bool:
         """
@@ -53,18 +94,22 @@ class BM25SService:
             if not self.corpus:
                 logger.warning("没有有效的文档内容用于构建索引")
                 return False
+
+            # 磁盘上已有与当前语料一致的索引时直接以 mmap 方式加载，跳过分词与建索引
+            fingerprint = _corpus_fingerprint(self.doc_ids, self.corpus)
+            if self.index_path and self.load_index(self.index_path, fingerprint):
+                logger.info("已从磁盘加载BM25S索引: %s", self.index_path)
+                return True
             
             # 中文分词处理
             logger.info("开始中文分词处理...")
-            corpus_tokens = []
-            for content in self.corpus:
-                # 使用jieba进行中文分词
-                tokens = jieba.lcut(content)
-                corpus_tokens.append(tokens)
+            # 使用jieba进行中文分词（安装 jieba_fast 时走 C 实现）
+            corpus_tokens = [jieba.lcut(content) for content in self.corpus]
             
             # 创建BM25S检索器
             logger.info("创建BM25S检索器...")
-            self.retriever = bm25s.BM25(corpus=self.corpus)
+            # 语料由 self.corpus 自行维护，检索器只保存词频矩阵，retrieve 返回下标而非文档
+            self.retriever = bm25s.BM25()
             self.retriever.index(corpus_tokens)
             
             self.is_loaded = True
@@ -72,13 +117,69 @@ class BM25SService:
             
             # 保存索引（如果指定了路径）
             if self.index_path:
-                self.save_index(self.index_path)
+                self.save_index(self.index_path, fingerprint)
             
             return True
             
         except Exception as e:
             logger.error(f"构建BM25S索引失败: {e}")
             return False
+
+    def save_index(self, index_path: Path, fingerprint: str) -> bool:
+        """
+        将索引保存到磁盘（不含语料，语料由调用方每次启动时提供）
+
+        Args:
+            index_path: 索引目录
+            fingerprint: 当前语料指纹
+
+        Returns:
+            保存是否成功
+        """
+        try:
+            index_dir = Path(index_path)
+            index_dir.mkdir(parents=True, exist_ok=True)
+            # 先删除旧指纹，保存中途失败时不会误用不完整的索引
+            fingerprint_path = index_dir / INDEX_FINGERPRINT_FILE
+            fingerprint_path.unlink(missing_ok=True)
+            self.retriever.save(str(index_dir))
+            fingerprint_path.write_text(
+                json.dumps({"fingerprint": fingerprint, "num_docs": len(self.corpus)}),
+                encoding="utf-8",
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"保存BM25S索引失败: {e}")
+            return False
+
+    def load_index(self, index_path: Path, fingerprint: str) -> bool:
+        """
+        以 mmap 方式加载磁盘上的索引，指纹与当前语料不一致时不加载
+
+        Args:
+            index_path: 索引目录
+            fingerprint: 当前语料指纹
+
+        Returns:
+            加载是否成功
+        """
+        fingerprint_path = Path(index_path) / INDEX_FINGERPRINT_FILE
+        try:
+            saved = json.loads(fingerprint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if saved.get("fingerprint") != fingerprint:
+            logger.info("BM25S索引与当前语料不一致，重新构建")
+            return False
+
+        try:
+            self.retriever = bm25s.BM25.load(str(index_path), mmap=True)
+        except Exception as e:
+            logger.warning(f"加载BM25S索引失败: {e}")
+            self.retriever = None
+            return False
+        self.is_loaded = True
+        return True
     
     def score_documents(self, query: str, documents: List[str]) -> List[float]:
         """
@@ -95,21 +196,18 @@ class BM25SService:
             return []
         
         try:
-            # 临时构建索引进行打分
-            temp_corpus = documents.copy()
-            temp_tokens = [jieba.lcut(doc) for doc in temp_corpus]
-            
-            temp_retriever = bm25s.BM25(corpus=temp_corpus)
-            temp_retriever.index(temp_tokens)
+            # 候选集 IDF 依赖本次文档集合，仍临时建索引；分词结果走缓存
+            temp_tokens = [self._tokenize_cached(doc) for doc in documents]
             
-            # 查询分词
-            query_tokens = jieba.lcut(query)
+            temp_retriever = bm25s.BM25()
+            temp_retriever.index(temp_tokens, show_progress=False)
             
-            # 获取分数
-            _, scores = temp_retriever.retrieve([query_tokens], k=len(documents))
+            # 查询分词同样走缓存，重复查询无需再次分词
+            query_tokens = self._tokenize_cached(query)
             
-            # 返回分数列表
-            return [float(scores[0, i]) for i in range(len(documents))]
+            # get_scores 按输入文档顺序返回分数，无需排序检索
+            scores = temp_retriever.get_scores(query_tokens)
+            return np.asarray(scores, dtype=np.float64).tolist()
             
         except Exception as e:
             logger.error(f"BM25S文档打分失败: {e}")
@@ -134,7 +232,7 @@ class BM25SService:
             return []
 
         try:
-            query_tokens = jieba.lcut(query)
+            query_tokens = self._tokenize_cached(query)
             available_docs = len(self.corpus)
             if available_docs == 0:
                 return []
@@ -207,6 +305,8 @@ def init_bm25s_service(index_path: Optional[Path] = None) -> BM25SService:
     """初始化全局BM25S服务并返回实例。"""
 
     global bm25s_service
+    # 启动阶段预先加载分词词典，避免首次检索/建索引时才加载
+    jieba.initialize()
     bm25s_service = BM25SService(index_path=index_path)
     logger.info("BM25S服务初始化成功")
     return bm25s_service
@@ -1,7 +1,8 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from threading import Lock
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 from PIL import Image
@@ -21,6 +22,52 @@ logger = logging.getLogger(__name__)
 
 
 PRIMARY_MODEL_KEYS = ("clip_vit_b_32_multilingual", "clip_vit_b_32")
+# 批量编码图片时每批解码并前向的图片数，限制同时驻留内存的解码图片
+IMAGE_ENCODE_BATCH_SIZE = 16
+# 并行解码图片的线程数上限（PIL 解码期间释放 GIL）
+IMAGE_DECODE_WORKERS = 8
+# CLIP 预处理会把短边缩放到 224，JPEG 解码时只需保证短边不小于该值
+IMAGE_DECODE_MIN_SIZE = 256
+
+
+def _load_rgb_image(image_path: Path) -> Image.Image:
+    """读取图片为 RGB；JPEG 通过 draft 直接按 1/2~1/8 比例解码，短边仍不小于 IMAGE_DECODE_MIN_SIZE。"""
+    with Image.open(image_path) as img:
+        img.draft("RGB", (IMAGE_DECODE_MIN_SIZE, IMAGE_DECODE_MIN_SIZE))
+        return img.convert("RGB")
+
+
+# 已加载的 CLIP 模型按解析后的路径共享，文本与图像编码落到同一模型时只驻留一份
+_loaded_models: Dict[str, "SentenceTransformer"] = {}
+_loaded_models_lock = Lock()
+
+
+def _load_clip_model(model_path: Path) -> "SentenceTransformer":
+    """按路径加载并缓存 CLIP 模型；有 CUDA 时放到 GPU 并转为 fp16，显存占用减半。"""
+    key = str(Path(model_path).resolve())
+    with _loaded_models_lock:
+        model = _loaded_models.get(key)
+        if model is not None:
+            return model
+        try:
+            import torch
+
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        except ImportError:  # pragma: no cover - torch ships with sentence-transformers
+            device = "cpu"
+        model = SentenceTransformer(str(model_path), device=device)
+        if device == "cuda":
+            model.half()
+        _loaded_models[key] = model
+        return model
+
+
+def _try_load_rgb_image(image_path: Path) -> Optional[Image.Image]:
+    try:
+        return _load_rgb_image(image_path)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("读取图片失败 %s: %s", image_path, exc)
+        return None
 
 
 class CLIPEmbeddingService:
@@ -47,7 +94,7 @@ class CLIPEmbeddingService:
                 return
             model_key, model_path = self._resolve_model_path()
             logger.info("加载 CLIP 文本模型 (%s): %s", model_key, model_path)
-            self._model = SentenceTransformer(str(model_path))
+            self._model = _load_clip_model(model_path)
             self._model_key = model_key
             logger.info("CLIP 文本模型加载完成: %s", model_key)
 
@@ -74,7 +121,7 @@ class CLIPEmbeddingService:
             if image_model_path is None:
                 image_model_path = ensure_model_downloaded("clip_vit_b_32_multilingual")
             logger.info("加载用于图像编码的 CLIP 模型: %s", image_model_path)
-            self._image_model = SentenceTransformer(str(image_model_path))
+            self._image_model = _load_clip_model(image_model_path)
             logger.info("图像编码 CLIP 模型加载完成")
 
     def _resolve_model_path(self) -> Tuple[str, Path]:
@@ -94,29 +141,77 @@ class CLIPEmbeddingService:
                 "未能加载 CLIP 多语言文本模型，请在模型管理中下载 clip-ViT-B-32-multilingual。"
             ) from exc
 
-    def encode_image_path(self, image_path: Path) -> List[float]:
-        """Encode image located at the given path into a dense vector."""
+    def _get_image_model(self) -> "SentenceTransformer":
         # 确保文本模型与图像模型均按需可用
         self._ensure_model_loaded()
         self._ensure_image_model_loaded()
         model = self._image_model if self._image_model is not None else self._model
         assert model is not None  # 运行保护
-        with Image.open(image_path) as img:
-            image = img.convert("RGB")
-            vector = model.encode(
-                [image],
-                convert_to_numpy=True,
-                normalize_embeddings=True,
-                batch_size=1,
-                show_progress_bar=False,
-            )[0]  # type: ignore[index]
-        return self._to_list(vector)
+        return model
+
+    def encode_image_path(self, image_path: Path) -> List[float]:
+        """Encode image located at the given path into a dense vector."""
+        return self._to_list(self.encode_image_path_np(image_path))
+
+    def encode_image_path_np(self, image_path: Path) -> np.ndarray:
+        """Encode image into a normalized float32 vector without converting to a Python list."""
+        model = self._get_image_model()
+        image = _load_rgb_image(image_path)
+        vector = model.encode(
+            [image],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            batch_size=1,
+            show_progress_bar=False,
+        )[0]  # type: ignore[index]
+        return np.asarray(vector, dtype=np.float32)
+
+    def encode_image_paths(self, image_paths: Sequence[Path]) -> List[Optional[np.ndarray]]:
+        """Batch encode images into float32 vectors; entries whose file cannot be read are None."""
+        results: List[Optional[np.ndarray]] = [None] * len(image_paths)
+        if not image_paths:
+            return results
+        model = self._get_image_model()
+        batches = [
+            range(start, min(start + IMAGE_ENCODE_BATCH_SIZE, len(image_paths)))
+            for start in range(0, len(image_paths), IMAGE_ENCODE_BATCH_SIZE)
+        ]
+        workers = min(IMAGE_DECODE_WORKERS, len(image_paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clip-decode") as executor:
+            # 多线程解码，并在编码当前批次时预先解码下一批
+            pending = [executor.submit(_try_load_rgb_image, image_paths[position]) for position in batches[0]]
+            for index, batch in enumerate(batches):
+                decoded = [future.result() for future in pending]
+                if index + 1 < len(batches):
+                    pending = [
+                        executor.submit(_try_load_rgb_image, image_paths[position])
+                        for position in batches[index + 1]
+                    ]
+                positions = [position for position, image in zip(batch, decoded) if image is not None]
+                images = [image for image in decoded if image is not None]
+                if not images:
+                    continue
+                vectors = model.encode(
+                    images,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    batch_size=len(images),
+                    show_progress_bar=False,
+                )
+                vectors = np.asarray(vectors, dtype=np.float32)
+                for position, vector in zip(positions, vectors):
+                    results[position] = vector
+        return results
 
     def encode_texts(self, texts: Sequence[str]) -> List[List[float]]:
         """Batch encode multiple texts into CLIP embeddings."""
+        return self.encode_texts_np(texts).tolist()
+
+    def encode_texts_np(self, texts: Sequence[str]) -> np.ndarray:
+        """Batch encode texts into a (n, dim) float32 matrix; empty input yields zero rows."""
         cleaned = [str(text) for text in texts if str(text).strip()]
         if not cleaned:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         self._ensure_model_loaded()
         vectors = self._model.encode(
             cleaned,
@@ -124,10 +219,11 @@ class CLIPEmbeddingService:
             normalize_embeddings=True,
             show_progress_bar=False,
         )
-        return [self._to_list(vec) for vec in vectors]
+        return np.asarray(vectors, dtype=np.float32)
 
     @staticmethod
     def _to_list(vector: Sequence[float]) -> List[float]:
+        # GPU 上的 fp16 模型输出在此边界统一转回 float32
         if isinstance(vector, np.ndarray):
             return vector.astype(np.float32).tolist()
         return [float(x) for x in vector]
@@ -1,15 +1,68 @@
 from FlagEmbedding import BGEM3FlagModel
+from pathlib import Path
 from threading import Lock
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 import logging
+import os
+
+import numpy as np
 
 from service.model_manager import ensure_model_downloaded
 
 logger = logging.getLogger(__name__)
 
+# 可选 ONNX 模型文件（相对模型目录），优先使用离线 INT8 动态量化后的版本
+ONNX_MODEL_CANDIDATES = ("onnx/model_quantized.onnx", "onnx/model.onnx")
+
+
+def _use_onnx_backend() -> bool:
+    """FS_EMBEDDING_BACKEND=onnx 时在 CPU 上通过 ONNX Runtime 推理，默认使用 FlagEmbedding/PyTorch"""
+    return (os.environ.get("FS_EMBEDDING_BACKEND") or "").strip().lower() == "onnx"
+
+
+class _OnnxBGEM3Model:
+    """BGE-M3 稠密向量的 ONNX Runtime 推理封装，encode 的参数与返回结构与 BGEM3FlagModel 一致"""
+
+    def __init__(self, model_path: Path) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        onnx_path = next(
+            (model_path / name for name in ONNX_MODEL_CANDIDATES if (model_path / name).exists()),
+            None,
+        )
+        if onnx_path is None:
+            raise FileNotFoundError(f"未找到 BGE-M3 ONNX 模型: {model_path}")
+        self._tokenizer = AutoTokenizer.from_pretrained(str(model_path))
+        self._session = ort.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+        self._input_names = {item.name for item in self._session.get_inputs()}
+        output_names = [item.name for item in self._session.get_outputs()]
+        # 官方导出直接输出 dense_vecs；通用导出输出 last_hidden_state，取 CLS 向量
+        self._output_name = "dense_vecs" if "dense_vecs" in output_names else output_names[0]
+        logger.info("BGE-M3 使用 ONNX Runtime 推理: %s", onnx_path)
+
+    def encode(self, texts: List[str], batch_size: int = 12, max_length: int = 8192, **_: Any) -> Dict[str, np.ndarray]:
+        batches: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self._tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                return_tensors="np",
+            )
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            output = self._session.run([self._output_name], feeds)[0]
+            vectors = output if output.ndim == 2 else output[:, 0]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            batches.append((vectors / np.maximum(norms, 1e-12)).astype(np.float32))
+        dense = np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+        return {"dense_vecs": dense}
+
+
 class EmbeddingService:
     def __init__(self) -> None:
-        self._model: Optional[BGEM3FlagModel] = None
+        self._model: Optional[Union[BGEM3FlagModel, _OnnxBGEM3Model]] = None
         self._model_lock = Lock()
 
     def _ensure_model_loaded(self) -> None:
@@ -20,7 +73,10 @@ class EmbeddingService:
                 return
             model_path = ensure_model_downloaded("bge_m3")
             logger.info("开始加载 BGE-M3 Embedding 模型: %s", model_path)
-            self._model = BGEM3FlagModel(str(model_path), use_fp16=True)
+            if _use_onnx_backend():
+                self._model = _OnnxBGEM3Model(Path(model_path))
+            else:
+                self._model = BGEM3FlagModel(str(model_path), use_fp16=True)
             logger.info("BGE-M3 Embedding 模型加载完成")
 
     def encode_text(self, text: str) -> List[float]:
@@ -38,13 +94,27 @@ class EmbeddingService:
     
     def encode_texts(self, texts: List[str]) -> List[List[float]]:
         """对多个文本进行向量化"""
+        if not texts:
+            return []
+        # 整个二维数组一次转换为嵌套列表，避免逐行 tolist
+        return self.encode_texts_np(texts).tolist()
+
+    def encode_texts_np(self, texts: List[str]) -> np.ndarray:
+        """对多个文本进行向量化，返回 (n, dim) 的 float32 矩阵，不转换为 Python 列表"""
         self._ensure_model_loaded()
         model = self._model
         assert model is not None
-        result = model.encode(texts,
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        # 按长度排序后分批，同批文本长度接近，减少补齐到最长文本的 padding 计算；编码后再还原顺序
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        result = model.encode([texts[i] for i in order],
                               batch_size=12,
                               max_length=8192,
                               return_dense=True,
                               return_sparse=False,
                               return_colbert_vecs=False)
-        return [vec.tolist() for vec in result['dense_vecs']]
+        sorted_vecs = np.asarray(result['dense_vecs']).astype(np.float32, copy=False)
+        dense_vecs = np.empty_like(sorted_vecs)
+        dense_vecs[order] = sorted_vecs
+        return dense_vecs
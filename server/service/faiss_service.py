@@ -1,13 +1,31 @@
 import json
+import os
+import threading
 import faiss
 import numpy as np
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from config.config import DatabaseConfig
 from .sqlite_service import SQLiteManager
 
 logger = logging.getLogger(__name__)
 
+# HNSW 图索引参数：每个节点的邻居数、建图与检索时的候选队列长度
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+
+def _faiss_index_type() -> str:
+    """新建索引的类型：flat（默认，精确检索，可原地删除）或 hnsw（图检索，删除需整体重建），
+    可通过环境变量 FS_FAISS_INDEX_TYPE 覆盖"""
+    value = (os.environ.get("FS_FAISS_INDEX_TYPE") or "flat").strip().lower()
+    if value not in ("hnsw", "flat"):
+        logger.warning(f"FS_FAISS_INDEX_TYPE 配置无效: {value}")
+        return "flat"
+    return value
+
+
 class FaissManager:
     """Faiss向量数据库管理器"""
     
@@ -15,27 +33,109 @@ class FaissManager:
         self.dimension = dimension
         self.index_path = DatabaseConfig.VECTOR_INDEX_PATH
         self.metadata_path = DatabaseConfig.VECTOR_METADATA_PATH
+        # 已分配向量ID的高水位，保证截断或删除后不会重复分配旧ID
+        self.next_id_path = self.metadata_path.with_name(self.metadata_path.stem + '.next_id')
         self.index = None
         self.metadata = []
         self.next_vector_id = 0
+        self._type_index: Dict[str, List[int]] = {}
+        # 元数据以 JSONL 追加写入；二进制索引由调用方在引用新向量ID前显式 flush，_pending 为尚未落盘的向量数
+        self._lock = threading.RLock()
+        self._pending = 0
         DatabaseConfig.ensure_directories()
         self.init_index()  # 自动初始化索引
     
+    def _new_index(self, index_type: Optional[str] = None) -> "faiss.Index":
+        """创建空索引（内积相似度），未指定类型时按 FS_FAISS_INDEX_TYPE 选择"""
+        if (index_type or _faiss_index_type()) == "flat":
+            return faiss.IndexFlatIP(self.dimension)
+        index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
     def init_index(self):
         """初始化Faiss索引"""
         if self.index_path.exists():
             # 加载现有索引
             self.index = faiss.read_index(str(self.index_path))
-            if self.metadata_path.exists():
-                with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
+            if isinstance(self.index, faiss.IndexHNSW):
+                self.index.hnsw.efSearch = HNSW_EF_SEARCH
+            self.metadata = self._load_metadata()
+            # 截断前记录文件中出现过的最大ID，丢失的ID不再分配
+            high_water = max(self._compute_next_vector_id(), self._read_next_id())
+            if len(self.metadata) > self.index.ntotal:
+                # 上次退出前索引未及写盘，丢弃没有对应向量的元数据
+                logger.warning(
+                    "Faiss元数据(%d)多于索引向量(%d)，截断未落盘的元数据",
+                    len(self.metadata),
+                    self.index.ntotal,
+                )
+                self._write_next_id(high_water)
+                del self.metadata[self.index.ntotal:]
+                self._write_metadata()
         else:
             # 创建新索引
-            self.index = faiss.IndexFlatIP(self.dimension)  # 使用内积相似度
+            high_water = self.next_vector_id = max(self.next_vector_id, self._read_next_id())
+            self.index = self._new_index()
             self.metadata = []
             self.save_index()
 
-        self.next_vector_id = self._compute_next_vector_id()
+        self.next_vector_id = max(self._compute_next_vector_id(), high_water)
+        self._rebuild_type_index()
+
+    def _load_metadata(self) -> List[Dict]:
+        """读取 JSONL 元数据；仅存在旧版 JSON 数组文件时读取后迁移为 JSONL"""
+        if self.metadata_path.exists():
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        legacy_path = self.metadata_path.with_suffix('.json')
+        if legacy_path != self.metadata_path and legacy_path.exists():
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            self.metadata = metadata
+            self._write_metadata()
+            return metadata
+        return []
+
+    def _write_metadata(self) -> None:
+        """整体重写 JSONL 元数据（更新、删除等非追加场景）"""
+        tmp_path = self.metadata_path.with_name(self.metadata_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.metadata:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write('\n')
+        os.replace(tmp_path, self.metadata_path)
+
+    def _read_next_id(self) -> int:
+        try:
+            return int(self.next_id_path.read_text(encoding='utf-8').strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_next_id(self, next_id: int) -> None:
+        tmp_path = self.next_id_path.with_name(self.next_id_path.name + '.tmp')
+        tmp_path.write_text(str(next_id), encoding='utf-8')
+        os.replace(tmp_path, self.next_id_path)
+
+    @staticmethod
+    def _metadata_type(metadata: Dict) -> str:
+        """元数据的文档类型，缺少file_type字段时归为unknown"""
+        return metadata['file_type'] if 'file_type' in metadata else 'unknown'
+
+    def _rebuild_type_index(self) -> None:
+        """重建 文档类型 -> 元数据下标 的索引"""
+        type_index: Dict[str, List[int]] = {}
+        for position, metadata in enumerate(self.metadata):
+            type_index.setdefault(self._metadata_type(metadata), []).append(position)
+        self._type_index = type_index
+
+    def get_metadata_by_type(self, doc_type: str, offset: int = 0, limit: int = 100) -> Tuple[List[Dict], int]:
+        """按文档类型分页获取元数据，返回(当前页元数据, 该类型总数)"""
+        positions = self._type_index.get(doc_type, [])
+        start = max(offset, 0)
+        end = start + max(limit, 0)
+        return [self.metadata[position] for position in positions[start:end]], len(positions)
 
     def _compute_next_vector_id(self) -> int:
         if not self.metadata:
@@ -52,30 +152,50 @@ class FaissManager:
         
         # 标准化向量（用于余弦相似度）
         faiss.normalize_L2(vectors)
-        
-        # 生成唯一的向量ID
-        start_id = self.next_vector_id
-        
-        # 添加向量
-        self.index.add(vectors)
-        
-        # 添加元数据
-        vector_ids = []
-        for i, metadata in enumerate(metadata_list):
-            vector_id = start_id + i
-            self.metadata.append({
-                'vector_id': vector_id,
-                **metadata
-            })
-            vector_ids.append(vector_id)
-        
-        # 更新下一个可用的向量ID
-        self.next_vector_id = start_id + len(metadata_list)
 
-        # 保存索引和元数据
-        self.save_index()
+        with self._lock:
+            # 生成唯一的向量ID
+            start_id = self.next_vector_id
+
+            # 添加向量
+            self.index.add(vectors)
+
+            # 添加元数据
+            vector_ids = []
+            entries = []
+            for i, metadata in enumerate(metadata_list):
+                vector_id = start_id + i
+                entry = {
+                    'vector_id': vector_id,
+                    **metadata
+                }
+                self._type_index.setdefault(self._metadata_type(entry), []).append(len(self.metadata))
+                self.metadata.append(entry)
+                entries.append(entry)
+                vector_ids.append(vector_id)
+
+            # 更新下一个可用的向量ID
+            self.next_vector_id = start_id + len(metadata_list)
+
+            # 元数据只追加新增行，索引等待调用方 flush
+            with open(self.metadata_path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False))
+                    f.write('\n')
+            self._pending += len(entries)
         return vector_ids
-    
+
+    def flush(self) -> None:
+        """将尚未落盘的向量写入索引文件；在其他存储引用新向量ID之前调用"""
+        with self._lock:
+            if self._pending:
+                faiss.write_index(self.index, str(self.index_path))
+                self._pending = 0
+
+    def close(self) -> None:
+        """关闭前写入未落盘的索引"""
+        self.flush()
+
     def search_vectors(self, query_vectors: List[List[float]], k: int = 10) -> List[List[Dict]]:
         """搜索相似向量"""
         # 转换为numpy数组
@@ -87,28 +207,31 @@ class FaissManager:
         # 标准化查询向量
         faiss.normalize_L2(query_array)
         
-        # 搜索
-        scores, indices = self.index.search(query_array, k)
-        
-        # 返回结果
-        all_results = []
-        for query_idx in range(len(query_vectors)):
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[query_idx], indices[query_idx])):
-                if idx != -1 and idx < len(self.metadata):
-                    result = self.metadata[idx].copy()
-                    result['score'] = float(score)
-                    result['rank'] = i + 1
-                    results.append(result)
-            all_results.append(results)
-        
+        # 检索与读取元数据在同一把锁内完成，避免删除重建时读到索引与元数据不一致的中间状态
+        with self._lock:
+            scores, indices = self.index.search(query_array, k)
+
+            # 返回结果
+            all_results = []
+            for query_idx in range(len(query_vectors)):
+                results = []
+                for i, (score, idx) in enumerate(zip(scores[query_idx], indices[query_idx])):
+                    if idx != -1 and idx < len(self.metadata):
+                        result = self.metadata[idx].copy()
+                        result['score'] = float(score)
+                        result['rank'] = i + 1
+                        results.append(result)
+                all_results.append(results)
+
         return all_results
     
     def save_index(self):
         """保存索引和元数据"""
-        faiss.write_index(self.index, str(self.index_path))
-        with open(self.metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+        with self._lock:
+            faiss.write_index(self.index, str(self.index_path))
+            self._write_metadata()
+            self._write_next_id(self.next_vector_id)
+            self._pending = 0
     
     def add_vector(self, vector: List[float], metadata: Dict) -> int:
         """添加单个向量到索引"""
@@ -158,69 +281,74 @@ class FaissManager:
     
     def cleanup_all(self):
         """清理所有向量数据"""
-        try:
-            # 重置索引
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.metadata = []
-            self.save_index()
+        with self._lock:
+            try:
+                # 重置索引
+                self.index = self._new_index()
+                self.metadata = []
+                self._type_index = {}
+                self.save_index()
             
-            logger.info("Faiss向量索引清理完成")
+                logger.info("Faiss向量索引清理完成")
             
-        except Exception as e:
-            logger.error(f"Faiss向量索引清理失败: {str(e)}")
-            raise e
+            except Exception as e:
+                logger.error(f"Faiss向量索引清理失败: {str(e)}")
+                raise e
 
-    def delete_vectors_by_ids(self, vector_ids: List[int]) -> int:
-        """根据向量ID列表删除向量（Faiss不支持直接删除，需要重建索引）"""
-        try:
-            vector_id_set = {int(v) for v in vector_ids if v is not None}
-            if not vector_id_set:
-                return 0
-
-            current_count = self.index.ntotal
-            if current_count == 0:
-                return 0
-
-            all_vectors = np.zeros((current_count, self.dimension), dtype=np.float32)
-            self.index.reconstruct_n(0, current_count, all_vectors)
+    def _row_identifier(self, row: int) -> int:
+        metadata_entry = self.metadata[row] if row < len(self.metadata) else None
+        if metadata_entry is not None and metadata_entry.get('vector_id') is not None:
+            return int(metadata_entry['vector_id'])
+        return row
 
-            new_index = faiss.IndexFlatIP(self.dimension)
-            new_metadata: List[Dict] = []
-            deleted_count = 0
-
-            for i in range(current_count):
-                metadata_entry = self.metadata[i] if i < len(self.metadata) else None
-                meta_vector_id = None
-                if metadata_entry is not None:
-                    meta_vector_id = metadata_entry.get('vector_id')
-                    if meta_vector_id is not None:
-                        meta_vector_id = int(meta_vector_id)
+    def delete_vectors_by_ids(self, vector_ids: List[int]) -> int:
+        """根据向量ID列表删除向量；Flat 索引原地移除，HNSW 索引不支持删除，用保留的向量重建"""
+        with self._lock:
+            try:
+                vector_id_set = {int(v) for v in vector_ids if v is not None}
+                if not vector_id_set:
+                    return 0
 
-                # 允许通过索引删除（兼容早期数据）
-                identifier = meta_vector_id if meta_vector_id is not None else i
+                current_count = self.index.ntotal
+                if current_count == 0:
+                    return 0
 
-                if identifier in vector_id_set:
-                    deleted_count += 1
-                    continue
+                # 每行的删除标识：元数据中的 vector_id，缺失时退回行号（兼容早期数据）
+                identifiers = np.fromiter(
+                    (self._row_identifier(i) for i in range(current_count)),
+                    dtype=np.int64,
+                    count=current_count,
+                )
+                keep_mask = ~np.isin(identifiers, np.fromiter(vector_id_set, dtype=np.int64))
+                kept_rows = np.flatnonzero(keep_mask)
+                deleted_count = current_count - len(kept_rows)
+                if deleted_count == 0:
+                    return 0
 
-                vector = all_vectors[i:i + 1]
-                new_index.add(vector)
-                if metadata_entry is not None:
-                    new_metadata.append(metadata_entry)
+                if isinstance(self.index, faiss.IndexHNSW):
+                    # 保留的向量一次性加入新的 HNSW 索引，建图可批量并行
+                    all_vectors = np.zeros((current_count, self.dimension), dtype=np.float32)
+                    self.index.reconstruct_n(0, current_count, all_vectors)
+                    new_index = self._new_index("hnsw")
+                    if len(kept_rows):
+                        new_index.add(all_vectors[keep_mask])
+                    self.index = new_index
+                else:
+                    # Flat 索引按行号原地移除，后续行前移，与保留的元数据顺序一致
+                    self.index.remove_ids(faiss.IDSelectorBatch(np.flatnonzero(~keep_mask).astype(np.int64)))
 
-            # 更新索引、元数据及向量ID游标
-            self.index = new_index
-            self.metadata = new_metadata
-            self.save_index()
-            self.init_index()
+                # 向量ID游标保持不变，已删除的ID不再分配
+                self.metadata = [self.metadata[i] for i in kept_rows if i < len(self.metadata)]
+                self.save_index()
+                self._rebuild_type_index()
 
-            logger.info(
-                "Faiss向量删除完成: 删除了 %d 个向量，剩余 %d 个向量",
-                deleted_count,
-                new_index.ntotal
-            )
-            return deleted_count
+                logger.info(
+                    "Faiss向量删除完成: 删除了 %d 个向量，剩余 %d 个向量",
+                    deleted_count,
+                    self.index.ntotal
+                )
+                return deleted_count
 
-        except Exception as e:
-            logger.error(f"删除Faiss向量失败: {str(e)}")
-            return 0
+            except Exception as e:
+                logger.error(f"删除Faiss向量失败: {str(e)}")
+                return 0
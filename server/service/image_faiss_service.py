@@ -108,6 +108,12 @@ class ImageFaissManager:
             all_results.append(results)
         return all_results
 
+    def _row_identifier(self, row: int) -> int:
+        metadata_entry = self.metadata[row] if row < len(self.metadata) else None
+        if metadata_entry is not None and metadata_entry.get("vector_id") is not None:
+            return int(metadata_entry["vector_id"])
+        return row
+
     def delete_vectors_by_ids(self, vector_ids: List[int]) -> int:
         if not vector_ids:
             return 0
@@ -122,31 +128,20 @@ class ImageFaissManager:
         all_vectors = np.zeros((current_count, self.dimension), dtype=np.float32)
         self.index.reconstruct_n(0, current_count, all_vectors)
 
+        # 每行的删除标识：元数据中的 vector_id，缺失时退回行号
+        identifiers = np.fromiter(
+            (self._row_identifier(i) for i in range(current_count)),
+            dtype=np.int64,
+            count=current_count,
+        )
+        keep_mask = ~np.isin(identifiers, np.fromiter(vector_id_set, dtype=np.int64))
+        kept_rows = np.flatnonzero(keep_mask)
+        deleted_count = current_count - len(kept_rows)
+        new_metadata = [self.metadata[i] for i in kept_rows if i < len(self.metadata)]
+
         new_index = faiss.IndexFlatIP(self.dimension)
-        new_metadata: List[Dict] = []
-        deleted_count = 0
-
-        for i in range(current_count):
-            metadata_entry: Optional[Dict] = None
-            if i < len(self.metadata):
-                metadata_entry = self.metadata[i]
-
-            meta_vector_id = None
-            if metadata_entry is not None:
-                meta_vector_id = metadata_entry.get("vector_id")
-                if meta_vector_id is not None:
-                    meta_vector_id = int(meta_vector_id)
-
-            identifier = meta_vector_id if meta_vector_id is not None else i
-
-            if identifier in vector_id_set:
-                deleted_count += 1
-                continue
-
-            vector = all_vectors[i : i + 1]
-            new_index.add(vector)
-            if metadata_entry is not None:
-                new_metadata.append(metadata_entry)
+        if len(kept_rows):
+            new_index.add(all_vectors[keep_mask])
 
         self.index = new_index
         self.metadata = new_metadata
@@ -4,11 +4,16 @@ from typing import Any, Dict, Generator, Optional
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
 
 
 logger = logging.getLogger(__name__)
 
+# 连接池大小：并发对话请求共享 keep-alive 连接，避免每次调用重新握手 TCP/TLS
+HTTP_POOL_CONNECTIONS = 20
+HTTP_POOL_MAXSIZE = 100
+
 
 class LLMClientError(Exception):
   """统一的大模型调用异常。"""
@@ -25,6 +30,14 @@ class SiliconFlowClient:
   def __init__(self, endpoint: str = "https://api.siliconflow.cn/v1/chat/completions", timeout: int = 60) -> None:
     self.endpoint = endpoint
     self.timeout = timeout
+    self._session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    self._session.mount("https://", adapter)
+    self._session.mount("http://", adapter)
+
+  def close(self) -> None:
+    """关闭共享的 HTTP 连接池"""
+    self._session.close()
 
   def _build_headers(self, api_key: str, stream: bool = False) -> Dict[str, str]:
     accept = "text/event-stream" if stream else "application/json"
@@ -52,7 +65,7 @@ class SiliconFlowClient:
     cleaned_payload = dict(payload)
     cleaned_payload.pop("stream", None)
     try:
-      response = requests.post(
+      response = self._session.post(
         self.endpoint,
         json=cleaned_payload,
         headers=headers,
@@ -75,7 +88,7 @@ class SiliconFlowClient:
     stream_payload["stream"] = True
 
     try:
-      response = requests.post(
+      response = self._session.post(
         self.endpoint,
         json=stream_payload,
         headers=headers,
@@ -85,25 +98,27 @@ class SiliconFlowClient:
     except (Timeout, RequestException) as exc:
       raise LLMClientError(str(exc)) from exc
 
-    if response.status_code != 200:
-      self._handle_error_response(response)
-
-    # 强制将上游流编码设置为 UTF-8，避免 requests 误判导致中文乱码
-    response.encoding = 'utf-8'
-
-    for raw_line in response.iter_lines(decode_unicode=True):
-      if raw_line is None:
-        continue
-      line = raw_line.strip()
-      if not line:
-        continue
-      if line.startswith("data:"):
-        line = line[5:].strip()
-      if not line or line == "[DONE]":
-        continue
-      try:
-        event = json.loads(line)
-      except json.JSONDecodeError:
-        logger.debug("忽略无法解析的流数据: %s", line)
-        continue
-      yield event
+    # 流式响应读完或中途放弃时都需关闭，才能把连接归还到连接池
+    with response:
+      if response.status_code != 200:
+        self._handle_error_response(response)
+
+      # 强制将上游流编码设置为 UTF-8，避免 requests 误判导致中文乱码
+      response.encoding = 'utf-8'
+
+      for raw_line in response.iter_lines(decode_unicode=True):
+        if raw_line is None:
+          continue
+        line = raw_line.strip()
+        if not line:
+          continue
+        if line.startswith("data:"):
+          line = line[5:].strip()
+        if not line or line == "[DONE]":
+          continue
+        try:
+          event = json.loads(line)
+        except json.JSONDecodeError:
+          logger.debug("忽略无法解析的流数据: %s", line)
+          continue
+        yield event
@@ -61,7 +61,8 @@ class ModelStatus:
             "repo_id": self.repo_id,
             "local_path": self.local_path,
             "status": self.status,
-            "progress": self.progress,
+            # 下载进度可能因总大小估算偏差越界，接口层不再校验，在此统一收敛到 [0, 1]
+            "progress": min(max(self.progress, 0.0), 1.0),
             "downloaded_bytes": self.downloaded_bytes,
             "total_bytes": self.total_bytes,
             "message": self.message,
@@ -0,0 +1,67 @@
+"""Bounded cache of OpenAI-compatible clients shared by API and service modules."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+ClientT = TypeVar("ClientT")
+
+
+def api_key_digest(api_key: str) -> str:
+    """缓存键使用 API Key 的 SHA-256 摘要，明文 Key 只保留在客户端对象内。"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class OpenAIClientCache(Generic[ClientT]):
+    """按 (base_url, API Key 摘要) 做 LRU 缓存的客户端池。
+
+    超出 ``maxsize`` 时淘汰最久未用的客户端并交给 ``on_evict`` 释放连接；
+    应用关闭时通过 :meth:`drain` 取出剩余客户端统一关闭。
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str, str], ClientT],
+        maxsize: int,
+        on_evict: Optional[Callable[[ClientT], None]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self._factory = factory
+        self._on_evict = on_evict
+        self._clients: "OrderedDict[Tuple[str, str], ClientT]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._clients)
+
+    def get(self, base_url: str, api_key: str) -> ClientT:
+        key = (base_url, api_key_digest(api_key))
+        evicted: List[ClientT] = []
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            client = self._factory(base_url, api_key)
+            self._clients[key] = client
+            while len(self._clients) > self.maxsize:
+                evicted.append(self._clients.popitem(last=False)[1])
+        # 释放连接可能较慢，放到锁外执行
+        if self._on_evict is not None:
+            for old_client in evicted:
+                self._on_evict(old_client)
+        return client
+
+    def drain(self) -> List[ClientT]:
+        """清空缓存并返回其中的客户端，由调用方负责关闭。"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        return clients
@@ -1,14 +1,41 @@
+import asyncio
 import sqlite3
 import json
 import logging
+import os
 import pathlib
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterator
 from config.config import DatabaseConfig
 
 logger = logging.getLogger(__name__)
 
+# 连接级 PRAGMA：等锁而非立即抛出 database is locked，WAL 下 NORMAL 同步即可保证一致性
+SQLITE_CONNECT_TIMEOUT = 5.0
+# 只读连接池耗尽时等待归还的最长秒数，超时报错而不是无限阻塞调用线程
+SQLITE_READER_ACQUIRE_TIMEOUT = 5.0
+SQLITE_CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -64000",
+)
+
+
+def _reader_pool_size() -> int:
+    """只读连接池大小，可通过环境变量 FS_SQLITE_READERS 覆盖"""
+    value = os.environ.get("FS_SQLITE_READERS")
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning(f"FS_SQLITE_READERS 配置无效: {value}")
+    return os.cpu_count() or 4
+
 class SQLiteManager:
     """SQLite数据库管理器"""
     
@@ -16,13 +43,126 @@ class SQLiteManager:
         self.db_path = DatabaseConfig.SQLITE_DB_PATH
         DatabaseConfig.ensure_directories()
         self.init_database()
+        # 单写连接 + 只读连接池：WAL 下多个读连接可并行，写入串行化避免锁竞争
+        self._writer_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        # 写连接可在同一线程内嵌套借出，只在最外层提交或回滚
+        self._writer_depth = 0
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._reader_limit = _reader_pool_size()
+        self._reader_count = 0
+        self._reader_count_lock = threading.Lock()
+    
+    def connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """打开数据库连接并应用连接级 PRAGMA"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=SQLITE_CONNECT_TIMEOUT,
+            check_same_thread=check_same_thread,
+        )
+        for pragma in SQLITE_CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_count_lock:
+            create = self._reader_count < self._reader_limit
+            if create:
+                self._reader_count += 1
+        if not create:
+            try:
+                return self._readers.get(timeout=SQLITE_READER_ACQUIRE_TIMEOUT)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    f"只读连接池已耗尽({self._reader_limit} 个连接)，等待 {SQLITE_READER_ACQUIRE_TIMEOUT} 秒仍无空闲连接"
+                ) from None
+        try:
+            conn = self.connect(check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+        except Exception:
+            with self._reader_count_lock:
+                self._reader_count -= 1
+            raise
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """从只读连接池借出一个连接，用完归还"""
+        conn = self._acquire_reader()
+        conn.row_factory = None
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """独占唯一的写连接，最外层退出时提交，异常时回滚；嵌套借出沿用外层事务"""
+        with self._writer_lock:
+            if self._writer_depth:
+                self._writer_depth += 1
+                try:
+                    yield self._writer
+                finally:
+                    self._writer_depth -= 1
+                return
+            if self._writer is None:
+                self._writer = self.connect(check_same_thread=False)
+            conn = self._writer
+            conn.row_factory = None
+            # 与逐次新建连接时一致：默认不启用外键，由需要级联删除的方法自行开启
+            conn.execute("PRAGMA foreign_keys = OFF")
+            self._writer_depth = 1
+            try:
+                with conn:
+                    yield conn
+            finally:
+                self._writer_depth = 0
+
+    async def read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """在线程池中使用只读连接执行 fn(conn)"""
+        def run() -> Any:
+            with self.reader() as conn:
+                return fn(conn)
+        return await asyncio.to_thread(run)
+
+    async def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """在线程池中使用写连接执行 fn(conn)"""
+        def run() -> Any:
+            with self.writer() as conn:
+                return fn(conn)
+        return await asyncio.to_thread(run)
+
+    def close(self) -> None:
+        """关闭写连接与所有只读连接"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._reader_count_lock:
+                self._reader_count -= 1
     
     def init_database(self):
         """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
+            # WAL 模式写入数据库文件后持久生效，允许读写并发
+            cursor.execute("PRAGMA journal_mode = WAL")
+            
             # 启用外键约束
             cursor.execute("PRAGMA foreign_keys = ON")
             
@@ -141,7 +281,7 @@ class SQLiteManager:
     def insert_document(self, filename: str, file_path: str, file_type: str, 
                        file_size: int, file_hash: str, content: str = None, metadata: dict = None) -> int:
         """插入文档记录"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             
             # 获取总块数（从metadata中获取）
@@ -161,7 +301,7 @@ class SQLiteManager:
     
     def insert_chunk(self, document_id: int, chunk_index: int, content: str, vector_id: int = None, metadata: dict = None) -> int:
         """插入文档块记录"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO document_chunks 
@@ -187,7 +327,7 @@ class SQLiteManager:
         vector_id: Optional[int]
     ) -> int:
         """插入文档图片元数据记录"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -232,7 +372,7 @@ class SQLiteManager:
     ) -> None:
         """插入或更新文档主题摘要记录"""
         payload = json.dumps(model_info or {}, ensure_ascii=False)
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -250,7 +390,7 @@ class SQLiteManager:
 
     def get_document_summary(self, document_id: int) -> Optional[Dict[str, Any]]:
         """根据文档ID获取摘要记录"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(
@@ -280,7 +420,7 @@ class SQLiteManager:
 
     def get_summary_vector_id_by_path(self, file_path: str) -> Optional[int]:
         """根据文件路径获取摘要向量ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM documents WHERE file_path = ?", (file_path,))
             row = cursor.fetchone()
@@ -296,7 +436,7 @@ class SQLiteManager:
 
     def get_summary_vector_ids_by_path_prefix(self, folder_path: str) -> List[int]:
         """根据路径前缀获取摘要向量ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             if not folder_path.endswith('/'):
                 folder_path = f"{folder_path}/"
@@ -326,7 +466,7 @@ class SQLiteManager:
         if offset < 0:
             offset = 0
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -398,35 +538,27 @@ class SQLiteManager:
 
     def get_image_vector_statistics(self, cursor: sqlite3.Cursor = None) -> Dict[str, Any]:
         """获取图片向量统计信息"""
-        close_cursor = False
         if cursor is None:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            close_cursor = True
-        else:
-            conn = None
+            with self.reader() as conn:
+                return self.get_image_vector_statistics(conn.cursor())
 
-        try:
-            cursor.execute("SELECT COUNT(*), IFNULL(SUM(image_size), 0), COUNT(DISTINCT document_id) FROM document_images")
-            total_count, total_size, doc_count = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*), IFNULL(SUM(image_size), 0), COUNT(DISTINCT document_id) FROM document_images")
+        total_count, total_size, doc_count = cursor.fetchone()
 
-            cursor.execute("SELECT image_format, COUNT(*) FROM document_images GROUP BY image_format")
-            format_rows = cursor.fetchall()
-            format_counts = {row[0]: row[1] for row in format_rows if row[0]}
+        cursor.execute("SELECT image_format, COUNT(*) FROM document_images GROUP BY image_format")
+        format_rows = cursor.fetchall()
+        format_counts = {row[0]: row[1] for row in format_rows if row[0]}
 
-            return {
-                "total_count": total_count,
-                "total_size": total_size,
-                "document_count": doc_count,
-                "format_breakdown": format_counts
-            }
-        finally:
-            if close_cursor and conn is not None:
-                conn.close()
+        return {
+            "total_count": total_count,
+            "total_size": total_size,
+            "document_count": doc_count,
+            "format_breakdown": format_counts
+        }
     
     def get_documents_by_filename(self, filename: str) -> List[Dict]:
         """根据文件名获取文档"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, filename, file_path, file_type, file_size, 
@@ -452,7 +584,7 @@ class SQLiteManager:
 
     def get_document_by_path(self, file_path: str) -> Optional[Dict]:
         """根据文件路径获取文档"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, filename, file_path, file_type, file_size, 
@@ -479,7 +611,7 @@ class SQLiteManager:
 
     def get_document_by_id(self, document_id: int) -> Optional[Dict]:
         """根据文档ID获取文档"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, filename, file_path, file_type, file_size,
@@ -512,7 +644,7 @@ class SQLiteManager:
         escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
         pattern = f"%{escaped}%"
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             try:
@@ -563,14 +695,14 @@ class SQLiteManager:
         placeholders = ",".join(["?"] * len(file_paths))
         query = f"SELECT file_path FROM documents WHERE file_path IN ({placeholders})"
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute(query, file_paths)
             return [row[0] for row in cursor.fetchall()]
 
     def get_document_by_path_and_hash(self, file_path: str, file_hash: str) -> Optional[Dict]:
         """根据文件路径和哈希值获取文档（用于精确匹配）"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, filename, file_path, file_type, file_size, 
@@ -597,7 +729,7 @@ class SQLiteManager:
 
     def get_documents_by_hash(self, file_hash: str) -> List[Dict]:
         """根据文件哈希值获取所有相关文档（用于检测重复文件）"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, filename, file_path, file_type, file_size, 
@@ -623,7 +755,7 @@ class SQLiteManager:
     
     def update_document_chunks_count(self, document_id: int, total_chunks: int):
         """更新文档的总块数"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE documents SET total_chunks = ? WHERE id = ?
@@ -633,7 +765,7 @@ class SQLiteManager:
         """更新文档的文件路径和文件名"""
         try:
             new_filename = pathlib.Path(new_path).name
-            with sqlite3.connect(self.db_path) as conn:
+            with self.writer() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     """
@@ -651,7 +783,7 @@ class SQLiteManager:
     def update_documents_by_path_prefix(self, old_prefix: str, new_prefix: str) -> int:
         """更新所有以指定前缀开头的文档路径（用于文件夹重命名）"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.writer() as conn:
                 cursor = conn.cursor()
                 # 找到所有以旧前缀开头的文档
                 cursor.execute("""
@@ -680,7 +812,7 @@ class SQLiteManager:
     
     def search_documents(self, query: str) -> List[Dict]:
         """全文搜索文档"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT d.id, d.filename, d.file_path, d.file_type, 
@@ -706,7 +838,7 @@ class SQLiteManager:
     
     def get_chunk_by_vector_id(self, vector_id: int) -> Optional[Dict]:
         """根据向量ID获取文档块"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT d.id, d.filename, d.file_path, d.file_type,
@@ -735,7 +867,7 @@ class SQLiteManager:
         chunk_index: int,
     ) -> Optional[Dict[str, Any]]:
         """根据文档ID与块序号获取文档块内容。"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(
@@ -770,7 +902,7 @@ class SQLiteManager:
     
     def get_document_chunks(self, document_id: int) -> List[Dict]:
         """获取指定文档的所有块"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT d.id, d.filename, d.file_path, d.file_type,
@@ -796,7 +928,7 @@ class SQLiteManager:
 
     def get_all_document_chunks(self) -> List[Dict]:
         """获取所有文档块"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT d.id, d.filename, d.file_path, d.file_type,
@@ -821,7 +953,7 @@ class SQLiteManager:
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取数据库统计信息"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             cursor = conn.cursor()
             
             # 获取文档数量
@@ -849,7 +981,7 @@ class SQLiteManager:
     def get_document_count(self) -> int:
         """获取文档总数"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM documents")
                 return cursor.fetchone()[0]
@@ -859,7 +991,7 @@ class SQLiteManager:
     def delete_document_by_path(self, file_path: str) -> int:
         """根据文件路径删除文档记录和相关块数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.writer() as conn:
                 cursor = conn.cursor()
                 
                 # 启用外键约束
@@ -904,7 +1036,7 @@ class SQLiteManager:
     def delete_documents_by_path_prefix(self, folder_path: str) -> int:
         """根据文件夹路径前缀删除所有相关文档和块数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.writer() as conn:
                 cursor = conn.cursor()
                 
                 # 启用外键约束
@@ -963,7 +1095,7 @@ class SQLiteManager:
     def get_vector_ids_by_path(self, file_path: str) -> List[int]:
         """根据文件路径获取所有相关的向量ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
                 
                 # 获取文档ID
@@ -999,7 +1131,7 @@ class SQLiteManager:
     def get_image_vector_ids_by_path(self, file_path: str) -> List[int]:
         """根据文件路径获取所有相关的图片向量ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
 
                 cursor.execute("SELECT id FROM documents WHERE file_path = ?", (file_path,))
@@ -1021,7 +1153,7 @@ class SQLiteManager:
     def get_vector_ids_by_path_prefix(self, folder_path: str) -> List[int]:
         """根据文件夹路径前缀获取所有相关的向量ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
                 
                 # 确保路径前缀格式正确（以/结尾）
@@ -1061,7 +1193,7 @@ class SQLiteManager:
     def get_image_vector_ids_by_path_prefix(self, folder_path: str) -> List[int]:
         """根据文件夹路径前缀获取所有相关的图片向量ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
 
                 if not folder_path.endswith('/'):
@@ -1086,7 +1218,7 @@ class SQLiteManager:
     def get_image_storage_folders_by_path(self, file_path: str) -> List[str]:
         """获取指定文件的图片存储文件夹路径列表"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
 
                 cursor.execute("SELECT id FROM documents WHERE file_path = ?", (file_path,))
@@ -1108,7 +1240,7 @@ class SQLiteManager:
     def get_image_storage_folders_by_path_prefix(self, folder_path: str) -> List[str]:
         """获取指定文件夹路径前缀对应的所有图片存储文件夹"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.reader() as conn:
                 cursor = conn.cursor()
 
                 if not folder_path.endswith('/'):
@@ -1138,7 +1270,7 @@ class SQLiteManager:
         if not normalized_title:
             normalized_title = '新对话'
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -1155,7 +1287,7 @@ class SQLiteManager:
         if not normalized_title:
             return False
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -1170,7 +1302,7 @@ class SQLiteManager:
     def update_conversation_summary(self, conversation_id: int, summary: str) -> bool:
         """更新会话摘要"""
         normalized_summary = (summary or '').strip()
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -1184,7 +1316,7 @@ class SQLiteManager:
 
     def touch_conversation(self, conversation_id: int) -> None:
         """更新会话的更新时间戳"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE conversations SET updated_time = CURRENT_TIMESTAMP WHERE id = ?",
@@ -1193,7 +1325,7 @@ class SQLiteManager:
 
     def delete_conversation(self, conversation_id: int) -> bool:
         """删除指定会话及其关联消息"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             conn.execute("PRAGMA foreign_keys = ON")
             cursor = conn.cursor()
             cursor.execute(
@@ -1204,7 +1336,7 @@ class SQLiteManager:
 
     def get_conversation_by_id(self, conversation_id: int) -> Optional[Dict[str, Any]]:
         """根据ID获取会话信息"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(
@@ -1228,7 +1360,7 @@ class SQLiteManager:
 
     def list_conversations(self) -> List[Dict[str, Any]]:
         """获取所有会话列表，按更新时间倒序排列"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(
@@ -1278,7 +1410,7 @@ class SQLiteManager:
 
         timestamp = datetime.utcnow().isoformat() + 'Z'
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(
@@ -1345,7 +1477,7 @@ class SQLiteManager:
                 logger.warning('消息元数据更新失败，无法序列化: %s', exc)
                 sanitized_metadata = None
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.writer() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -1403,7 +1535,7 @@ class SQLiteManager:
 
     def get_conversation_messages(self, conversation_id: int) -> List[Dict[str, Any]]:
         """获取指定会话的全部消息，按时间顺序排序"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(
@@ -1425,7 +1557,7 @@ class SQLiteManager:
 
     def get_chat_message(self, message_id: int, conversation_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """根据消息ID获取聊天消息"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -1454,7 +1586,7 @@ class SQLiteManager:
     def cleanup_all(self):
         """清理所有数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.writer() as conn:
                 cursor = conn.cursor()
                 
                 # 删除所有数据（保留表结构）
@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("openai")
+
+from server.service.async_summary_service import AsyncSummaryService, TaskStatus
+
+
+class _FakeSQLite:
+    def get_conversation_messages(self, conversation_id: int) -> List[Dict[str, Any]]:
+        return [{"role": "user", "content": "你好"}, {"role": "assistant", "content": "你好！"}]
+
+    def update_conversation_summary(self, conversation_id: int, summary: str) -> bool:
+        return True
+
+    def update_conversation_title(self, conversation_id: int, title: str) -> bool:
+        return True
+
+    def get_conversation_by_id(self, conversation_id: int):
+        return None
+
+
+def test_summary_llm_calls_are_bounded(monkeypatch):
+    monkeypatch.setenv("FS_SUMMARY_LLM_CONCURRENCY", "2")
+
+    async def scenario() -> None:
+        service = AsyncSummaryService(_FakeSQLite())
+        active = 0
+        peak = 0
+
+        async def fake_invoke(selection, payload, on_chunk=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"choices": [{"message": {"content": '{"title": "问候", "summary": "打招呼"}'}}]}
+
+        monkeypatch.setattr(service, "_invoke_llm_async", fake_invoke)
+        task_ids = [service.create_summary_task(index) for index in range(5)]
+        for task_id in task_ids:
+            await service.start_summary_task(task_id, {"source_id": "siliconflow"})
+        await asyncio.gather(*list(service._running_tasks.values()))
+
+        assert peak == 2
+        assert all(service.tasks[task_id].status is TaskStatus.COMPLETED for task_id in task_ids)
+
+    asyncio.run(scenario())
+
+
+def test_ollama_summary_streams_through_shared_async_client():
+    httpx = pytest.importorskip("httpx")
+    requests_seen = []
+    lines = [
+        'data: {"choices": [{"delta": {"content": "o"}}]}',
+        'data: {"choices": [{"delta": {"content": "k"}}]}',
+        "data: [DONE]",
+    ]
+
+    def handler(request):
+        requests_seen.append(request)
+        return httpx.Response(200, content="\n".join(lines).encode("utf-8"))
+
+    async def scenario() -> None:
+        service = AsyncSummaryService(_FakeSQLite())
+        service._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        selection = {"source_id": "ollama", "api_url": "http://ollama.local/v1/chat/completions"}
+        for _ in range(2):
+            progress: List[int] = []
+            result = await service._invoke_llm_async(selection, {"model": "m", "stream": False}, progress.append)
+            assert result["choices"][0]["message"]["content"] == "ok"
+            assert progress == [1, 2]
+        client = service._http_client
+        await service.aclose()
+        assert client.is_closed
+
+    asyncio.run(scenario())
+    assert len(requests_seen) == 2
+    assert b'"stream":true' in requests_seen[0].content.replace(b" ", b"")
+
+
+def test_openai_compatible_clients_are_cached_per_provider_key():
+    pytest.importorskip("httpx")
+
+    async def scenario() -> None:
+        service = AsyncSummaryService(_FakeSQLite())
+        first = service._get_openai_client(service.MODELSCOPE_BASE_URL, "key-a")
+        assert service._get_openai_client(service.MODELSCOPE_BASE_URL, "key-a") is first
+        assert service._get_openai_client(service.DASHSCOPE_BASE_URL, "key-a") is not first
+        assert all("key-a" not in key for key in service._openai_clients.keys())
+
+        service._openai_clients.maxsize = 1
+        service._get_openai_client(service.MODELSCOPE_BASE_URL, "key-b")
+        assert len(service._openai_clients) == 1
+
+        await service.aclose()
+        assert len(service._openai_clients) == 0
+
+    asyncio.run(scenario())
+
+
+def test_identical_summary_requests_reuse_cached_response(monkeypatch):
+    async def scenario() -> None:
+        service = AsyncSummaryService(_FakeSQLite())
+        calls = 0
+
+        async def fake_invoke(selection, payload, on_chunk=None):
+            nonlocal calls
+            calls += 1
+            return {"choices": [{"message": {"content": '{"title": "问候", "summary": "打招呼"}'}}]}
+
+        monkeypatch.setattr(service, "_invoke_llm_async", fake_invoke)
+        for _ in range(2):
+            task_id = service.create_summary_task(1)
+            await service.start_summary_task(task_id, {"source_id": "siliconflow", "api_model": "m"})
+            await service._running_tasks[task_id]
+            assert service.tasks[task_id].result["title"] == "问候"
+
+        assert calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_task_registry_evicts_finished_tasks_from_terminal_queue(monkeypatch):
+    from server.service import async_summary_service
+
+    monkeypatch.setattr(async_summary_service, "SUMMARY_MAX_TASKS", 2)
+    service = AsyncSummaryService(_FakeSQLite())
+    running = service.create_summary_task(1)
+    service.tasks[running].status = TaskStatus.RUNNING
+    finished = service.create_summary_task(2)
+    service._finish_task(service.tasks[finished], TaskStatus.COMPLETED)
+    newest = service.create_summary_task(3)
+
+    assert list(service.tasks) == [running, newest]
+    assert not service._terminal_queue
+
+    service._finish_task(service.tasks[newest], TaskStatus.FAILED)
+    status = service.get_task_status(running)
+    assert status["created_at"] <= status["updated_at"]
+
+    # 队头已过期时，创建新任务会顺带清理，不依赖查询触发
+    monkeypatch.setattr(async_summary_service, "SUMMARY_MAX_TASKS", 10)
+    expiry, task_id = service._terminal_queue.popleft()
+    service._terminal_queue.appendleft((expiry - async_summary_service.SUMMARY_TASK_MAX_AGE - 1, task_id))
+    service.create_summary_task(4)
+    assert newest not in service.tasks
+    assert running in service.tasks
+
+
+def test_parse_summary_response_extracts_json_wrapped_in_prose():
+    service = AsyncSummaryService(_FakeSQLite())
+
+    wrapped = '好的，结果如下：{"title": "周报", "summary": "包含 {花括号} 的摘要"} 以上。'
+    assert service._parse_summary_response(wrapped) == {"title": "周报", "summary": "包含 {花括号} 的摘要"}
+
+    truncated = '输出 {"title": "标题", "summary": "未闭合'
+    assert service._parse_summary_response(truncated) == {"title": "标题", "summary": ""}
+
+
+def test_build_summary_prompt_keeps_latest_dialog_turns():
+    service = AsyncSummaryService(_FakeSQLite())
+    messages = [
+        {"role": "user", "content": "第一问"},
+        {"role": "assistant", "content": "第一答"},
+        {"role": "system", "content": "忽略"},
+        {"role": "user", "content": "  "},
+        {"role": "assistant", "content": " 第二答 "},
+    ]
+
+    prompt = service._build_summary_prompt(messages, 3)
+    transcript = prompt[-1]["content"]
+
+    assert "助手：第一答\n助手：第二答" in transcript
+    assert "第一问" not in transcript and "忽略" not in transcript
+
+
+def test_task_status_is_reused_until_task_changes():
+    service = AsyncSummaryService(_FakeSQLite())
+    task_id = service.create_summary_task(1)
+
+    first = service.get_task_status(task_id)
+    assert service.get_task_status(task_id) is first
+
+    service.tasks[task_id].error = "boom"
+    service._finish_task(service.tasks[task_id], TaskStatus.FAILED)
+    updated = service.get_task_status(task_id)
+    assert updated is not first
+    assert (updated["status"], updated["error"]) == ("failed", "boom")
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("bm25s")
+pytest.importorskip("jieba")
+
+from server.service import bm25s_service
+from server.service.bm25s_service import BM25SService
+
+
+def test_score_documents_keeps_input_order_and_caches_tokens(monkeypatch):
+    service = BM25SService()
+    documents = ["苹果 香蕉", "香蕉 橙子", "橙子 西瓜"]
+
+    scores = service.score_documents("西瓜", documents)
+
+    assert len(scores) == 3
+    assert scores[2] > 0
+    assert scores[0] == scores[1] == 0
+
+    calls = []
+    original = bm25s_service.jieba.lcut
+    monkeypatch.setattr(bm25s_service.jieba, "lcut", lambda text: calls.append(text) or original(text))
+    assert service.score_documents("西瓜", documents) == scores
+    # 查询与候选文档均命中缓存，不再分词
+    assert calls == []
+
+
+def test_build_index_reuses_persisted_index_when_corpus_unchanged(tmp_path, monkeypatch):
+    documents = [
+        {"id": "0", "content": "苹果 香蕉"},
+        {"id": "1", "content": "香蕉 橙子"},
+        {"id": "2", "content": "橙子 西瓜"},
+    ]
+    index_dir = tmp_path / "bm25s_index"
+    assert BM25SService(index_path=index_dir).build_index(documents)
+    assert (index_dir / bm25s_service.INDEX_FINGERPRINT_FILE).exists()
+
+    calls = []
+    original = bm25s_service.jieba.lcut
+    monkeypatch.setattr(bm25s_service.jieba, "lcut", lambda text: calls.append(text) or original(text))
+
+    reloaded = BM25SService(index_path=index_dir)
+    assert reloaded.build_index(documents)
+    # 语料未变化时从磁盘加载，不再对语料分词
+    assert calls == []
+    results = reloaded.retrieve("西瓜", top_k=1)
+    assert results[0]["doc_id"] == "2"
+    assert results[0]["content"] == "橙子 西瓜"
+
+    changed = documents + [{"id": "3", "content": "葡萄 西瓜"}]
+    rebuilt = BM25SService(index_path=index_dir)
+    assert rebuilt.build_index(changed)
+    assert len(calls) > 1
+    assert {item["doc_id"] for item in rebuilt.retrieve("西瓜", top_k=2)} == {"2", "3"}
@@ -0,0 +1,73 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from server.service import clip_embedding_service
+from server.service.clip_embedding_service import CLIPEmbeddingService
+
+
+class _FakeImageModel:
+    def __init__(self) -> None:
+        self.batches: List[int] = []
+
+    def encode(self, images, **kwargs):
+        self.batches.append(len(images))
+        return np.array([[float(image.size[0]), 1.0] for image in images], dtype=np.float32)
+
+
+def test_encode_image_paths_batches_and_skips_unreadable(tmp_path, monkeypatch):
+    monkeypatch.setattr(clip_embedding_service, "IMAGE_ENCODE_BATCH_SIZE", 2)
+    paths = []
+    for width in (3, 4, 5):
+        path = tmp_path / f"{width}.png"
+        Image.new("RGB", (width, 2)).save(path)
+        paths.append(path)
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    paths.insert(1, broken)
+
+    model = _FakeImageModel()
+    service = CLIPEmbeddingService()
+    monkeypatch.setattr(service, "_get_image_model", lambda: model)
+
+    vectors = service.encode_image_paths(paths)
+
+    assert [None if vector is None else vector.tolist() for vector in vectors] == [[3.0, 1.0], None, [4.0, 1.0], [5.0, 1.0]]
+    assert vectors[0].dtype == np.float32
+    assert model.batches == [1, 2]
+
+
+def test_large_jpeg_is_draft_decoded_above_clip_input_size(tmp_path):
+    path = tmp_path / "large.jpg"
+    Image.new("RGB", (2400, 1200), color=(10, 20, 30)).save(path, format="JPEG")
+
+    image = clip_embedding_service._load_rgb_image(path)
+
+    assert image.mode == "RGB"
+    assert image.size[0] < 2400
+    assert min(image.size) >= clip_embedding_service.IMAGE_DECODE_MIN_SIZE
+
+
+def test_text_and_image_encoding_share_one_model_per_path(tmp_path, monkeypatch):
+    loads = []
+
+    class _FakeSentenceTransformer:
+        def __init__(self, path, device=None):
+            loads.append((path, device))
+
+    monkeypatch.setattr(clip_embedding_service, "SentenceTransformer", _FakeSentenceTransformer)
+    monkeypatch.setattr(clip_embedding_service, "_loaded_models", {})
+    monkeypatch.setattr(
+        clip_embedding_service,
+        "get_model_path_if_available",
+        lambda key: tmp_path if key == "clip_vit_b_32" else None,
+    )
+
+    service = CLIPEmbeddingService()
+    model = service._get_image_model()
+
+    assert service._model is model
+    assert len(loads) == 1
@@ -0,0 +1,41 @@
+from typing import Any, Dict
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.api.database_api import router as database_router
+
+
+class FakeSQLiteManager:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def get_image_vector_records(self, limit: int, offset: int, search=None) -> Dict[str, Any]:
+        self.calls.append((limit, offset, search))
+        return {"records": [], "total": 0}
+
+
+def _client(sqlite_manager=None) -> TestClient:
+    app = FastAPI()
+    app.include_router(database_router)
+    if sqlite_manager is not None:
+        app.state.sqlite = sqlite_manager
+    return TestClient(app)
+
+
+def test_routes_read_sqlite_manager_from_app_state() -> None:
+    sqlite_manager = FakeSQLiteManager()
+    response = _client(sqlite_manager).get("/api/database/image-vectors", params={"limit": 5, "search": "cat"})
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "records": [], "total": 0}
+    assert sqlite_manager.calls == [(5, 0, "cat")]
+
+
+def test_routes_report_uninitialized_sqlite_manager() -> None:
+    response = _client().get("/api/database/image-vectors")
+    assert response.status_code == 500
+    assert response.json()["detail"] == "数据库管理器未初始化"
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import types
 from pathlib import Path
@@ -552,3 +553,98 @@ def test_image_search_fuses_multimodal_signals(monkeypatch):
     assert semantic_metrics.get("embedding_score_normalized") is not None
     assert semantic_metrics.get("bm25s_score") is not None
     assert semantic_metrics.get("rerank_score_normalized") is not None
+
+
+def test_text_candidate_masks_treat_missing_scores_as_failing():
+    candidates = [
+        {"rerank_norm": 0.9, "final_score": 0.7},
+        {"embedding_norm": 0.65, "bm25_norm": 0.5, "final_score": 0.58},
+        {"embedding_norm": 0.65, "bm25_norm": None, "final_score": 0.58},
+        {"clip_norm": 0.8, "final_score": None},
+    ]
+
+    columns = faiss_api.build_candidate_score_columns(candidates)
+    passes, strong, confident = faiss_api.compute_text_candidate_masks(columns)
+
+    assert passes.tolist() == [True, True, False, False]
+    assert strong.tolist() == [True, True, False, True]
+    assert confident.tolist() == [True, True, False, True]
+
+
+def test_combined_results_merge_exact_and_semantic_hits_for_same_chunk(monkeypatch):
+    metadata = [
+        {
+            "vector_id": 0,
+            "chunk_text": "Alpha 段落包含测试关键词。",
+            "filename": "doc1.txt",
+            "file_path": "docs/doc1.txt",
+            "chunk_index": 0,
+        },
+    ]
+    dense_results = [[{**metadata[0], "score": 0.9}]]
+    lexical_results = [{"doc_id": "0", "score": 3.0, "rank": 1}]
+
+    def _raise_clip_service():
+        raise RuntimeError("clip unavailable")
+
+    monkeypatch.setattr(faiss_api, "get_clip_embedding_service", _raise_clip_service)
+
+    client = create_test_client(
+        FakeFaissManager(metadata, dense_results),
+        FakeEmbeddingService(),
+        FakeImageFaissManager(),
+        FakeBM25Service(lexical_results, [3.0]),
+        FakeRerankerService([0.9]),
+        None,
+    )
+
+    response = client.post("/api/faiss/search", json={"query": "Alpha", "top_k": 3})
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert payload["exact_match"]["total"] == 1
+    assert payload["semantic_match"]["total"] == 1
+
+    combined_results = payload["combined"]["results"]
+    assert len(combined_results) == 1
+    merged = combined_results[0]
+    assert merged["source"] == "exact"
+    assert merged["final_score"] == pytest.approx(1.0)
+    assert {"exact", "dense", "lexical", "reranker"} <= set(merged["sources"])
+
+
+def test_final_confidence_batch_matches_scalar_cascade():
+    entries = [
+        {"sources": ["exact"], "rerank_score": 0.2},
+        {"source": "exact"},
+        {"rerank_score": 1.4, "quality_score": 0.3},
+        {"rerank_score": float("nan"), "quality_score": 0.3},
+        {"quality_score": "invalid", "mixed_score": 0.8},
+        {"mixed_score": -0.2, "embedding_score": 0.9},
+        {"embedding_score": 0.2},
+        {"embedding_score": None},
+        {},
+    ]
+
+    batch_scores = faiss_api.compute_final_confidence_batch(entries)
+
+    assert batch_scores.tolist() == pytest.approx(
+        [faiss_api.compute_final_confidence(entry) for entry in entries]
+    )
+    assert faiss_api.compute_final_confidence_batch([]).size == 0
+
+
+def test_discard_future_cancels_pending_and_retrieves_failures():
+    async def scenario() -> None:
+        loop = asyncio.get_running_loop()
+        pending = loop.create_future()
+        faiss_api._discard_future(pending)
+        assert pending.cancelled()
+
+        failed = loop.create_future()
+        failed.set_exception(RuntimeError("image search failed"))
+        faiss_api._discard_future(failed)
+        # 异常已被取走，垃圾回收时不会再记录 "exception was never retrieved"
+        assert failed._log_traceback is False
+
+    asyncio.run(scenario())
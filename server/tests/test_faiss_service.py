@@ -0,0 +1,162 @@
+import json
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+pytestmark = pytest.mark.skipif(
+    getattr(faiss, "__spec__", None) is None,
+    reason="faiss is replaced by a stub module in this session",
+)
+
+from server.service import faiss_service
+from server.service.faiss_service import FaissManager
+
+
+@pytest.fixture()
+def manager(tmp_path, monkeypatch) -> FaissManager:
+    config = faiss_service.DatabaseConfig
+    monkeypatch.setattr(config, "DATABASE_DIR", tmp_path / "data")
+    monkeypatch.setattr(config, "SQLITE_DIR", tmp_path / "sqlite")
+    monkeypatch.setattr(config, "VECTOR_DIR", tmp_path / "vector")
+    monkeypatch.setattr(config, "IMAGES_DIR", tmp_path / "images")
+    monkeypatch.setattr(config, "VECTOR_INDEX_PATH", tmp_path / "vector" / "vector_index.faiss")
+    monkeypatch.setattr(config, "VECTOR_METADATA_PATH", tmp_path / "vector" / "vector_metadata.jsonl")
+    return FaissManager(dimension=4)
+
+
+def _vectors(count: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.random((count, 4), dtype=np.float32)
+
+
+def test_get_metadata_by_type_pages_through_type_index(manager: FaissManager) -> None:
+    manager.add_vectors(
+        _vectors(5),
+        [
+            {"file_type": "pdf", "chunk_index": 0},
+            {"file_type": "txt", "chunk_index": 0},
+            {"file_type": "pdf", "chunk_index": 1},
+            {"chunk_index": 0},
+            {"file_type": "pdf", "chunk_index": 2},
+        ],
+    )
+
+    page, total = manager.get_metadata_by_type("pdf", offset=1, limit=1)
+    assert total == 3
+    assert [item["vector_id"] for item in page] == [2]
+
+    unknown, unknown_total = manager.get_metadata_by_type("unknown")
+    assert unknown_total == 1
+    assert unknown[0]["vector_id"] == 3
+
+    manager.delete_vectors_by_ids([0])
+    page, total = manager.get_metadata_by_type("pdf")
+    assert total == 2
+    assert [item["vector_id"] for item in page] == [2, 4]
+
+
+def test_new_indexes_default_to_flat(manager: FaissManager) -> None:
+    assert isinstance(manager.index, faiss.IndexFlatIP)
+
+
+def test_hnsw_index_is_opt_in_and_kept_across_deletes(manager: FaissManager, monkeypatch) -> None:
+    monkeypatch.setenv("FS_FAISS_INDEX_TYPE", "hnsw")
+    manager.cleanup_all()
+    assert isinstance(manager.index, faiss.IndexHNSWFlat)
+    vectors = np.eye(4, dtype=np.float32)
+    manager.add_vectors(vectors.copy(), [{"chunk_index": i} for i in range(4)])
+
+    results = manager.search_vectors([[0.0, 0.0, 1.0, 0.1]], k=1)
+    assert results[0][0]["vector_id"] == 2
+
+    monkeypatch.delenv("FS_FAISS_INDEX_TYPE")
+    manager.delete_vectors_by_ids([2])
+    assert isinstance(manager.index, faiss.IndexHNSWFlat)
+    assert manager.get_total_vectors() == 3
+    results = manager.search_vectors([[0.0, 0.0, 1.0, 0.1]], k=1)
+    assert results[0][0]["vector_id"] == 3
+
+
+def test_delete_from_large_flat_index_removes_rows_in_place(manager: FaissManager, monkeypatch) -> None:
+    count = 50_000
+    rng = np.random.default_rng(1)
+    vectors = rng.random((count, 4), dtype=np.float32)
+    manager.add_vectors(vectors.copy(), [{"chunk_index": i} for i in range(count)])
+    index = manager.index
+
+    def _no_reconstruct(*args, **kwargs):
+        raise AssertionError("flat deletes must not reconstruct the whole index")
+
+    monkeypatch.setattr(index, "reconstruct_n", _no_reconstruct)
+    deleted_ids = [0, 1234, 25_000, count - 1]
+    assert manager.delete_vectors_by_ids(deleted_ids + [count + 10]) == len(deleted_ids)
+
+    assert manager.index is index
+    assert manager.get_total_vectors() == count - len(deleted_ids)
+    assert len(manager.metadata) == manager.get_total_vectors()
+    assert not {item["vector_id"] for item in manager.metadata} & set(deleted_ids)
+    assert manager.next_vector_id == count
+
+    # 删除后行号与元数据仍一一对应
+    probe = vectors[25_001]
+    results = manager.search_vectors([probe.tolist()], k=1)
+    assert results[0][0]["vector_id"] == 25_001
+
+
+def test_add_vectors_appends_metadata_and_defers_index_write(manager: FaissManager, monkeypatch) -> None:
+    writes = []
+    original_write = faiss.write_index
+    monkeypatch.setattr(faiss, "write_index", lambda index, path: writes.append(path) or original_write(index, path))
+
+    manager.add_vectors(_vectors(2), [{"chunk_index": 0}, {"chunk_index": 1}])
+    manager.add_vectors(_vectors(1), [{"chunk_index": 2}])
+
+    assert writes == []
+    lines = manager.metadata_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["vector_id"] for line in lines] == [0, 1, 2]
+
+    manager.close()
+    assert len(writes) == 1
+    reloaded = FaissManager(dimension=4)
+    assert reloaded.get_total_vectors() == 3
+    assert [item["chunk_index"] for item in reloaded.metadata] == [0, 1, 2]
+
+
+def test_unflushed_metadata_is_truncated_on_load(manager: FaissManager) -> None:
+    manager.add_vectors(_vectors(1), [{"chunk_index": 0}])
+    manager.close()
+    manager.add_vectors(_vectors(1), [{"chunk_index": 1}])
+
+    reloaded = FaissManager(dimension=4)
+    assert reloaded.get_total_vectors() == 1
+    assert [item["chunk_index"] for item in reloaded.metadata] == [0]
+    # 丢失的向量ID不会被重新分配
+    assert reloaded.next_vector_id == 2
+    assert reloaded.add_vector([1.0, 0.0, 0.0, 0.0], {"chunk_index": 2}) == 2
+
+    reloaded.close()
+    again = FaissManager(dimension=4)
+    assert again.next_vector_id == 3
+
+
+def test_deleting_highest_vector_does_not_reuse_its_id(manager: FaissManager) -> None:
+    manager.add_vectors(_vectors(3), [{"chunk_index": i} for i in range(3)])
+    manager.delete_vectors_by_ids([2])
+    assert manager.next_vector_id == 3
+
+    manager.cleanup_all()
+    assert FaissManager(dimension=4).next_vector_id == 3
+
+
+def test_legacy_json_metadata_is_migrated(manager: FaissManager) -> None:
+    manager.add_vectors(_vectors(1), [{"chunk_index": 0}])
+    manager.close()
+    legacy_path = manager.metadata_path.with_suffix(".json")
+    legacy_path.write_text(json.dumps(manager.metadata), encoding="utf-8")
+    manager.metadata_path.unlink()
+
+    reloaded = FaissManager(dimension=4)
+    assert [item["chunk_index"] for item in reloaded.metadata] == [0]
+    assert manager.metadata_path.exists()
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("starlette")
+
+from server.api.middleware import RequestTimingMiddleware
+
+
+def test_request_timing_adds_process_time_header():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def scenario() -> List[Dict[str, Any]]:
+        sent: List[Dict[str, Any]] = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = RequestTimingMiddleware(app)
+        await middleware({"type": "http", "method": "GET", "path": "/"}, receive, send)
+        return sent
+
+    sent = asyncio.run(scenario())
+    header_names = [name for name, _ in sent[0]["headers"]]
+    assert b"content-type" in header_names
+    assert b"x-process-time" in header_names
+    assert sent[1]["body"] == b"ok"
+
+
+def test_request_timing_passes_through_non_http_scopes():
+    seen: List[str] = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    asyncio.run(RequestTimingMiddleware(app)({"type": "websocket"}, None, None))
+    assert seen == ["websocket"]
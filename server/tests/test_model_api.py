@@ -80,3 +80,185 @@ def test_start_download_invokes_service() -> None:
     assert payload["status"] == "downloading"
     assert payload["progress"] == 0.2
     assert payload["endpoint"] == "https://huggingface.co"
+
+
+class _FakeDelta:
+    def __init__(self, content=None, reasoning_content=None) -> None:  # type: ignore[no-untyped-def]
+        self.content = content
+        self.reasoning_content = reasoning_content
+
+
+class _FakeChunk:
+    def __init__(self, delta: _FakeDelta, finish_reason=None) -> None:  # type: ignore[no-untyped-def]
+        self.choices = [mock.Mock(delta=delta, message=None, finish_reason=finish_reason)]
+
+
+class _FakeAsyncStream:
+    def __init__(self, chunks) -> None:  # type: ignore[no-untyped-def]
+        self._chunks = list(chunks)
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def __aiter__(self):  # type: ignore[no-untyped-def]
+        return self
+
+    async def __anext__(self):  # type: ignore[no-untyped-def]
+        if not self._chunks:
+            raise StopAsyncIteration
+        return self._chunks.pop(0)
+
+
+def _fake_openai_client(stream: _FakeAsyncStream):  # type: ignore[no-untyped-def]
+    async def _create(**kwargs):  # type: ignore[no-untyped-def]
+        return stream
+
+    fake = mock.Mock()
+    fake.chat.completions.create = _create
+    return fake
+
+
+def _model_api_client() -> TestClient:
+    from fastapi import FastAPI
+
+    from server.api import model_api
+
+    test_app = FastAPI()
+    test_app.include_router(model_api.router)
+    return TestClient(test_app)
+
+
+def test_list_models_serializes_service_statuses_directly() -> None:
+    service = DummyService()
+    with mock.patch("server.api.model_api.get_model_download_service", return_value=service):
+        response = _model_api_client().get("/api/models")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [service.status.to_dict()]
+
+
+def test_modelscope_connection_streams_with_async_client() -> None:
+    chunks = [
+        _FakeChunk(_FakeDelta(reasoning_content="思考")),
+        _FakeChunk(_FakeDelta(content="你")),
+        _FakeChunk(_FakeDelta(content="好")),
+    ]
+    with mock.patch(
+        "server.api.model_api._get_openai_client",
+        return_value=_fake_openai_client(_FakeAsyncStream(chunks)),
+    ):
+        response = _model_api_client().post("/api/models/test-modelscope", json={"api_key": "token"})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["model"] == "Qwen/Qwen3-32B"
+    assert payload["content"] == "思考\n\n=== Final Answer ===\n你好"
+
+
+def test_dashscope_connection_stops_reading_after_buffer_limit() -> None:
+    from server.api import model_api
+
+    oversized = "x" * (model_api.STREAM_TEST_ANSWER_CHARS + 10)
+    stream = _FakeAsyncStream(
+        [
+            _FakeChunk(_FakeDelta(content=oversized)),
+            _FakeChunk(_FakeDelta(content="never read")),
+        ]
+    )
+    with mock.patch(
+        "server.api.model_api._get_openai_client",
+        return_value=_fake_openai_client(stream),
+    ):
+        response = _model_api_client().post("/api/models/test-dashscope", json={"api_key": "token"})
+    assert response.status_code == 200
+    assert response.json()["content"] == oversized[: model_api.STREAM_TEST_ANSWER_CHARS]
+    assert stream.closed
+    assert len(stream._chunks) == 1
+
+
+def test_modelscope_connection_stops_at_finish_reason() -> None:
+    stream = _FakeAsyncStream(
+        [
+            _FakeChunk(_FakeDelta(content="你好"), finish_reason="stop"),
+            _FakeChunk(_FakeDelta(content="trailing")),
+        ]
+    )
+    with mock.patch(
+        "server.api.model_api._get_openai_client",
+        return_value=_fake_openai_client(stream),
+    ):
+        response = _model_api_client().post("/api/models/test-modelscope", json={"api_key": "token"})
+    assert response.status_code == 200
+    assert response.json()["content"] == "你好"
+    assert stream.closed
+    assert len(stream._chunks) == 1
+
+
+def test_dashscope_models_are_cached_per_api_key() -> None:
+    from server.api import model_api
+
+    model_api._dashscope_models_cache.clear()
+    fake_response = mock.Mock(status_code=200, content=b'{"data": [{"id": "qwen3-max"}]}')
+    with mock.patch.object(model_api.http_session, "get", return_value=fake_response) as fake_get:
+        api_client = _model_api_client()
+        first = api_client.post("/api/models/dashscope/models", json={"api_key": "key-a"})
+        second = api_client.post("/api/models/dashscope/models", json={"api_key": "key-a"})
+        other = api_client.post("/api/models/dashscope/models", json={"api_key": "key-b"})
+
+    assert first.status_code == second.status_code == other.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["models"][0]["id"] == "qwen3-max"
+    assert fake_get.call_count == 2
+    model_api._dashscope_models_cache.clear()
+
+
+def test_model_status_response_from_service_clamps_progress() -> None:
+    from dataclasses import replace
+
+    from server.api import model_api
+
+    status = replace(DummyService().status, progress=1.25)
+    response = model_api.ModelStatusResponse.from_service(status)
+    assert response.progress == 1.0
+    assert response.key == "demo"
+    assert response.model_dump()["status"] == "not_downloaded"
+
+
+def test_openai_client_cache_hashes_keys_and_closes_evicted_clients(monkeypatch) -> None:
+    import asyncio
+
+    from server.api import model_api
+
+    class _FakeAsyncOpenAI:
+        def __init__(self, api_key: str, base_url: str, http_client) -> None:
+            self.http_client = http_client
+            self.closed = False
+
+        async def close(self) -> None:
+            self.closed = True
+            await self.http_client.aclose()
+
+    monkeypatch.setattr(model_api, "AsyncOpenAI", _FakeAsyncOpenAI)
+    monkeypatch.setattr(
+        model_api,
+        "_openai_clients",
+        model_api.OpenAIClientCache(
+            model_api._new_openai_client, maxsize=1, on_evict=model_api._schedule_client_close
+        ),
+    )
+
+    async def scenario() -> None:
+        first = model_api._get_openai_client(model_api.MODELSCOPE_BASE_URL, "key-a")
+        assert model_api._get_openai_client(model_api.MODELSCOPE_BASE_URL, "key-a") is first
+        assert all("key-a" not in key for key in model_api._openai_clients.keys())
+
+        second = model_api._get_openai_client(model_api.DASHSCOPE_BASE_URL, "key-a")
+        await asyncio.gather(*tuple(model_api._closing_openai_clients))
+        assert first.closed
+        assert not second.closed
+
+        await model_api.close_openai_clients()
+        assert second.closed
+        assert len(model_api._openai_clients) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,24 @@
+from server.service.openai_client_cache import OpenAIClientCache, api_key_digest
+
+
+class _FakeClient:
+    def __init__(self, base_url: str, api_key: str) -> None:
+        self.base_url = base_url
+        self.api_key = api_key
+
+
+def test_cache_reuses_clients_by_hashed_key_and_evicts_least_recently_used() -> None:
+    evicted = []
+    cache = OpenAIClientCache(_FakeClient, maxsize=2, on_evict=evicted.append)
+
+    first = cache.get("https://a", "key-a")
+    second = cache.get("https://b", "key-a")
+    assert cache.get("https://a", "key-a") is first
+    assert cache.keys() == [("https://b", api_key_digest("key-a")), ("https://a", api_key_digest("key-a"))]
+
+    third = cache.get("https://a", "key-b")
+    assert evicted == [second]
+    assert len(cache) == 2
+
+    assert set(map(id, cache.drain())) == {id(first), id(third)}
+    assert len(cache) == 0
@@ -0,0 +1,88 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from server.service import sqlite_service
+from server.service.sqlite_service import SQLiteManager
+
+
+@pytest.fixture()
+def manager(tmp_path, monkeypatch) -> SQLiteManager:
+    config = sqlite_service.DatabaseConfig
+    monkeypatch.setattr(config, "DATABASE_DIR", tmp_path / "data")
+    monkeypatch.setattr(config, "SQLITE_DIR", tmp_path / "sqlite")
+    monkeypatch.setattr(config, "VECTOR_DIR", tmp_path / "vector")
+    monkeypatch.setattr(config, "IMAGES_DIR", tmp_path / "images")
+    monkeypatch.setattr(config, "SQLITE_DB_PATH", tmp_path / "sqlite" / "documents.db")
+    manager = SQLiteManager()
+    yield manager
+    manager.close()
+
+
+def test_database_uses_wal_and_connection_pragmas(manager: SQLiteManager) -> None:
+    conn = manager.connect()
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        # NORMAL = 1
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_reader_pool_is_read_only_and_sees_committed_writes(manager: SQLiteManager) -> None:
+    document_id = manager.insert_document("a.txt", "/tmp/a.txt", "txt", 1, "hash")
+
+    with manager.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM documents")
+
+    assert manager.get_document_by_id(document_id)["file_path"] == "/tmp/a.txt"
+
+
+def test_async_read_and_write_helpers(manager: SQLiteManager) -> None:
+    async def scenario():
+        await manager.write(
+            lambda conn: conn.execute(
+                "INSERT INTO documents (filename, file_path, file_type, file_size, content_hash) VALUES (?, ?, ?, ?, ?)",
+                ("b.txt", "/tmp/b.txt", "txt", 1, "hash"),
+            )
+        )
+        counts = await asyncio.gather(
+            *(manager.read(lambda conn: conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]) for _ in range(4))
+        )
+        return counts
+
+    assert asyncio.run(scenario()) == [1, 1, 1, 1]
+
+
+def test_exhausted_reader_pool_raises_instead_of_blocking(manager: SQLiteManager, monkeypatch) -> None:
+    monkeypatch.setattr(manager, "_reader_limit", 1)
+    monkeypatch.setattr(sqlite_service, "SQLITE_READER_ACQUIRE_TIMEOUT", 0.01)
+
+    with manager.reader():
+        with pytest.raises(sqlite3.OperationalError, match="只读连接池已耗尽"):
+            with manager.reader():
+                pass
+
+    with manager.reader() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+
+
+def test_nested_writer_commits_only_at_outermost_level(manager: SQLiteManager) -> None:
+    insert = "INSERT INTO documents (filename, file_path, file_type, file_size, content_hash) VALUES (?, ?, ?, ?, ?)"
+
+    with pytest.raises(RuntimeError):
+        with manager.writer() as outer:
+            with manager.writer() as inner:
+                assert inner is outer
+                inner.execute(insert, ("a.txt", "/tmp/a.txt", "txt", 1, "hash-a"))
+            raise RuntimeError("abort outer transaction")
+
+    assert manager.get_document_by_path("/tmp/a.txt") is None
+
+    with manager.writer() as outer:
+        with manager.writer() as inner:
+            inner.execute(insert, ("b.txt", "/tmp/b.txt", "txt", 1, "hash-b"))
+    assert manager.get_document_by_path("/tmp/b.txt")["filename"] == "b.txt"
@@ -0,0 +1,178 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from starlette.websockets import WebSocketState
+
+from server.api import status_api
+from server.api.status_api import StatusBroadcaster
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.accepted = False
+        self.frames: List[str] = []
+        self.client_state = WebSocketState.CONNECTED
+        self.application_state = WebSocketState.CONNECTED
+        self.close_code = None
+
+    async def accept(self) -> None:
+        self.accepted = True
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        assert message["type"] == "websocket.send"
+        self.frames.append(message["text"])
+
+
+def test_new_connection_receives_cached_latest_frame():
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        first = FakeWebSocket()
+        await broadcaster.connect(first)
+        await broadcaster.broadcast({"status": "loading", "progress": 0.5})
+        await broadcaster.broadcast({"status": "transient"}, keep_latest=False)
+
+        late = FakeWebSocket()
+        await broadcaster.connect(late)
+
+        assert [json.loads(frame)["status"] for frame in first.frames] == ["loading", "transient"]
+        assert late.accepted
+        assert late.frames == [first.frames[0]]
+        assert "timestamp" in json.loads(late.frames[0])
+
+    asyncio.run(scenario())
+
+
+class FailingWebSocket(FakeWebSocket):
+    async def send(self, message: Dict[str, Any]) -> None:
+        raise RuntimeError("connection closed")
+
+
+def test_broadcast_drops_failed_clients_without_blocking_others():
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        healthy = FakeWebSocket()
+        broken = FailingWebSocket()
+        await broadcaster.connect(broken)
+        await broadcaster.connect(healthy)
+
+        await broadcaster.broadcast({"status": "ready"})
+        await broadcaster.broadcast({"status": "ready-again"})
+
+        assert [json.loads(frame)["status"] for frame in healthy.frames] == ["ready", "ready-again"]
+        assert broken not in broadcaster._connections
+        assert broken.close_code == status_api.STATUS_DROP_CLOSE_CODE
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_skips_closed_connections_without_sending():
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        closed = FakeWebSocket()
+        await broadcaster.connect(closed)
+        closed.client_state = WebSocketState.DISCONNECTED
+
+        await broadcaster.broadcast({"status": "ready"})
+
+        assert closed.frames == []
+        assert closed not in broadcaster._connections
+
+    asyncio.run(scenario())
+
+
+def test_queue_coalesces_updates_per_key(monkeypatch):
+    monkeypatch.setattr(status_api, "STATUS_COALESCE_INTERVAL", 0.01)
+
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        client = FakeWebSocket()
+        await broadcaster.connect(client)
+
+        for progress in (0.1, 0.2, 0.3):
+            broadcaster.queue("pdf_parse:a", {"task_id": "a", "progress": progress})
+        broadcaster.queue("pdf_parse:b", {"task_id": "b", "progress": 1.0})
+        await asyncio.sleep(0.05)
+
+        frames = [json.loads(frame) for frame in client.frames]
+        assert [(frame["task_id"], frame["progress"]) for frame in frames] == [("a", 0.3), ("b", 1.0)]
+
+    asyncio.run(scenario())
+
+
+class SlowWebSocket(FakeWebSocket):
+    async def send(self, message: Dict[str, Any]) -> None:
+        await asyncio.sleep(10)
+
+
+def test_publish_broadcasts_in_order_and_drops_slow_clients(monkeypatch):
+    monkeypatch.setattr(status_api, "STATUS_SEND_TIMEOUT", 0.01)
+
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        client = FakeWebSocket()
+        slow = SlowWebSocket()
+        await broadcaster.connect(client)
+        await broadcaster.connect(slow)
+
+        broadcaster.publish({"status": "initializing"})
+        broadcaster.publish({"status": "ready"})
+        await broadcaster.aclose()
+
+        assert [json.loads(frame)["status"] for frame in client.frames] == ["initializing", "ready"]
+        assert slow not in broadcaster._connections
+        assert slow.close_code == status_api.STATUS_DROP_CLOSE_CODE
+        assert client.close_code is None
+        assert json.loads(broadcaster._latest_message["text"])["status"] == "ready"
+
+    asyncio.run(scenario())
+
+
+def test_slow_broadcast_recipient_is_closed_so_it_can_reconnect(monkeypatch):
+    monkeypatch.setattr(status_api, "STATUS_SEND_TIMEOUT", 0.01)
+
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        slow = SlowWebSocket()
+        await broadcaster.connect(slow)
+
+        await broadcaster.broadcast({"status": "ready"})
+
+        assert slow not in broadcaster._connections
+        assert slow.close_code == status_api.STATUS_DROP_CLOSE_CODE
+
+        reconnected = FakeWebSocket()
+        await broadcaster.connect(reconnected)
+        assert json.loads(reconnected.frames[0])["status"] == "ready"
+
+    asyncio.run(scenario())
+
+
+def test_aclose_cancels_pending_coalesced_flush(monkeypatch):
+    monkeypatch.setattr(status_api, "STATUS_COALESCE_INTERVAL", 10)
+
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster()
+        client = FakeWebSocket()
+        await broadcaster.connect(client)
+
+        broadcaster.queue("pdf_parse:a", {"task_id": "a", "progress": 0.5})
+        await asyncio.sleep(0)
+        flush_task = broadcaster._flush_task
+        assert flush_task is not None and not flush_task.done()
+
+        await broadcaster.aclose()
+
+        assert flush_task.cancelled()
+        assert broadcaster._flush_task is None
+        assert client.frames == []
+
+    asyncio.run(scenario())